@@ -0,0 +1,122 @@
+"""Encoding profile calibration: encode speed versus output size on this machine.
+
+Usage:
+    python -m bench.encode
+    python -m bench.encode --duration 5 --platform shorts --image photo.png --json bench_encode.json
+
+Behavior:
+- Renders the clip the ffmpeg fallback produces (`VideoGenerator._ffmpeg_command`,
+  without audio) once per profile in `src/encoding.py`. The source is `--image`
+  or a generated test pattern at the platform resolution.
+- Reports wall time, encode fps (output frames per wall-clock second), speed
+  relative to real time, output size and average bitrate.
+- Recommends the profile with the smallest output that still encodes at
+  least `--min-speed` times real time (default 1.0). Use it as
+  `VIDEO_ENCODE_PROFILE`.
+- Needs ffmpeg on PATH. Renders go to a scratch directory that is removed
+  afterwards.
+"""
+import argparse
+import json
+import os
+import subprocess
+import tempfile
+import time
+from typing import List, Optional
+
+from src import encoding
+from src.video_gen import VideoGenerator
+
+
+def make_test_image(path: str, width: int, height: int) -> str:
+    """Write one frame of ffmpeg's `testsrc2` pattern to `path`."""
+    subprocess.run(
+        ["ffmpeg", "-y", "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}", "-frames:v", "1", path],
+        check=True,
+        capture_output=True,
+    )
+    return path
+
+
+def run_calibration(
+    duration: int = 5,
+    platform: Optional[str] = None,
+    profiles: Optional[List[str]] = None,
+    image: Optional[str] = None,
+    workdir: Optional[str] = None,
+) -> List[dict]:
+    """Render once per profile and return one report per profile."""
+    gen = VideoGenerator(dry_run=False)
+    gen.platform = encoding.platform_name(platform)
+    target = encoding.platform_target(gen.platform)
+    frames = duration * target["fps"]
+
+    scratch = None
+    if workdir is None:
+        scratch = tempfile.TemporaryDirectory(prefix="bench-encode-")
+        workdir = scratch.name
+    try:
+        source = image or make_test_image(os.path.join(workdir, "source.png"), target["width"], target["height"])
+        reports = []
+        for profile in profiles or list(encoding.PROFILES):
+            output = os.path.join(workdir, f"{profile}.mp4")
+            started = time.perf_counter()
+            subprocess.run(gen._ffmpeg_command(source, duration, output, profile=profile), check=True, capture_output=True)
+            wall_s = time.perf_counter() - started
+            size = os.path.getsize(output)
+            reports.append({
+                "profile": profile,
+                "platform": gen.platform,
+                "duration_s": duration,
+                "wall_s": round(wall_s, 3),
+                "encode_fps": round(frames / wall_s, 1) if wall_s else 0.0,
+                "speed_x": round(duration / wall_s, 2) if wall_s else 0.0,
+                "bytes": size,
+                "kbps": round(size * 8 / duration / 1000.0, 1),
+            })
+        return reports
+    finally:
+        if scratch is not None:
+            scratch.cleanup()
+
+
+def recommend(reports: List[dict], min_speed: float = 1.0) -> Optional[str]:
+    """Smallest-output profile that encodes at least `min_speed` x real time, or None."""
+    fast_enough = [r for r in reports if r["speed_x"] >= min_speed]
+    if not fast_enough:
+        return None
+    return min(fast_enough, key=lambda r: r["bytes"])["profile"]
+
+
+def print_report(reports: List[dict], min_speed: float) -> None:
+    print(f"\n{'profile':10} {'wall s':>8} {'enc fps':>9} {'x realtime':>11} {'size KB':>9} {'kbps':>8}")
+    for r in reports:
+        print(f"{r['profile']:10} {r['wall_s']:>8.2f} {r['encode_fps']:>9.1f} {r['speed_x']:>11.2f} {r['bytes'] / 1024.0:>9.1f} {r['kbps']:>8.1f}")
+    best = recommend(reports, min_speed)
+    if best:
+        print(f"\nRecommended: VIDEO_ENCODE_PROFILE={best} (smallest output at >= {min_speed:g}x real time)")
+    else:
+        print(f"\nNo profile encodes at >= {min_speed:g}x real time on this machine.")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Calibrate ffmpeg encoding profiles on this machine")
+    parser.add_argument("--duration", type=int, default=5, help="Clip length in seconds")
+    parser.add_argument("--platform", default=None, help=f"Platform target ({', '.join(encoding.PLATFORMS)}; default VIDEO_PLATFORM)")
+    parser.add_argument("--profiles", default=",".join(encoding.PROFILES), help="Comma-separated profiles to time")
+    parser.add_argument("--image", default=None, help="Source image (default: a generated test pattern)")
+    parser.add_argument("--min-speed", dest="min_speed", type=float, default=1.0, help="Minimum encode speed (x real time) for the recommendation")
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write the reports to this JSON file")
+    args = parser.parse_args(argv)
+
+    profiles = [p.strip() for p in args.profiles.split(",") if p.strip()]
+    reports = run_calibration(args.duration, args.platform, profiles, args.image)
+    print_report(reports, args.min_speed)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(reports, f, indent=2)
+        print(f"\nWrote {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
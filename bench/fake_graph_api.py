@@ -0,0 +1,73 @@
+"""Minimal stand-in for the Instagram Graph API endpoints used by `InstagramPoster`.
+
+Implements the resumable upload phases (start / transfer / finish) on
+`/<version>/<ig_user_id>/videos` plus `/media` and `/media_publish`, so the
+upload path moves real bytes without leaving the machine.
+
+Set `GRAPH_PROXY_LATENCY_S` (default 0.05) to simulate per-request latency.
+
+Run standalone:
+    python -m bench.fake_graph_api   # then GRAPH_API_URL=http://localhost:9092
+"""
+import os
+import threading
+import time
+import uuid
+
+from flask import Flask, jsonify, request
+
+app = Flask(__name__)
+
+_sessions = {}
+_lock = threading.Lock()
+
+
+def _simulate_latency():
+    time.sleep(float(os.getenv("GRAPH_PROXY_LATENCY_S", "0.05")))
+
+
+@app.route("/<version>/<ig_user_id>/videos", methods=["POST"])
+def videos(version, ig_user_id):
+    _simulate_latency()
+    phase = request.form.get("upload_phase")
+    if phase == "start":
+        session_id = uuid.uuid4().hex
+        with _lock:
+            _sessions[session_id] = {"size": int(request.form.get("file_size", "0")), "received": 0}
+        return jsonify({"upload_session_id": session_id, "video_id": f"vid_{session_id[:8]}", "start_offset": 0, "end_offset": 0})
+
+    session_id = request.form.get("upload_session_id")
+    with _lock:
+        session = _sessions.get(session_id)
+    if session is None:
+        return jsonify({"error": "unknown upload session"}), 400
+
+    if phase == "transfer":
+        chunk = request.files["video_file_chunk"].read()
+        with _lock:
+            session["received"] += len(chunk)
+            offset = session["received"]
+        return jsonify({"start_offset": offset, "end_offset": offset})
+
+    if phase == "finish":
+        with _lock:
+            _sessions.pop(session_id, None)
+        return jsonify({"success": session["received"] == session["size"]})
+
+    return jsonify({"error": f"unknown upload_phase {phase}"}), 400
+
+
+@app.route("/<version>/<ig_user_id>/media", methods=["POST"])
+def media(version, ig_user_id):
+    _simulate_latency()
+    return jsonify({"id": f"creation_{uuid.uuid4().hex[:8]}"})
+
+
+@app.route("/<version>/<ig_user_id>/media_publish", methods=["POST"])
+def media_publish(version, ig_user_id):
+    _simulate_latency()
+    return jsonify({"id": f"media_{request.form.get('creation_id', '')}"})
+
+
+if __name__ == "__main__":
+    app.run(host="0.0.0.0", port=int(os.getenv("GRAPH_PROXY_PORT", "9092")))
@@ -0,0 +1,197 @@
+"""End-to-end pipeline benchmark against local provider stand-ins.
+
+Usage:
+    python -m bench.pipeline --n 8 --concurrency 1,2,4
+    python -m bench.pipeline --n 16 --concurrency 4 --json bench_pipeline.json
+
+Behavior:
+- Starts the stand-ins in-process on free localhost ports: the Gemini proxy
+  (`scripts/gemini_sdk_proxy.py`, concept + caption), the gork image proxy,
+  the Luma video proxy and a fake Graph API (`bench/fake_graph_api.py`).
+- Points the pipeline at them through the same env vars a deployment uses
+  (GEMINI_API_URL, USE_IMAGE_API with IMAGE_PROVIDER=gork, VIDEO_PROVIDER=luma,
+  GRAPH_API_URL), disables YouTube and the artifact / LLM caches (`--cache`
+  keeps them on), and runs
+  `orchestrate_batch(n, max_concurrency=c, dry_run=False)` for each
+  concurrency level in a scratch directory with its own SQLite database.
+- Reports throughput (pieces/s), p50/p95 per stage from the tracing spans,
+  failed pieces and peak RSS. Peak RSS is the process high-water mark, so it
+  never decreases across levels and includes the in-process stand-ins.
+
+Simulated provider latency is set through the stand-ins' env vars
+(GEMINI_PROXY_LATENCY_S, GORK_PROXY_LATENCY_S, LUMA_PROXY_LATENCY_S,
+GRAPH_PROXY_LATENCY_S). Nothing leaves the machine.
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+from werkzeug.serving import make_server
+
+from src import tracing
+from src.runtime import env_overrides
+
+STAGES = ("concept", "image", "video", "caption", "instagram", "youtube")
+
+
+class StandIns:
+    """Run the provider stand-in Flask apps on background threads."""
+
+    def __init__(self):
+        self._servers = []
+        self.urls: Dict[str, str] = {}
+
+    def _serve(self, name: str, app) -> None:
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, name=f"bench-{name}", daemon=True).start()
+        self._servers.append(server)
+        self.urls[name] = f"http://127.0.0.1:{server.server_port}"
+
+    def __enter__(self) -> "StandIns":
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)  # no per-request access log
+        from scripts.gemini_sdk_proxy import app as gemini_app
+        from scripts.gork_image_proxy import app as gork_app
+        from scripts.luma_video_proxy import app as luma_app
+        from bench.fake_graph_api import app as graph_app
+
+        self._serve("gemini", gemini_app)
+        self._serve("gork", gork_app)
+        self._serve("luma", luma_app)
+        self._serve("graph", graph_app)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        for server in self._servers:
+            server.shutdown()
+
+
+def pipeline_env(urls: Dict[str, str], workdir: str, cache: bool = False) -> Dict[str, str]:
+    """Environment that routes every provider call to the stand-ins."""
+    return {
+        "GEMINI_USE_SDK": "false",
+        "USE_OPENROUTER": "false",
+        "USE_OPENROUTER_FOR_IMAGES": "false",
+        "USE_OPENROUTER_FOR_VIDEOS": "false",
+        "GEMINI_API_KEY": "bench",
+        "GEMINI_API_URL": f"{urls['gemini']}/v1/agent",
+        "USE_IMAGE_API": "true",
+        "IMAGE_PROVIDER": "gork",
+        "IMAGE_API_URL": f"{urls['gork']}/v1/generate",
+        "IMAGE_API_KEY": "bench",
+        "VIDEO_PROVIDER": "luma",
+        "VIDEO_API_URL": f"{urls['luma']}/v1/animate",
+        "VIDEO_API_KEY": "bench",
+        "GRAPH_API_URL": urls["graph"],
+        "IG_ACCESS_TOKEN": "bench",
+        "INSTAGRAM_ACCOUNT_ID": "bench",
+        "YOUTUBE_ENABLED": "false",
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "CREF_STORE_PATH": os.path.join(workdir, "cref_store.json"),
+        "ARTIFACT_CACHE": "true" if cache else "false",
+        "ARTIFACT_CACHE_DIR": os.path.join(workdir, "artifact_cache"),
+        "LLM_CACHE": "true" if cache else "false",
+        "LLM_CACHE_PATH": os.path.join(workdir, "llm_cache.sqlite3"),
+        "WORKSPACE_DIR": os.path.join(workdir, "workspaces"),
+    }
+
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss / (1024.0 * 1024.0) if sys.platform == "darwin" else rss / 1024.0
+
+
+def run_level(n: int, concurrency: int) -> dict:
+    """Run one batch of `n` pieces at `concurrency` and summarise it."""
+    from src.main import orchestrate_batch
+
+    with tracing.InMemoryCollector() as collector:
+        started = time.perf_counter()
+        results = orchestrate_batch(n, max_concurrency=concurrency, dry_run=False)
+        wall_s = time.perf_counter() - started
+
+    summary = tracing.summarize(collector.spans)
+    stages = {}
+    for stage in STAGES:
+        row = summary.get(f"stage.{stage}")
+        if row:
+            stages[stage] = {"p50_ms": row["p50_ms"], "p95_ms": row["p95_ms"], "errors": row["errors"]}
+    piece = summary.get("orchestrate", {})
+    return {
+        "n": n,
+        "concurrency": concurrency,
+        "wall_s": round(wall_s, 3),
+        "throughput_per_s": round(n / wall_s, 3) if wall_s else 0.0,
+        "piece_p50_ms": piece.get("p50_ms"),
+        "piece_p95_ms": piece.get("p95_ms"),
+        "failed": sum(1 for r in results if "error" in r),
+        "stages": stages,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def run_benchmark(n: int, levels: List[int], cache: bool = False, workdir: Optional[str] = None) -> List[dict]:
+    """Start the stand-ins and run every concurrency level; returns one report per level."""
+    from src import database
+
+    scratch = None
+    if workdir is None:
+        scratch = tempfile.TemporaryDirectory(prefix="bench-pipeline-")
+        workdir = scratch.name
+    previous_cwd = os.getcwd()
+    try:
+        with StandIns() as stand_ins, env_overrides(pipeline_env(stand_ins.urls, workdir, cache=cache)):
+            # keep anything still written relative to the working directory in the scratch dir
+            os.chdir(workdir)
+            database.reset_engine()
+            database.init_db()
+            try:
+                return [run_level(n, c) for c in levels]
+            finally:
+                database.reset_engine()
+    finally:
+        os.chdir(previous_cwd)
+        if scratch is not None:
+            scratch.cleanup()
+
+
+def print_report(reports: List[dict]) -> None:
+    print(f"\n{'conc':>5} {'n':>5} {'wall s':>8} {'pieces/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'failed':>7} {'peak RSS MB':>12}")
+    for r in reports:
+        print(
+            f"{r['concurrency']:>5} {r['n']:>5} {r['wall_s']:>8.2f} {r['throughput_per_s']:>9.2f} "
+            f"{r['piece_p50_ms'] or 0:>9.1f} {r['piece_p95_ms'] or 0:>9.1f} {r['failed']:>7} {r['peak_rss_mb']:>12.1f}"
+        )
+    for r in reports:
+        print(f"\nconcurrency {r['concurrency']}: per-stage latency")
+        print(f"  {'stage':12} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}")
+        for stage, row in r["stages"].items():
+            print(f"  {stage:12} {row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['errors']:>7}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Offline end-to-end pipeline benchmark")
+    parser.add_argument("--n", type=int, default=8, help="Pieces per concurrency level")
+    parser.add_argument("--concurrency", default="1,2,4,8", help="Comma-separated max-concurrency levels")
+    parser.add_argument("--cache", action="store_true", help="Keep the artifact and LLM caches enabled")
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write the reports to this JSON file")
+    args = parser.parse_args(argv)
+
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    reports = run_benchmark(args.n, levels, cache=args.cache)
+    print_report(reports)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(reports, f, indent=2)
+        print(f"\nWrote {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
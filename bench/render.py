@@ -0,0 +1,114 @@
+"""Ken Burns render time versus source image resolution.
+
+Usage:
+    python -m bench.render
+    python -m bench.render --resolutions 1024x1024,2048x2048,3840x2160 --duration 5 --json bench_render.json
+
+Behavior:
+- For each source resolution, generates a test-pattern image and renders the
+  ffmpeg fallback clip (`VideoGenerator._ffmpeg_command`, no audio) twice:
+  once with the source pre-scaled to `KEN_BURNS_OVERSAMPLE` x the output
+  size before zoompan, and once cropped only, so zoompan sees the full
+  source resolution.
+- When NumPy is installed, also times the numpy renderer
+  (`VIDEO_RENDERER=numpy`): frames synthesized in NumPy and piped to the
+  same encoder.
+- Reports wall time for each and the pre-scale speed-up. Renders use the
+  `draft` encoding profile by default (`--profile`), so the filter cost
+  dominates.
+- Needs ffmpeg on PATH. Renders go to a scratch directory that is removed
+  afterwards.
+"""
+import argparse
+import json
+import os
+import subprocess
+import tempfile
+import time
+from typing import List, Optional
+
+from bench.encode import make_test_image
+from src import encoding
+from src.video_gen import VideoGenerator, _load_numpy
+
+
+def _render_s(gen: VideoGenerator, source: str, duration: int, output: str, profile: str) -> float:
+    started = time.perf_counter()
+    subprocess.run(gen._ffmpeg_command(source, duration, output, profile=profile), check=True, capture_output=True)
+    return time.perf_counter() - started
+
+
+def run_render_benchmark(
+    resolutions: List[str],
+    duration: int = 5,
+    profile: str = "draft",
+    platform: Optional[str] = None,
+    workdir: Optional[str] = None,
+) -> List[dict]:
+    """Render every resolution with and without pre-scaling; returns one report per resolution."""
+    gen = VideoGenerator(dry_run=False)
+    gen.platform = encoding.platform_name(platform)
+    oversample = gen.ken_burns_oversample if gen.ken_burns_oversample > 0 else 1.25
+
+    scratch = None
+    if workdir is None:
+        scratch = tempfile.TemporaryDirectory(prefix="bench-render-")
+        workdir = scratch.name
+    try:
+        reports = []
+        for resolution in resolutions:
+            width, height = (int(v) for v in resolution.lower().split("x"))
+            source = make_test_image(os.path.join(workdir, f"source_{resolution}.png"), width, height)
+            output = os.path.join(workdir, f"render_{resolution}.mp4")
+
+            gen.ken_burns_oversample = oversample
+            prescaled_s = _render_s(gen, source, duration, output, profile)
+            gen.ken_burns_oversample = 0
+            full_s = _render_s(gen, source, duration, output, profile)
+            numpy_s = None
+            if _load_numpy() is not None:
+                gen.ken_burns_oversample = oversample
+                started = time.perf_counter()
+                gen._render_numpy(source, duration, output, profile=profile)
+                numpy_s = round(time.perf_counter() - started, 3)
+            reports.append({
+                "resolution": resolution,
+                "megapixels": round(width * height / 1e6, 2),
+                "prescaled_s": round(prescaled_s, 3),
+                "full_res_s": round(full_s, 3),
+                "speedup": round(full_s / prescaled_s, 2) if prescaled_s else 0.0,
+                "numpy_s": numpy_s,
+            })
+        return reports
+    finally:
+        if scratch is not None:
+            scratch.cleanup()
+
+
+def print_report(reports: List[dict]) -> None:
+    print(f"\n{'source':>11} {'MP':>6} {'prescaled s':>12} {'full-res s':>11} {'speed-up':>9} {'numpy s':>8}")
+    for r in reports:
+        numpy_s = f"{r['numpy_s']:>8.2f}" if r["numpy_s"] is not None else f"{'-':>8}"
+        print(f"{r['resolution']:>11} {r['megapixels']:>6.2f} {r['prescaled_s']:>12.2f} {r['full_res_s']:>11.2f} {r['speedup']:>8.2f}x {numpy_s}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Ken Burns render time versus source resolution")
+    parser.add_argument("--resolutions", default="1024x1024,1536x2752,2048x2048,3840x2160,4096x4096", help="Comma-separated WIDTHxHEIGHT source sizes")
+    parser.add_argument("--duration", type=int, default=5, help="Clip length in seconds")
+    parser.add_argument("--profile", default="draft", help=f"Encoding profile ({', '.join(encoding.PROFILES)})")
+    parser.add_argument("--platform", default=None, help=f"Platform target ({', '.join(encoding.PLATFORMS)}; default VIDEO_PLATFORM)")
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write the reports to this JSON file")
+    args = parser.parse_args(argv)
+
+    resolutions = [r.strip() for r in args.resolutions.split(",") if r.strip()]
+    reports = run_render_benchmark(resolutions, args.duration, args.profile, args.platform)
+    print_report(reports)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(reports, f, indent=2)
+        print(f"\nWrote {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,20 +3,38 @@
 
 Behavior:
 - Connects to Redis using REDIS_URL env var
-- BLPOP on list 'ai_jobs' and for each job runs `python -m src.main`
+- BLPOP on list 'ai_jobs' and runs each job in-process through a warm
+  `src.runtime.WarmRuntime`, so the orchestrator, SDK imports, clients, HTTP
+  sessions and DB engine are loaded once and reused across jobs
 - By default runs in dry-run mode to avoid external API calls unless the job settings request otherwise
 """
 import os
+import sys
 import json
-import subprocess
 import time
 import redis
 
+# The worker is started as `python scaffold/worker/worker.py` from the repo
+# root; make the `src` package importable regardless of the script location.
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from dotenv import load_dotenv  # noqa: E402
+
+# override=True, as `python -m src.main` did: .env wins over the container env
+load_dotenv(dotenv_path=os.path.join(ROOT_DIR, '.env'), override=True)
+
+from src.runtime import WarmRuntime  # noqa: E402
+
 REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379')
 
 def main():
     print('Worker starting, connecting to Redis at', REDIS_URL)
     r = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+    # Decide dry run vs real based on env; job.settings.dry_run overrides per job
+    dry_run_env = os.getenv('DRY_RUN', 'true').lower() in ('1','true','yes')
+    runtime = WarmRuntime(default_dry_run=dry_run_env)
     while True:
         try:
             # BLPOP returns tuple (list_name, payload)
@@ -29,28 +47,11 @@ def main():
             print('Received job payload:', payload)
             job = json.loads(payload)
 
-            # Decide dry run vs real based on env or job.settings
-            dry_run_env = os.getenv('DRY_RUN', 'true').lower() in ('1','true','yes')
-            job_dry = job.get('settings', {}).get('dry_run', None)
-            dry_run = job_dry if job_dry is not None else dry_run_env
-
-            cmd = ['python', '-m', 'src.main']
-            if dry_run:
-                cmd.append('--dry-run')
-            else:
-                cmd.append('--no-dry-run')
-
-            print('Running orchestrator with', cmd)
-            proc = subprocess.run(cmd, capture_output=True, text=True)
-            print('Orchestrator exit code:', proc.returncode)
-            if proc.stdout:
-                print('stdout:', proc.stdout)
-            if proc.stderr:
-                print('stderr:', proc.stderr)
+            result = runtime.run_job(job)
+            print('Orchestrator finished:', result)
 
             # Optionally push job result to a Redis list or pubsub channel for real-time UI
             try:
-                result = {'job_id': job.get('id'), 'status': 'completed' if proc.returncode == 0 else 'failed', 'rc': proc.returncode}
                 r.publish('ai_job_events', json.dumps(result))
             except Exception as e:
                 print('Failed to publish job event:', e)
@@ -11,6 +11,8 @@ proxy with a simple HTTP contract instead of linking the SDK directly.
 """
 import os
 import json
+import re
+import time
 from flask import Flask, request, jsonify
 
 app = Flask(__name__)
@@ -51,7 +53,29 @@ def agent():
     if not instruction:
         return jsonify({"error": "missing instruction"}), 400
 
-    if "creative director" in instruction:
+    # Optional simulated model latency for offline benchmarks
+    time.sleep(float(os.getenv("GEMINI_PROXY_LATENCY_S", "0")))
+
+    if "creative director" in instruction and "copywriter" in instruction:
+        # fused concept + caption request
+        return jsonify({
+            "theme": "Sunday Morning",
+            "prompt": "Aria, a relaxed urban lifestyle portrait: warm golden hour light, soft bokeh, wearing a denim jacket, subtle smile — photorealistic, full-body, film grain",
+            "caption": "Slow mornings with Aria — savor the little moments. #SundayMorning",
+            "hashtags": ["#aria", "#sunday", "#lifestyle", "#goldenhour", "#photography"]
+        })
+    elif "creative director" in instruction and "JSON array" in instruction:
+        # batch request from `generate_concepts(n)`
+        match = re.search(r"JSON array of (\d+)", instruction)
+        n = int(match.group(1)) if match else 1
+        return jsonify([
+            {
+                "theme": f"Sunday Morning #{i + 1}",
+                "prompt": "Aria, a relaxed urban lifestyle portrait: warm golden hour light, soft bokeh, wearing a denim jacket, subtle smile — photorealistic, full-body, film grain"
+            }
+            for i in range(n)
+        ])
+    elif "creative director" in instruction:
         return jsonify({
             "theme": "Sunday Morning",
             "prompt": "Aria, a relaxed urban lifestyle portrait: warm golden hour light, soft bokeh, wearing a denim jacket, subtle smile — photorealistic, full-body, film grain"
@@ -2,7 +2,11 @@
 
 This proxy simulates or wraps a real SDK. POST JSON to /v1/generate with
 { "prompt": "...", "cref": "..." } and it returns a JSON response with
-an image URL in `data[0].url` similar to many image providers.
+an image URL in `data[0].url` similar to many image providers. The URL points
+back at this proxy (`/content/<hash>.png`), which serves a small PNG, so the
+whole pipeline can run offline (see `bench/pipeline.py`).
+
+Set `GORK_PROXY_LATENCY_S` (default 0.2) to change the simulated processing time.
 
 Run locally for development:
     python scripts/gork_image_proxy.py
@@ -12,7 +16,10 @@ Then point IMAGE_API_URL to http://localhost:9090/v1/generate
 import os
 import json
 import time
-from flask import Flask, request, jsonify
+import zlib
+import struct
+import hashlib
+from flask import Flask, Response, request, jsonify
 
 app = Flask(__name__)
 
@@ -24,19 +31,34 @@ def generate():
     cref = payload.get("cref")
 
     # Simulate some processing time
-    time.sleep(0.2)
+    time.sleep(float(os.getenv("GORK_PROXY_LATENCY_S", "0.2")))
 
     # Simulate generating a stable URL path based on a hash of prompt + cref
     key = (prompt + (cref or "")).encode("utf-8")
-    import hashlib
-
     h = hashlib.sha1(key).hexdigest()[:10]
-    image_url = f"https://gork.example/content/{h}.png"
+    image_url = f"{request.host_url}content/{h}.png"
 
     # Return a response shape similar to provider APIs: data: [{ url: ... }]
     return jsonify({"data": [{"url": image_url, "meta": {"provider": "gork"}}]})
 
 
+def _png(h: str, width: int = 576, height: int = 1024) -> bytes:
+    """A solid-colour RGB PNG whose colour is derived from `h`."""
+    rgb = bytes.fromhex(h[:6].ljust(6, "0"))
+    raw = b"".join(b"\x00" + rgb * width for _ in range(height))
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b"")
+
+
+@app.route("/content/<h>.png", methods=["GET"])
+def content(h):
+    return Response(_png(h), mimetype="image/png")
+
+
 if __name__ == "__main__":
     port = int(os.getenv("GORK_PROXY_PORT", "9090"))
     app.run(host="0.0.0.0", port=port)
@@ -1,7 +1,11 @@
 """Small Flask proxy example that simulates a video provider (Luma-like).
 
 POST JSON { "image_url": "...", "duration": 5 } to /v1/animate and it returns
-{ "video_url": "https://videos.example/...mp4" }.
+{ "video_url": "<proxy>/videos/<hash>.mp4" }. The URL is served by this proxy
+(placeholder bytes, `LUMA_PROXY_BYTES_PER_SECOND` per second of video,
+default 256 KiB) so downloads and uploads move realistic amounts of data.
+
+Set `LUMA_PROXY_LATENCY_S` (default 0.2) to change the simulated processing time.
 
 Run locally for development:
     python scripts/luma_video_proxy.py
@@ -9,7 +13,7 @@ Run locally for development:
 import os
 import time
 import hashlib
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 
 app = Flask(__name__)
 
@@ -21,16 +25,23 @@ def animate():
     duration = int(payload.get('duration', 5))
 
     # Simulate work
-    time.sleep(0.2)
+    time.sleep(float(os.getenv('LUMA_PROXY_LATENCY_S', '0.2')))
 
     # Create deterministic video URL from image_url
     key = (image_url + str(duration)).encode('utf-8')
     h = hashlib.sha1(key).hexdigest()[:12]
-    video_url = f"https://videos.example/{h}.mp4"
+    video_url = f"{request.host_url}videos/{h}-{duration}.mp4"
 
     return jsonify({"video_url": video_url})
 
 
+@app.route('/videos/<h>-<int:duration>.mp4', methods=['GET'])
+def video(h, duration):
+    size = duration * int(os.getenv('LUMA_PROXY_BYTES_PER_SECOND', str(256 * 1024)))
+    body = (h.encode('utf-8') * (size // len(h) + 1))[:size]
+    return Response(body, mimetype='video/mp4')
+
+
 if __name__ == '__main__':
     port = int(os.getenv('LUMA_PROXY_PORT', '9091'))
     app.run(host='0.0.0.0', port=port)
@@ -0,0 +1,124 @@
+"""Content-addressed cache for generated artifacts (images, rendered videos).
+
+Usage:
+    cache = ArtifactCache()
+    key = cache.key("image", provider, model, prompt, aspect_ratio)
+    path = cache.fetch(key, "generated_image.png")
+    if path is None:
+        ...generate into "generated_image.png"...
+        cache.put(key, "generated_image.png")
+
+Behavior:
+- Keys are SHA-256 hashes of the JSON-encoded inputs, so any change in an
+  input (prompt, model, source image bytes, filter parameters, ...) is a miss
+  rather than stale output. Use `file_digest()` to key on a file's content.
+- Entries live under `ARTIFACT_CACHE_DIR` (default `.artifact_cache`). A hit
+  copies the entry to the requested output path, so callers can move or
+  delete their output without touching the cache.
+- Entries are written atomically (temp file + rename) and evicted least
+  recently used first once the directory grows past
+  `ARTIFACT_CACHE_MAX_BYTES` (default 2 GiB). Hits refresh an entry's mtime.
+- Set `ARTIFACT_CACHE=false` to disable; `fetch` then always misses and
+  `put` is a no-op.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's content."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ArtifactCache:
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None, enabled: Optional[bool] = None):
+        self.directory = directory or os.getenv("ARTIFACT_CACHE_DIR") or ".artifact_cache"
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv("ARTIFACT_CACHE_MAX_BYTES", str(DEFAULT_MAX_BYTES)))
+        if enabled is None:
+            enabled = os.getenv("ARTIFACT_CACHE", "true").lower() in ("1", "true", "yes")
+        self.enabled = enabled
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(*parts) -> str:
+        """Hash the given inputs into a cache key."""
+        blob = json.dumps(parts, sort_keys=True, default=str).encode()
+        return hashlib.sha256(blob).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def fetch(self, key: str, output_path: str) -> Optional[str]:
+        """Copy the entry for `key` to `output_path` and return it, or None on a miss."""
+        if not self.enabled:
+            return None
+        entry = self._entry_path(key)
+        try:
+            shutil.copyfile(entry, output_path)
+            os.utime(entry)  # mark as recently used
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Artifact cache read failed for {key}: {e}")
+            return None
+        return output_path
+
+    def put(self, key: str, source_path: str) -> None:
+        """Store a copy of `source_path` under `key`, then enforce the disk quota."""
+        if not self.enabled:
+            return
+        entry = self._entry_path(key)
+        try:
+            os.makedirs(os.path.dirname(entry), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(entry), prefix=".tmp-")
+            os.close(fd)
+            try:
+                shutil.copyfile(source_path, tmp)
+                os.replace(tmp, entry)
+            finally:
+                if os.path.exists(tmp):
+                    os.unlink(tmp)
+        except OSError as e:
+            logger.warning(f"Artifact cache write failed for {key}: {e}")
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits `max_bytes`."""
+        with self._lock:
+            entries = []
+            total = 0
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if name.startswith(".tmp-"):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, path))
+                    total += st.st_size
+
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                    total -= size
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,218 @@
+"""Write streamed image responses to disk without holding them in memory.
+
+Usage:
+    resp = http_session.post(url, json=payload, stream=True, timeout=60)
+    found = save_b64_field(resp.iter_content(CHUNK_SIZE), ("bytesBase64Encoded",), output_file)
+
+    save_stream(resp.iter_content(CHUNK_SIZE), output_file)   # raw bytes (image/* responses)
+
+Behavior:
+- `save_b64_field` scans a JSON body as it arrives and decodes the first
+  string value under one of `fields` straight into `output_file`, 4 base64
+  characters at a time, so neither the JSON document nor the decoded image
+  is ever held in memory. A field is a key name (`b64_json`) or a
+  `parent.key` path (`inlineData.data`) when the key name alone is too
+  common.
+- Peak memory per image is one network chunk (`CHUNK_SIZE`) plus the
+  decoded bytes of that chunk, whatever the image size or sample count.
+- Both helpers write to `<output_file>.part` and rename it into place only
+  when the whole payload arrived, so a dropped connection never leaves a
+  truncated image behind.
+"""
+import base64
+import codecs
+import os
+from typing import BinaryIO, Callable, Iterable, Optional, Sequence
+
+CHUNK_SIZE = 64 * 1024
+
+# JSON escapes that can appear inside a base64 string ("\/" is legal JSON for "/");
+# `\uXXXX` escapes are decoded separately (`_FieldScanner._unescaped`)
+_B64_ESCAPES = {"/": "/", "n": "", "r": "", "t": ""}
+_B64_ALPHABET = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=")
+
+
+class Base64Writer:
+    """Incremental base64 decoder writing to a binary file object."""
+
+    def __init__(self, fileobj: BinaryIO):
+        self._file = fileobj
+        self._pending = ""
+        self.bytes_written = 0
+
+    def write(self, text: str) -> None:
+        text = self._pending + text
+        usable = len(text) - len(text) % 4
+        self._pending = text[usable:]
+        if usable:
+            self._emit(text[:usable])
+
+    def close(self) -> None:
+        if self._pending:
+            self._emit(self._pending + "=" * (-len(self._pending) % 4))
+            self._pending = ""
+
+    def _emit(self, text: str) -> None:
+        data = base64.b64decode(text)
+        self._file.write(data)
+        self.bytes_written += len(data)
+
+
+class _FieldScanner:
+    """Minimal streaming JSON tokenizer that pipes one string value into a `Base64Writer`.
+
+    It tracks just enough structure (container stack, current key) to know
+    which key a string value belongs to; everything else is skipped.
+    """
+
+    def __init__(self, fields: Sequence[str], writer: Base64Writer):
+        self._fields = set(fields)
+        self._writer = writer
+        self._stack = []  # (container type, key that introduced it)
+        self._key: Optional[str] = None  # key of the value about to be read
+        self._expect_key = False
+        self._in_string = False
+        self._string_kind = None  # "key", "target" or "skip"
+        self._key_buf = ""
+        self._escape = False
+        self._unicode: Optional[str] = None  # hex digits of a `\uXXXX` escape read so far
+        self.found = False
+        self.done = False
+
+    def _matches(self, key: Optional[str]) -> bool:
+        if key is None:
+            return False
+        if key in self._fields:
+            return True
+        parent = self._stack[-1][1] if self._stack else None
+        return parent is not None and f"{parent}.{key}" in self._fields
+
+    def feed(self, text: str) -> None:
+        i, n = 0, len(text)
+        while i < n and not self.done:
+            if self._in_string:
+                i = self._scan_string(text, i)
+                continue
+            ch = text[i]
+            i += 1
+            if ch == '"':
+                self._in_string = True
+                if self._expect_key:
+                    self._string_kind, self._key_buf = "key", ""
+                elif self._matches(self._key):
+                    self._string_kind = "target"
+                    self.found = True
+                else:
+                    self._string_kind = "skip"
+            elif ch == ":":
+                self._expect_key = False
+            elif ch in "{[":
+                self._stack.append((ch, self._key))
+                self._key = None
+                self._expect_key = ch == "{"
+            elif ch in "}]":
+                if self._stack:
+                    self._stack.pop()
+                self._key = None
+                self._expect_key = False
+            elif ch == ",":
+                self._key = None
+                self._expect_key = bool(self._stack) and self._stack[-1][0] == "{"
+
+    def _scan_string(self, text: str, i: int) -> int:
+        """Consume string content from `text[i:]`; return the next index to read."""
+        kind = self._string_kind
+        if self._unicode is not None:
+            digits = text[i:i + 4 - len(self._unicode)]
+            self._unicode += digits
+            if len(self._unicode) == 4:
+                self._unescaped(kind, chr(int(self._unicode, 16)))
+                self._unicode = None
+            return i + len(digits)
+        if self._escape:
+            self._escape = False
+            if text[i] == "u":
+                self._unicode = ""
+            elif kind == "target":
+                self._writer.write(_B64_ESCAPES.get(text[i], ""))
+            elif kind == "key":
+                self._key_buf += text[i]
+            return i + 1
+        quote = text.find('"', i)
+        backslash = text.find("\\", i)
+        stop = len(text) if quote == -1 else quote
+        if backslash != -1 and backslash < stop:
+            stop = backslash
+        if kind == "target":
+            self._writer.write(text[i:stop])
+        elif kind == "key":
+            self._key_buf += text[i:stop]
+        if stop == len(text):
+            return stop
+        if stop == backslash:
+            self._escape = True
+            return stop + 1
+        # closing quote
+        self._in_string = False
+        if kind == "key":
+            self._key = self._key_buf
+        elif kind == "target":
+            self._writer.close()
+            self.done = True
+        return stop + 1
+
+    def _unescaped(self, kind: Optional[str], ch: str) -> None:
+        """Handle the character a `\\uXXXX` escape stands for (`\\u002f` is "/")."""
+        if kind == "key":
+            self._key_buf += ch
+        elif kind == "target" and not ch.isspace():
+            if ch not in _B64_ALPHABET:
+                raise ValueError(f"Unexpected {ch!r} in base64 field")
+            self._writer.write(ch)
+
+
+def _write_atomically(output_file: str, write: Callable[[BinaryIO], bool]) -> bool:
+    tmp = f"{output_file}.part"
+    try:
+        with open(tmp, "wb") as f:
+            ok = write(f)
+        if ok:
+            os.replace(tmp, output_file)
+        return ok
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def save_b64_field(chunks: Iterable[bytes], fields: Sequence[str], output_file: str, on_chunk: Optional[Callable[[int], None]] = None) -> bool:
+    """Decode the first base64 string under `fields` in a streamed JSON body into `output_file`.
+
+    Returns False (and writes nothing) when the body has no such field.
+    `on_chunk` is called with the size of every network chunk read.
+    """
+
+    def write(f: BinaryIO) -> bool:
+        scanner = _FieldScanner(fields, Base64Writer(f))
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        for chunk in chunks:
+            if on_chunk:
+                on_chunk(len(chunk))
+            scanner.feed(decoder.decode(chunk))
+            if scanner.done:
+                return True
+        return False
+
+    return _write_atomically(output_file, write)
+
+
+def save_stream(chunks: Iterable[bytes], output_file: str, on_chunk: Optional[Callable[[int], None]] = None) -> bool:
+    """Write raw response chunks to `output_file`; returns True."""
+
+    def write(f: BinaryIO) -> bool:
+        for chunk in chunks:
+            if on_chunk:
+                on_chunk(len(chunk))
+            f.write(chunk)
+        return True
+
+    return _write_atomically(output_file, write)
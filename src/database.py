@@ -1,12 +1,17 @@
 
 import os
+import json
 import datetime
-from sqlalchemy import create_engine, MetaData, Table, Column, Integer, String, DateTime
+from typing import List, Optional, Tuple
+from sqlalchemy import create_engine, MetaData, Table, Column, Integer, String, Text, DateTime, select, func
 from sqlalchemy.orm import sessionmaker
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///generated_content.db")
 
-engine = create_engine(DATABASE_URL)
+# Created on first use by `get_engine()` so importing this module does not
+# open an engine (tests may assign `engine` / `SessionLocal` directly).
+engine = None
+SessionLocal = None
 metadata = MetaData()
 
 generated_content = Table(
@@ -21,13 +26,58 @@ generated_content = Table(
     Column("created_at", DateTime, default=datetime.datetime.utcnow),
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# One row per finished stage of a pipeline run, so a failed run can be
+# resumed without regenerating (and paying for) the stages that succeeded.
+pipeline_checkpoints = Table(
+    "pipeline_checkpoints",
+    metadata,
+    Column("run_id", String, primary_key=True),
+    Column("stage", String, primary_key=True),
+    Column("output", Text),
+    Column("created_at", DateTime, default=datetime.datetime.utcnow),
+)
+
+# Concepts generated ahead of time in bulk (`python -m src.main
+# --fill-concept-queue N`). A run claims the oldest unclaimed row for its
+# CONTENT_STYLE instead of calling the model.
+concept_queue = Table(
+    "concept_queue",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("theme", String),
+    Column("prompt", Text),
+    Column("style", String),
+    Column("created_at", DateTime, default=datetime.datetime.utcnow),
+    Column("claimed_at", DateTime, nullable=True),
+    Column("claimed_by", String, nullable=True),
+)
+
+def get_engine():
+    """Return the shared engine, creating it from `DATABASE_URL` on first use."""
+    global engine, SessionLocal
+    if engine is None:
+        engine = create_engine(os.getenv("DATABASE_URL", DATABASE_URL))
+    if SessionLocal is None:
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    return engine
+
+def reset_engine():
+    """Drop the cached engine so the next use re-reads `DATABASE_URL`."""
+    global engine, SessionLocal
+    if engine is not None:
+        engine.dispose()
+    engine = None
+    SessionLocal = None
+
+def _session():
+    get_engine()
+    return SessionLocal()
 
 def init_db():
-    metadata.create_all(engine)
+    metadata.create_all(get_engine())
 
 def save_generated_content(theme: str, prompt: str, image_url: str, video_url: str, caption: str):
-    with SessionLocal() as db:
+    with _session() as db:
         db.execute(
             generated_content.insert().values(
                 theme=theme,
@@ -38,3 +88,64 @@ def save_generated_content(theme: str, prompt: str, image_url: str, video_url: s
             )
         )
         db.commit()
+
+def save_checkpoint(run_id: str, stage: str, output) -> None:
+    """Persist the JSON-serialisable output of a finished stage."""
+    with _session() as db:
+        table = pipeline_checkpoints
+        db.execute(table.delete().where(table.c.run_id == run_id).where(table.c.stage == stage))
+        db.execute(table.insert().values(run_id=run_id, stage=stage, output=json.dumps(output)))
+        db.commit()
+
+def load_checkpoints(run_id: str) -> dict:
+    """Return {stage: output} for every stage checkpointed under `run_id`."""
+    table = pipeline_checkpoints
+    with _session() as db:
+        rows = db.execute(select(table.c.stage, table.c.output).where(table.c.run_id == run_id)).fetchall()
+    return {stage: json.loads(output) for stage, output in rows}
+
+def enqueue_concepts(concepts: List[Tuple[str, str]], style: str) -> int:
+    """Append (theme, prompt) pairs to the concept queue; returns how many were added."""
+    rows = [{"theme": theme, "prompt": prompt, "style": style} for theme, prompt in concepts]
+    if not rows:
+        return 0
+    with _session() as db:
+        db.execute(concept_queue.insert(), rows)
+        db.commit()
+    return len(rows)
+
+def claim_concept(run_id: str, style: str) -> Optional[Tuple[str, str]]:
+    """Claim the oldest unclaimed concept for `style` on behalf of `run_id`.
+
+    Returns (theme, prompt), or None when the queue is empty. The claim is a
+    conditional UPDATE (`claimed_at IS NULL`), so concurrent runs never get
+    the same row; a run that loses the race moves on to the next one.
+    """
+    table = concept_queue
+    with _session() as db:
+        while True:
+            row = db.execute(
+                select(table.c.id, table.c.theme, table.c.prompt)
+                .where(table.c.style == style)
+                .where(table.c.claimed_at.is_(None))
+                .order_by(table.c.id)
+                .limit(1)
+            ).first()
+            if row is None:
+                return None
+            claimed = db.execute(
+                table.update()
+                .where(table.c.id == row.id)
+                .where(table.c.claimed_at.is_(None))
+                .values(claimed_at=datetime.datetime.utcnow(), claimed_by=run_id)
+            )
+            db.commit()
+            if claimed.rowcount == 1:
+                return row.theme, row.prompt
+
+def count_unclaimed_concepts(style: str) -> int:
+    table = concept_queue
+    with _session() as db:
+        return db.execute(
+            select(func.count()).select_from(table).where(table.c.style == style).where(table.c.claimed_at.is_(None))
+        ).scalar_one()
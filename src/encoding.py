@@ -0,0 +1,99 @@
+"""Named x264 encoding profiles and per-platform output targets for ffmpeg renders.
+
+Usage:
+    args = encode_args()                    # VIDEO_ENCODE_PROFILE / VIDEO_PLATFORM
+    args = encode_args("draft", "shorts")
+    target = platform_target("reels")       # {"width": 1080, "height": 1920, "fps": 30, ...}
+    names = rendition_names()               # VIDEO_RENDITIONS, e.g. ["reels", "shorts", "preview"]
+
+Pick the default for a machine with `python -m bench.encode`.
+
+Behavior:
+- A profile sets the speed/size trade-off: `draft` (ultrafast, CRF 30) for
+  previews, `standard` (veryfast, CRF 23, the default) for posting, and
+  `archival` (slow, CRF 18) for a master copy.
+- A platform target sets what the upload has to satisfy: 1080x1920
+  portrait at 30 fps, H.264 High / yuv420p, a peak bitrate cap (capped CRF)
+  and 48 kHz AAC. `reels` follows Instagram's Reels limits and `shorts`
+  follows YouTube's recommended upload settings. `preview` is a 540x960
+  low-bitrate copy for review.
+- Every profile writes the `moov` atom at the front (`+faststart`), so
+  uploads and previews can start playing before the whole file arrives.
+- `VIDEO_RENDITIONS` (e.g. `reels,shorts,preview`) lists targets that
+  `VideoGenerator` renders together in one ffmpeg pass. Review-only
+  targets (`preview`) are never posted, so the list needs at least one
+  other target.
+- Unknown profile or platform names raise `ValueError`.
+"""
+import os
+from typing import List, Optional
+
+PROFILES = {
+    "draft": {"preset": "ultrafast", "crf": 30},
+    "standard": {"preset": "veryfast", "crf": 23},
+    "archival": {"preset": "slow", "crf": 18},
+}
+
+PLATFORMS = {
+    "reels": {"width": 1080, "height": 1920, "fps": 30, "level": "4.1", "maxrate": "6M", "bufsize": "12M", "audio_bitrate": "128k"},
+    "shorts": {"width": 1080, "height": 1920, "fps": 30, "level": "4.2", "maxrate": "8M", "bufsize": "16M", "audio_bitrate": "192k"},
+    "preview": {"width": 540, "height": 960, "fps": 30, "level": "3.1", "maxrate": "1500k", "bufsize": "3M", "audio_bitrate": "96k"},
+}
+
+# Targets for review only: never uploaded or saved as the piece's video
+REVIEW_ONLY = frozenset({"preview"})
+
+DEFAULT_PROFILE = "standard"
+DEFAULT_PLATFORM = "reels"
+
+
+def profile_name(profile: Optional[str] = None) -> str:
+    name = (profile or os.getenv("VIDEO_ENCODE_PROFILE") or DEFAULT_PROFILE).lower()
+    if name not in PROFILES:
+        raise ValueError(f"Unknown encoding profile {name!r}; expected one of {', '.join(PROFILES)}")
+    return name
+
+
+def platform_name(platform: Optional[str] = None) -> str:
+    name = (platform or os.getenv("VIDEO_PLATFORM") or DEFAULT_PLATFORM).lower()
+    if name not in PLATFORMS:
+        raise ValueError(f"Unknown video platform {name!r}; expected one of {', '.join(PLATFORMS)}")
+    return name
+
+
+def platform_target(platform: Optional[str] = None) -> dict:
+    return PLATFORMS[platform_name(platform)]
+
+
+def encode_args(profile: Optional[str] = None, platform: Optional[str] = None) -> List[str]:
+    """ffmpeg video encoder arguments for `profile` on `platform`."""
+    settings = PROFILES[profile_name(profile)]
+    target = platform_target(platform)
+    return [
+        "-c:v", "libx264",
+        "-preset", settings["preset"],
+        "-crf", str(settings["crf"]),
+        "-profile:v", "high",
+        "-level:v", target["level"],
+        "-pix_fmt", "yuv420p",
+        "-maxrate", target["maxrate"],
+        "-bufsize", target["bufsize"],
+        "-movflags", "+faststart",
+    ]
+
+
+def audio_args(platform: Optional[str] = None) -> List[str]:
+    """ffmpeg audio encoder arguments for `platform`."""
+    return ["-c:a", "aac", "-b:a", platform_target(platform)["audio_bitrate"], "-ar", "48000"]
+
+
+def rendition_names(renditions: Optional[str] = None) -> List[str]:
+    """Platform targets to render in one pass, from `renditions` or `VIDEO_RENDITIONS` (comma-separated); [] if unset."""
+    value = renditions if renditions is not None else os.getenv("VIDEO_RENDITIONS", "")
+    names = []
+    for name in value.split(","):
+        if name.strip() and platform_name(name.strip()) not in names:
+            names.append(platform_name(name.strip()))
+    if names and REVIEW_ONLY.issuperset(names):
+        raise ValueError(f"VIDEO_RENDITIONS {value!r} has no postable target; add one of {', '.join(p for p in PLATFORMS if p not in REVIEW_ONLY)}")
+    return names
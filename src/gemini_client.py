@@ -1,16 +1,45 @@
 
 import os
 import time
+import asyncio
+import contextvars
 import json
-import base64
 import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import Tuple, List, Optional
 
 import requests
 
+from . import b64_stream, http_session, json_stream, tracing
+from .artifact_cache import ArtifactCache
+from .llm_cache import LLMCache
+from .media_cache import FALLBACK_IMAGE_URL, PLACEHOLDER_IMAGE_URL, MediaCache
+from .provider_router import ProviderRouter
+from .rate_limiter import RateLimiter, retry_after_seconds
+
 
 logger = logging.getLogger(__name__)
 
+# IMAGE_PROVIDER values served by `ImageGenerator` against IMAGE_API_URL
+IMAGE_API_PROVIDERS = ("gork", "leonardo", "midjourney")
+
+
+class HedgeCancelled(RuntimeError):
+    """A hedged image request finished after another provider had already won."""
+
+
+def _hedge_path(output_file: str, provider: str) -> str:
+    root, ext = os.path.splitext(output_file)
+    return f"{root}.{provider}{ext}"
+
+
+def _discard(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
 
 class GeminiClient:
     """Gemini client wrapper.
@@ -43,8 +72,29 @@ class GeminiClient:
         self.image_model = os.getenv("GEMINI_IMAGE_MODEL") or "gemini-2.0-flash"
 
         self.image_provider = os.getenv("IMAGE_PROVIDER", "gemini")
+        # gork / leonardo / midjourney go through `ImageGenerator` only with USE_IMAGE_API=true
+        self.image_api_url = os.getenv("IMAGE_API_URL")
+        self.use_image_api = os.getenv("USE_IMAGE_API", "false").lower() in ("1", "true", "yes")
+        self._image_api_client = None
         self.stability_api_key = os.getenv("STABILITY_API_KEY")
         self.image_aspect_ratio = os.getenv("IMAGE_ASPECT_RATIO", "9:16")
+        # Hedged image generation: start the next provider after IMAGE_HEDGE_DELAY_S (see `_generate_image_hedged`)
+        self.image_hedge = os.getenv("IMAGE_HEDGE", "false").lower() in ("1", "true", "yes")
+        self.image_hedge_delay_s = float(os.getenv("IMAGE_HEDGE_DELAY_S", "15"))
+        self.artifact_cache = ArtifactCache()
+        self.llm_cache = LLMCache()
+        self.media_cache = MediaCache()
+        # shared per-model token buckets, so parallel workers stay under quota
+        self.rate_limiter = RateLimiter()
+        # rolling per-provider latency / success stats and circuit breakers (see `src/provider_router.py`)
+        self.router = ProviderRouter()
+        # Concepts are fresh by default (production wants new ideas each run);
+        # CONCEPT_CACHE=true reuses them, e.g. for test and staging runs.
+        self.cache_concepts = os.getenv("CONCEPT_CACHE", "false").lower() in ("1", "true", "yes")
+        # One model call for concept + caption instead of two (see `generate_concept_and_caption`)
+        self.fused_generation = os.getenv("FUSED_CONCEPT_CAPTION", "false").lower() in ("1", "true", "yes")
+        # Stream JSON-shaped replies and stop reading once the object closes (see `_call_api`)
+        self.stream_json = os.getenv("LLM_STREAM", "false").lower() in ("1", "true", "yes")
 
         # allow enabling SDK usage via parameter or env var GEMINI_USE_SDK
         env_use_sdk = os.getenv("GEMINI_USE_SDK", "true").lower() in ("1", "true", "yes")
@@ -72,260 +122,651 @@ class GeminiClient:
                     "Requested SDK-backed Gemini use but `google-generativeai` import/config failed: %s. Try: pip install google-generativeai" % exc
                 )
 
+        # SDK call shape, resolved once (see `_resolve_sdk_shape`); None means the HTTP path is used
+        self.sdk_shape = self._resolve_sdk_shape()
+        self._sdk_models = {}
+        self._sdk_models_lock = threading.Lock()
+
     def _download_fallback_image(self, output_file: str) -> str:
-        url = "https://images.unsplash.com/photo-1620641788421-7a1c342ea42e?q=80&w=1974&auto=format&fit=crop"
+        """Copy the stock fallback image to `output_file` from the media cache (downloaded once per TTL)."""
+        with tracing.span("http.fallback_image"):
+            try:
+                if self.media_cache.copy_to(FALLBACK_IMAGE_URL, output_file, timeout=30):
+                    return os.path.abspath(output_file)
+                print("Warning: Failed to download fallback image.")
+            except OSError as e:
+                print(f"Warning: Failed to download fallback image: {e}")
+            return FALLBACK_IMAGE_URL
+
+    # -- single attempts -------------------------------------------------
+    # The `_call_api` / `generate_image` retry loops (and their async
+    # variants) are built from these one-shot helpers so the sync and async
+    # paths share request/response handling and only differ in how they wait.
+
+    def _openrouter_headers(self) -> dict:
+        return {
+            "Authorization": f"Bearer {self.openrouter_api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "https://github.com/iqbalsdigra/model-ai-video",
+            "X-Title": "Model AI Video Generator"
+        }
+
+    @staticmethod
+    def _check_openrouter_response(resp) -> None:
+        if resp.status_code == 429:
+            resp.raise_for_status()  # HTTPError keeps the response (and Retry-After) for the back-off
+        if not resp.ok:
+            try:
+                error_info = resp.json()
+            except Exception:
+                error_info = resp.text
+            raise RuntimeError(f"OpenRouter API returned {resp.status_code}: {error_info}")
+
+    def _openrouter_chat(self, instruction: str, timeout: int = 60) -> str:
+        with self.router.track("llm:openrouter", neutral=self._is_quota_error), tracing.span("openrouter.chat", model=self.openrouter_model) as sp:
+            payload = {
+                "model": self.openrouter_model,
+                "messages": [{"role": "user", "content": instruction}]
+            }
+            resp = http_session.post("https://openrouter.ai/api/v1/chat/completions", json=payload, headers=self._openrouter_headers(), timeout=timeout)
+            sp.add_bytes(tracing.response_size(resp))
+            self._check_openrouter_response(resp)
+            return resp.json()["choices"][0]["message"]["content"]
+
+    def _openrouter_chat_json(self, instruction: str, timeout: int = 60) -> str:
+        """Streamed `_openrouter_chat` that returns as soon as the first JSON object in the reply closes."""
+        with self.router.track("llm:openrouter", neutral=self._is_quota_error), tracing.span("openrouter.chat", model=self.openrouter_model, stream=True) as sp:
+            payload = {
+                "model": self.openrouter_model,
+                "messages": [{"role": "user", "content": instruction}],
+                "stream": True,
+            }
+            resp = http_session.post("https://openrouter.ai/api/v1/chat/completions", json=payload, headers=self._openrouter_headers(), timeout=timeout, stream=True)
+            try:
+                self._check_openrouter_response(resp)
+                return json_stream.read_until_json(self._openrouter_deltas(resp, sp))
+            finally:
+                resp.close()  # drops the rest of the stream
+
+    @staticmethod
+    def _openrouter_deltas(resp, sp: tracing.Span):
+        """Yield the text deltas of an OpenRouter server-sent-events stream."""
+        # SSE is UTF-8, but requests decodes a charset-less text/event-stream as ISO-8859-1
+        for raw in resp.iter_lines():
+            line = raw.decode("utf-8")
+            if not line or not line.startswith("data:"):
+                continue  # blank separators and ": OPENROUTER PROCESSING" keep-alives
+            sp.add_bytes(len(raw))
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                return
+            try:
+                delta = json.loads(data)["choices"][0].get("delta") or {}
+            except (ValueError, KeyError, IndexError):
+                continue
+            if delta.get("content"):
+                yield delta["content"]
+
+    def _resolve_sdk_shape(self) -> Optional[str]:
+        """Work out which call shape the installed SDK exposes.
+
+        SDKs evolve, so a few common shapes are probed, newest first:
+        `generative_model` (google-generativeai v0.3+ `GenerativeModel`),
+        `chat.create`, `chat.completions.create` and `completions.create`.
+        Returns None when the SDK is unused or its shape is unknown.
+        """
+        genai = self._genai
+        if genai is None:
+            return None
+        if hasattr(genai, "GenerativeModel"):
+            return "generative_model"
+        chat = getattr(genai, "chat", None)
+        if chat is not None and hasattr(chat, "create"):
+            return "chat.create"
+        if chat is not None and hasattr(getattr(chat, "completions", None), "create"):
+            return "chat.completions"
+        if hasattr(getattr(genai, "completions", None), "create"):
+            return "completions"
+        logger.warning("Unrecognised google-generativeai SDK shape; using the HTTP path.")
+        return None
+
+    def _sdk_model(self, name: str):
+        """Return the cached `GenerativeModel` handle for `name`, creating it on first use."""
+        handle = self._sdk_models.get(name)
+        if handle is None:
+            with self._sdk_models_lock:
+                handle = self._sdk_models.get(name)
+                if handle is None:
+                    handle = self._sdk_models[name] = self._genai.GenerativeModel(name)
+        return handle
+
+    @staticmethod
+    def _sdk_chunk_text(chunk) -> str:
         try:
-            resp = requests.get(url, timeout=30)
+            return chunk.text
+        except ValueError:  # e.g. a final chunk carrying only the finish reason
+            return ""
+
+    def _sdk_generate(self, instruction: str, stream_json: bool = False) -> Optional[str]:
+        """Call the SDK once using the shape resolved at construction. Returns None if there is none.
+
+        With `stream_json`, a `GenerativeModel` reply is streamed and reading
+        stops once its first JSON object closes.
+        """
+        with self.router.track("llm:gemini-sdk", neutral=self._is_quota_error), tracing.span("gemini.sdk.generate", model=self.model, shape=self.sdk_shape, stream=stream_json):
+            if self.sdk_shape == "generative_model":
+                model_instance = self._sdk_model(self.model)
+                if stream_json:
+                    resp = model_instance.generate_content(instruction, stream=True)
+                    return json_stream.read_until_json(self._sdk_chunk_text(c) for c in resp)
+                return model_instance.generate_content(instruction).text
+
+            messages = [{"role": "user", "content": instruction}]
+            if self.sdk_shape == "chat.create":
+                resp = self._genai.chat.create(model=self.model, messages=messages)
+                # multiple SDK shapes: try to fetch textual content
+                try:
+                    return getattr(resp, "output_text") or str(resp)
+                except Exception:
+                    try:
+                        return resp.choices[0].message.content
+                    except Exception:
+                        return str(resp)
+
+            if self.sdk_shape == "chat.completions":
+                resp = self._genai.chat.completions.create(model=self.model, messages=messages)
+                try:
+                    return resp.choices[0].message.content
+                except Exception:
+                    return str(resp)
+
+            if self.sdk_shape == "completions":
+                resp = self._genai.completions.create(model=self.model, prompt=instruction)
+                try:
+                    return resp.choices[0].text
+                except Exception:
+                    return str(resp)
+
+            # If unknown SDK shape, fall back to HTTP path
+            return None
+
+    async def _sdk_generate_async(self, instruction: str, stream_json: bool = False) -> Optional[str]:
+        if self.sdk_shape == "generative_model":
+            model_instance = self._sdk_model(self.model)
+            if hasattr(model_instance, "generate_content_async"):
+                with self.router.track("llm:gemini-sdk", neutral=self._is_quota_error), tracing.span("gemini.sdk.generate", model=self.model, shape=self.sdk_shape, stream=stream_json):
+                    if not stream_json:
+                        resp = await model_instance.generate_content_async(instruction)
+                        return resp.text
+                    resp = await model_instance.generate_content_async(instruction, stream=True)
+                    extractor = json_stream.JSONExtractor()
+                    async for chunk in resp:
+                        if extractor.feed(self._sdk_chunk_text(chunk)):
+                            return extractor.text
+                    return extractor.buffer
+        return await asyncio.to_thread(self._sdk_generate, instruction, stream_json)
+
+    def _sdk_retry_delay(self, exc: Exception, attempt: int) -> Optional[float]:
+        """Decide what to do after an SDK error.
+
+        Returns the number of seconds to wait before retrying, None to fall
+        back to the HTTP path, or re-raises when there is no usable fallback.
+        """
+        if self._is_quota_error(exc) and attempt < 2:
+            return self._quota_delay(self._llm_rate_key(), exc, attempt)
+
+        # If we don't have a valid remote fallback URL, raise the SDK error directly
+        if not self.api_url or "localhost" in self.api_url:
+            # Help debug 404s by listing available models
+            if "404" in str(exc):
+                print(f"\nDEBUG: Model '{self.model}' not found. Listing available models for your key:")
+                try:
+                    for m in self._genai.list_models():
+                        if "generateContent" in m.supported_generation_methods:
+                            print(f" - {m.name}")
+                except Exception:
+                    pass
+            raise exc
+        logger.exception("SDK call to Gemini failed, falling back to HTTP: %s", exc)
+        return None
+
+    def _http_agent_call(self, instruction: str, timeout: int = 60) -> str:
+        with self.router.track("llm:gemini-http", neutral=self._is_quota_error), tracing.span("gemini.http.agent", model=self.model) as sp:
+            headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+            payload = {"model": self.model, "instruction": instruction}
+            resp = http_session.post(self.api_url, json=payload, headers=headers, timeout=timeout)
+            sp.add_bytes(tracing.response_size(resp))
             resp.raise_for_status()
-            with open(output_file, "wb") as f:
-                f.write(resp.content)
-            return os.path.abspath(output_file)
-        except Exception as e:
-            print(f"Warning: Failed to download fallback image: {e}")
-            return url
+            # Prefer JSON if available
+            try:
+                return json.dumps(resp.json())
+            except Exception:
+                return resp.text
+
+    @staticmethod
+    def _is_quota_error(exc: Exception) -> bool:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+        return status == 429 or "429" in str(exc) or "ResourceExhausted" in type(exc).__name__
+
+    def _llm_rate_key(self) -> str:
+        return f"openrouter:{self.openrouter_model}" if self.use_openrouter else f"gemini:{self.model}"
+
+    def _image_rate_key(self) -> str:
+        return f"gemini:{self.image_model}"
+
+    def _quota_delay(self, rate_key: str, exc: Exception, attempt: int) -> float:
+        """Record a 429 with the rate limiter; returns the seconds the caller itself must still sleep.
+
+        The wait is the server's `Retry-After` / retry hint, else 5s doubling
+        per attempt. It is published to the shared limiter so every worker
+        backs off, and the caller's next `acquire` waits it out; only when
+        the block could not be recorded (limiter disabled or its store
+        unavailable) does the caller sleep here.
+        """
+        wait = retry_after_seconds(exc)
+        if wait is None:
+            wait = 5.0 * 2 ** attempt
+        print(f"Quota exceeded (429) for {rate_key}. Retrying in {wait:.0f}s...")
+        return 0.0 if self.rate_limiter.penalize(rate_key, wait) else wait
+
+    def _llm_model(self) -> str:
+        return self.openrouter_model if self.use_openrouter else self.model
+
+    def _sdk_allowed(self) -> bool:
+        """Whether to try the SDK; skipped while its circuit is open and the HTTP path can take over."""
+        if not (self.use_sdk and self.sdk_shape is not None):
+            return False
+        return not self.api_url or self.router.allow("llm:gemini-sdk")
 
-    def _call_api(self, instruction: str, timeout: int = 60) -> str:
+    def _backend_name(self) -> str:
+        if self.use_openrouter:
+            return "openrouter"
+        if self.use_sdk and self.sdk_shape is not None:
+            return "sdk"
+        return "http"
+
+    def _check_call_config(self) -> None:
+        if self.use_openrouter:
+            if not self.openrouter_api_key:
+                raise RuntimeError("OPENROUTER_API_KEY is required when USE_OPENROUTER is true")
+            return
+
+        if not self.api_key:
+            raise RuntimeError("GEMINI_API_KEY must be set for non-dry runs")
+
+        if not self.use_sdk and not self.api_url:
+            raise RuntimeError("GEMINI_API_URL must be set when not using the SDK")
+
+    def _call_api(self, instruction: str, timeout: int = 60, use_cache: bool = True, stream_json: bool = False) -> str:
         """Generic POST caller to the configured Gemini API URL.
 
         Expects the endpoint to return either JSON or plain text. On success it
         returns the textual content for downstream parsing.
+
+        Responses are cached per (backend, model, instruction) in the LLM
+        cache (see `src/llm_cache.py`); pass `use_cache=False` for a fresh
+        answer. Fresh answers still refresh the cache entry.
+
+        `stream_json=True` marks a prompt whose answer is one JSON object.
+        With `LLM_STREAM=true` the OpenRouter and SDK backends then stream
+        the reply and return just that object as soon as it closes, skipping
+        any trailing chatter (see `src/json_stream.py`). The HTTP agent path
+        always returns the whole response.
         """
+        with tracing.span("gemini.call_api", backend=self._backend_name(), model=self.model) as sp:
+            key = self.llm_cache.key(self._backend_name(), self._llm_model(), instruction)
+            if use_cache:
+                cached = self.llm_cache.get(key)
+                if cached is not None:
+                    sp.set(cache="hit")
+                    return cached
+            sp.set(cache="miss" if use_cache else "bypass")
+            text = self._call_api_uncached(instruction, timeout, sp, stream_json and self.stream_json)
+            self.llm_cache.set(key, text)
+            return text
+
+    def _call_api_uncached(self, instruction: str, timeout: int, sp: tracing.Span, stream_json: bool = False) -> str:
+        """Call the configured backend, with retries.
+
+        Every attempt first takes a token from the model's rate-limit bucket;
+        a 429 blocks that bucket for all workers (see `_quota_delay`).
+        """
+        self._check_call_config()
+        rate_key = self._llm_rate_key()
+
         # 1. OpenRouter Path (High Priority)
         if self.use_openrouter:
-            if not self.openrouter_api_key:
-                raise RuntimeError("OPENROUTER_API_KEY is required when USE_OPENROUTER is true")
-            
-            headers = {
-                "Authorization": f"Bearer {self.openrouter_api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": "https://github.com/iqbalsdigra/model-ai-video",
-                "X-Title": "Model AI Video Generator"
-            }
-            payload = {
-                "model": self.openrouter_model,
-                "messages": [{"role": "user", "content": instruction}]
-            }
             last_exc = None
             for attempt in range(3):
+                self.rate_limiter.acquire(rate_key)
                 try:
-                    resp = requests.post("https://openrouter.ai/api/v1/chat/completions", json=payload, headers=headers, timeout=timeout)
-                    if not resp.ok:
-                        if resp.status_code >= 500 and attempt < 2:
-                            time.sleep(2)
-                            continue
-                        try:
-                            error_info = resp.json()
-                        except Exception:
-                            error_info = resp.text
-                        raise RuntimeError(f"OpenRouter API returned {resp.status_code}: {error_info}")
-                    return resp.json()["choices"][0]["message"]["content"]
+                    if stream_json:
+                        return self._openrouter_chat_json(instruction, timeout=timeout)
+                    return self._openrouter_chat(instruction, timeout=timeout)
                 except Exception as e:
                     last_exc = e
-                    if attempt < 2: time.sleep(2)
+                    if attempt < 2:
+                        sp.add_retry()
+                        delay = self._quota_delay(rate_key, e, attempt) if self._is_quota_error(e) else 2
+                        if delay:
+                            time.sleep(delay)
             raise RuntimeError(f"OpenRouter API call failed: {last_exc}")
 
-        if not self.api_key:
-            raise RuntimeError("GEMINI_API_KEY must be set for non-dry runs")
-
-        if not self.use_sdk and not self.api_url:
-            raise RuntimeError("GEMINI_API_URL must be set when not using the SDK")
-
         # If SDK usage was requested, prefer the SDK path
-        if self.use_sdk and self._genai is not None:
+        if self._sdk_allowed():
             for attempt in range(3):
+                self.rate_limiter.acquire(rate_key)
                 try:
-                    # Try a few common SDK call shapes; SDKs may evolve so we defensively try variations
-                    # Modern google-generativeai SDK (v0.3+)
-                    if hasattr(self._genai, "GenerativeModel"):
-                        model_instance = self._genai.GenerativeModel(self.model)
-                        resp = model_instance.generate_content(instruction)
-                        return resp.text
-
-                    # Preferred (newer) style: genai.chat.create or genai.chat.completions.create
-                    if hasattr(self._genai, "chat") and hasattr(self._genai.chat, "create"):
-                        resp = self._genai.chat.create(model=self.model, messages=[{"role": "user", "content": instruction}])
-                        # multiple SDK shapes: try to fetch textual content
-                        try:
-                            return getattr(resp, "output_text") or str(resp)
-                        except Exception:
-                            try:
-                                return resp.choices[0].message.content
-                            except Exception:
-                                return str(resp)
-                    # Older style: genai.chat.completions.create
-                    if hasattr(self._genai, "chat") and hasattr(self._genai.chat, "completions") and hasattr(self._genai.chat.completions, "create"):
-                        resp = self._genai.chat.completions.create(model=self.model, messages=[{"role": "user", "content": instruction}])
-                        try:
-                            return resp.choices[0].message.content
-                        except Exception:
-                            return str(resp)
-
-                    # If SDK doesn't expose chat, try a generic text_completion entrypoint
-                    if hasattr(self._genai, "completions") and hasattr(self._genai.completions, "create"):
-                        resp = self._genai.completions.create(model=self.model, prompt=instruction)
-                        try:
-                            return resp.choices[0].text
-                        except Exception:
-                            return str(resp)
-
-                    # If unknown SDK shape, fall back to HTTP path (below)
-                except Exception as exc:
-                    # Check for ResourceExhausted (429)
-                    is_quota = "429" in str(exc) or "ResourceExhausted" in str(type(exc).__name__)
-                    if is_quota and attempt < 2:
-                        sleep_time = 30 * (attempt + 1)
-                        print(f"Gemini quota exceeded (429). Retrying in {sleep_time}s...")
-                        time.sleep(sleep_time)
-                        continue
-
-                    # If we don't have a valid remote fallback URL, raise the SDK error directly
-                    if not self.api_url or "localhost" in self.api_url:
-                        # Help debug 404s by listing available models
-                        if "404" in str(exc):
-                            print(f"\nDEBUG: Model '{self.model}' not found. Listing available models for your key:")
-                            try:
-                                for m in self._genai.list_models():
-                                    if "generateContent" in m.supported_generation_methods:
-                                        print(f" - {m.name}")
-                            except Exception:
-                                pass
-                        raise exc
-                    logger.exception("SDK call to Gemini failed, falling back to HTTP: %s", exc)
+                    text = self._sdk_generate(instruction, stream_json)
+                    if text is not None:
+                        return text
                     break
-
-        headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
-        payload = {"model": self.model, "instruction": instruction}
+                except Exception as exc:
+                    delay = self._sdk_retry_delay(exc, attempt)
+                    if delay is None:
+                        break
+                    sp.add_retry()
+                    if delay:
+                        time.sleep(delay)
 
         # Basic retry logic for HTTP path
         last_exc = None
         for attempt in range(3):
+            self.rate_limiter.acquire(rate_key)
             try:
-                resp = requests.post(self.api_url, json=payload, headers=headers, timeout=timeout)
-                resp.raise_for_status()
-                # Prefer JSON if available
-                try:
-                    return json.dumps(resp.json())
-                except Exception:
-                    return resp.text
+                return self._http_agent_call(instruction, timeout=timeout)
             except Exception as exc:  # requests.exceptions.RequestException covers network issues
                 last_exc = exc
-                backoff = 2 ** attempt
-                logger.warning("Gemini API call failed (attempt %s): %s — retrying in %s s", attempt + 1, exc, backoff)
-                time.sleep(backoff)
+                sp.add_retry()
+                if self._is_quota_error(exc):
+                    backoff = self._quota_delay(rate_key, exc, attempt)
+                else:
+                    backoff = 2 ** attempt
+                    logger.warning("Gemini API call failed (attempt %s): %s — retrying in %s s", attempt + 1, exc, backoff)
+                if backoff:
+                    time.sleep(backoff)
 
         raise RuntimeError("Gemini API call failed after retries") from last_exc
 
-    def generate_concept(self) -> Tuple[str, str]:
-        """Return (theme, image_prompt).
+    async def _call_api_async(self, instruction: str, timeout: int = 60, use_cache: bool = True, stream_json: bool = False) -> str:
+        """Async variant of `_call_api`.
 
-        The instruction asks the model to return a small JSON object with keys
-        `theme` and `prompt`. The function attempts to parse the model output as
-        JSON and falls back to simple heuristics.
+        Requests run on the default executor; retry and quota back-off waits
+        use `asyncio.sleep`, so a retrying call does not hold a thread.
         """
-        if self.dry_run:
-            theme = "Sunday Morning"
-            prompt = (
-                "Aria, a relaxed urban lifestyle portrait: warm golden hour light, soft bokeh, "
-                "wearing a denim jacket, subtle smile — photorealistic, full-body, film grain"
-            )
-            return theme, prompt
+        with tracing.span("gemini.call_api", backend=self._backend_name(), model=self.model) as sp:
+            key = self.llm_cache.key(self._backend_name(), self._llm_model(), instruction)
+            if use_cache:
+                cached = await asyncio.to_thread(self.llm_cache.get, key)
+                if cached is not None:
+                    sp.set(cache="hit")
+                    return cached
+            sp.set(cache="miss" if use_cache else "bypass")
+            text = await self._call_api_uncached_async(instruction, timeout, sp, stream_json and self.stream_json)
+            await asyncio.to_thread(self.llm_cache.set, key, text)
+            return text
+
+    async def _call_api_uncached_async(self, instruction: str, timeout: int, sp: tracing.Span, stream_json: bool = False) -> str:
+        """Async variant of `_call_api_uncached`; waits use `asyncio.sleep`."""
+        self._check_call_config()
+        rate_key = self._llm_rate_key()
+
+        if self.use_openrouter:
+            last_exc = None
+            for attempt in range(3):
+                await self.rate_limiter.acquire_async(rate_key)
+                try:
+                    chat = self._openrouter_chat_json if stream_json else self._openrouter_chat
+                    return await asyncio.to_thread(chat, instruction, timeout)
+                except Exception as e:
+                    last_exc = e
+                    if attempt < 2:
+                        sp.add_retry()
+                        delay = self._quota_delay(rate_key, e, attempt) if self._is_quota_error(e) else 2
+                        if delay:
+                            await asyncio.sleep(delay)
+            raise RuntimeError(f"OpenRouter API call failed: {last_exc}")
+
+        if self._sdk_allowed():
+            for attempt in range(3):
+                await self.rate_limiter.acquire_async(rate_key)
+                try:
+                    text = await self._sdk_generate_async(instruction, stream_json)
+                    if text is not None:
+                        return text
+                    break
+                except Exception as exc:
+                    delay = self._sdk_retry_delay(exc, attempt)
+                    if delay is None:
+                        break
+                    sp.add_retry()
+                    if delay:
+                        await asyncio.sleep(delay)
+
+        last_exc = None
+        for attempt in range(3):
+            await self.rate_limiter.acquire_async(rate_key)
+            try:
+                return await asyncio.to_thread(self._http_agent_call, instruction, timeout)
+            except Exception as exc:
+                last_exc = exc
+                sp.add_retry()
+                if self._is_quota_error(exc):
+                    backoff = self._quota_delay(rate_key, exc, attempt)
+                else:
+                    backoff = 2 ** attempt
+                    logger.warning("Gemini API call failed (attempt %s): %s — retrying in %s s", attempt + 1, exc, backoff)
+                if backoff:
+                    await asyncio.sleep(backoff)
+
+        raise RuntimeError("Gemini API call failed after retries") from last_exc
+
+    # -- concept / caption ---------------------------------------------
 
+    def _concept_instruction(self) -> str:
         style = os.getenv("CONTENT_STYLE", "cinematic")
-        instruction = (
+        return (
             "You are a creative director for short-form social content.\n"
             "Produce a concise JSON object with two fields: `theme` (short title) and `prompt` (an image-generation prompt).\n"
             f"The visual style must be: {style}.\n"
             "Keep values short. Example output: {\"theme\": \"Sunday Morning\", \"prompt\": \"Aria, ...\"}\n"
         )
 
-        raw = self._call_api(instruction)
-
-        # Try to parse JSON directly
-        try:
-            data = json.loads(raw)
-            theme = data.get("theme")
-            prompt = data.get("prompt")
-            if theme and prompt:
-                return theme, prompt
-        except Exception:
-            pass
-
-        # Fallback: scan for JSON in the text
-        try:
-            start = raw.find("{")
-            end = raw.rfind("}")
-            if start != -1 and end != -1 and end > start:
-                snippet = raw[start : end + 1]
-                data = json.loads(snippet)
-                return data.get("theme"), data.get("prompt")
-        except Exception:
-            logger.exception("Failed to parse JSON snippet from Gemini response")
+    def _parse_concept(self, raw: str) -> Tuple[str, str]:
+        # First JSON object in the text (prose, code fences and trailing chatter are skipped)
+        data = json_stream.extract_json(raw)
+        if isinstance(data, dict):
+            return data.get("theme"), data.get("prompt")
 
         # Last resort: return the raw text as 'prompt' and a generic theme
         return "Untitled", raw[:1000]
 
-    def draft_caption_and_hashtags(self, theme: str, image_prompt: str) -> Tuple[str, List[str]]:
+    def generate_concept(self, use_cache: Optional[bool] = None) -> Tuple[str, str]:
+        """Return (theme, image_prompt).
+
+        The instruction asks the model to return a small JSON object with keys
+        `theme` and `prompt`. The function attempts to parse the model output as
+        JSON and falls back to simple heuristics.
+
+        The instruction only changes with `CONTENT_STYLE`, so a cached answer
+        would repeat the same concept; `use_cache` defaults to `CONCEPT_CACHE`
+        (off).
+        """
+        if self.dry_run:
+            return self._dry_run_concept()
+        use_cache = self.cache_concepts if use_cache is None else use_cache
+        return self._parse_concept(self._call_api(self._concept_instruction(), use_cache=use_cache, stream_json=True))
+
+    async def generate_concept_async(self, use_cache: Optional[bool] = None) -> Tuple[str, str]:
         if self.dry_run:
-            caption = f"Slow mornings with Aria — savor the little moments. #SundayMorning"
-            hashtags = ["#aria", "#sunday", "#lifestyle", "#goldenhour", "#photography"]
-            return caption, hashtags
+            return self._dry_run_concept()
+        use_cache = self.cache_concepts if use_cache is None else use_cache
+        return self._parse_concept(await self._call_api_async(self._concept_instruction(), use_cache=use_cache, stream_json=True))
 
-        instruction = (
+    def _dry_run_concept(self) -> Tuple[str, str]:
+        theme = "Sunday Morning"
+        prompt = (
+            "Aria, a relaxed urban lifestyle portrait: warm golden hour light, soft bokeh, "
+            "wearing a denim jacket, subtle smile — photorealistic, full-body, film grain"
+        )
+        return theme, prompt
+
+    def _caption_instruction(self, theme: str, image_prompt: str) -> str:
+        return (
             f"You are a social media copywriter. Given the theme `{theme}` and the image prompt below, write a short engaging Instagram caption (2-3 sentences) and a list of 10-15 relevant hashtags as JSON with keys `caption` and `hashtags`.\n\nPrompt:\n{image_prompt}"
         )
 
-        raw = self._call_api(instruction)
-
-        try:
-            data = json.loads(raw)
-            caption = data.get("caption")
-            hashtags = data.get("hashtags") or []
-            return caption, hashtags
-        except Exception:
-            # Try to find JSON substring
-            try:
-                start = raw.find("{")
-                end = raw.rfind("}")
-                if start != -1 and end != -1 and end > start:
-                    snippet = raw[start : end + 1]
-                    data = json.loads(snippet)
-                    return data.get("caption"), data.get("hashtags") or []
-            except Exception:
-                logger.exception("Failed to parse caption/hashtags from Gemini response")
+    def _parse_caption(self, raw: str) -> Tuple[str, List[str]]:
+        data = json_stream.extract_json(raw)
+        if isinstance(data, dict):
+            return data.get("caption"), data.get("hashtags") or []
 
         # Last resort: return raw text as caption and empty hashtags
         return raw.strip(), []
 
-    def generate_image(self, prompt: str, output_file: str = "generated_image.png") -> str:
-        """Generate an image using Gemini (Imagen 3) and save it locally."""
+    def _dry_run_caption(self) -> Tuple[str, List[str]]:
+        caption = f"Slow mornings with Aria — savor the little moments. #SundayMorning"
+        hashtags = ["#aria", "#sunday", "#lifestyle", "#goldenhour", "#photography"]
+        return caption, hashtags
+
+    def draft_caption_and_hashtags(self, theme: str, image_prompt: str, use_cache: bool = True) -> Tuple[str, List[str]]:
         if self.dry_run:
-            return "https://images.unsplash.com/photo-1503264116251-35a269479413"
+            return self._dry_run_caption()
+        return self._parse_caption(self._call_api(self._caption_instruction(theme, image_prompt), use_cache=use_cache, stream_json=True))
 
-        if self.use_openrouter_for_images:
-            print("Generating image with OpenRouter...")
-            if not self.openrouter_api_key:
-                raise RuntimeError("OPENROUTER_API_KEY is required when USE_OPENROUTER_FOR_IMAGES is true")
-            
+    async def draft_caption_and_hashtags_async(self, theme: str, image_prompt: str, use_cache: bool = True) -> Tuple[str, List[str]]:
+        if self.dry_run:
+            return self._dry_run_caption()
+        return self._parse_caption(await self._call_api_async(self._caption_instruction(theme, image_prompt), use_cache=use_cache, stream_json=True))
+
+    def _fused_instruction(self) -> str:
+        style = os.getenv("CONTENT_STYLE", "cinematic")
+        return (
+            "You are a creative director and social media copywriter for short-form social content.\n"
+            "Produce one concise JSON object with four fields: `theme` (short title), `prompt` (an image-generation prompt), "
+            "`caption` (a short engaging Instagram caption, 2-3 sentences, for that theme and image) and `hashtags` "
+            "(a list of 10-15 relevant hashtags).\n"
+            f"The visual style must be: {style}.\n"
+            "Keep values short. Example output: {\"theme\": \"Sunday Morning\", \"prompt\": \"Aria, ...\", "
+            "\"caption\": \"...\", \"hashtags\": [\"#aria\", \"...\"]}\n"
+        )
+
+    def _parse_fused(self, raw: str) -> Optional[Tuple[str, str, str, List[str]]]:
+        """Return (theme, prompt, caption, hashtags), or None if any field is missing."""
+        data = json_stream.extract_json(raw)
+        if not isinstance(data, dict):
+            return None
+        theme, prompt, caption = data.get("theme"), data.get("prompt"), data.get("caption")
+        hashtags = data.get("hashtags")
+        if isinstance(hashtags, str):
+            hashtags = hashtags.split()
+        if not (theme and prompt and caption) or not isinstance(hashtags, list):
+            return None
+        return theme, prompt, caption, hashtags
+
+    def generate_concept_and_caption(self, use_cache: Optional[bool] = None) -> Tuple[str, str, str, List[str]]:
+        """Return (theme, image_prompt, caption, hashtags) from a single model call.
+
+        Halves the round-trips (and 429 exposure) of calling `generate_concept`
+        then `draft_caption_and_hashtags`. If the response is missing a field,
+        falls back to those two calls. Caching follows `generate_concept`.
+        """
+        if self.dry_run:
+            return self._dry_run_concept() + self._dry_run_caption()
+        use_cache = self.cache_concepts if use_cache is None else use_cache
+        fused = self._parse_fused(self._call_api(self._fused_instruction(), use_cache=use_cache, stream_json=True))
+        if fused is not None:
+            return fused
+        print("Fused concept/caption response incomplete; falling back to separate calls.")
+        theme, prompt = self.generate_concept(use_cache=use_cache)
+        caption, hashtags = self.draft_caption_and_hashtags(theme, prompt)
+        return theme, prompt, caption, hashtags
+
+    async def generate_concept_and_caption_async(self, use_cache: Optional[bool] = None) -> Tuple[str, str, str, List[str]]:
+        if self.dry_run:
+            return self._dry_run_concept() + self._dry_run_caption()
+        use_cache = self.cache_concepts if use_cache is None else use_cache
+        fused = self._parse_fused(await self._call_api_async(self._fused_instruction(), use_cache=use_cache, stream_json=True))
+        if fused is not None:
+            return fused
+        print("Fused concept/caption response incomplete; falling back to separate calls.")
+        theme, prompt = await self.generate_concept_async(use_cache=use_cache)
+        caption, hashtags = await self.draft_caption_and_hashtags_async(theme, prompt)
+        return theme, prompt, caption, hashtags
+
+    def _concepts_instruction(self, n: int) -> str:
+        style = os.getenv("CONTENT_STYLE", "cinematic")
+        return (
+            "You are a creative director for short-form social content.\n"
+            f"Produce a JSON array of {n} distinct concepts. Each element is an object with two fields: "
+            "`theme` (short title) and `prompt` (an image-generation prompt). No two themes may repeat.\n"
+            f"The visual style must be: {style}.\n"
+            "Keep values short. Example output: [{\"theme\": \"Sunday Morning\", \"prompt\": \"Aria, ...\"}, "
+            "{\"theme\": \"Night Market\", \"prompt\": \"Aria, ...\"}]\n"
+        )
+
+    def _parse_concepts(self, raw: str) -> List[Tuple[str, str]]:
+        """Return the distinct (theme, prompt) pairs in a batch response; malformed items are dropped."""
+        # A bare array, or an object wrapping it as `concepts`
+        data = json_stream.extract_json(raw, "[")
+        if data is None:
+            data = json_stream.extract_json(raw)
+        if isinstance(data, dict):
+            data = data.get("concepts")
+        if not isinstance(data, list):
+            return []
+
+        concepts = []
+        seen = set()
+        for item in data:
+            if not isinstance(item, dict):
+                continue
+            theme, prompt = item.get("theme"), item.get("prompt")
+            if not (isinstance(theme, str) and isinstance(prompt, str) and theme.strip() and prompt.strip()):
+                continue
+            if theme.strip().lower() in seen:
+                continue
+            seen.add(theme.strip().lower())
+            concepts.append((theme.strip(), prompt.strip()))
+        return concepts
+
+    def _dry_run_concepts(self, n: int) -> List[Tuple[str, str]]:
+        theme, prompt = self._dry_run_concept()
+        return [(f"{theme} #{i + 1}", prompt) for i in range(n)]
+
+    def generate_concepts(self, n: int) -> List[Tuple[str, str]]:
+        """Return up to `n` distinct (theme, image_prompt) pairs from a single model call.
+
+        Used to fill the concept queue ahead of time (`--fill-concept-queue`).
+        The response is never served from the LLM cache, since a repeated
+        batch would only duplicate concepts already queued. The model may
+        return fewer than `n` usable pairs.
+        """
+        if self.dry_run:
+            return self._dry_run_concepts(n)
+        return self._parse_concepts(self._call_api(self._concepts_instruction(n), timeout=120, use_cache=False))[:n]
+
+    async def generate_concepts_async(self, n: int) -> List[Tuple[str, str]]:
+        if self.dry_run:
+            return self._dry_run_concepts(n)
+        return self._parse_concepts(await self._call_api_async(self._concepts_instruction(n), timeout=120, use_cache=False))[:n]
+
+    # -- images ----------------------------------------------------------
+
+    def _generate_image_openrouter(self, prompt: str, output_file: str) -> str:
+        with tracing.span("image.openrouter", model=self.openrouter_image_model) as sp:
             headers = {"Authorization": f"Bearer {self.openrouter_api_key}"}
             payload = {"model": self.openrouter_image_model, "prompt": prompt, "n": 1}
-            try:
-                resp = requests.post("https://openrouter.ai/api/v1/images/generations", json=payload, headers=headers, timeout=120)
+            resp = http_session.post("https://openrouter.ai/api/v1/images/generations", json=payload, headers=headers, timeout=120, stream=True)
+            with resp:
                 resp.raise_for_status()
-                data = resp.json()
-                b64_data = data['data'][0]['b64_json']
-                with open(output_file, "wb") as f:
-                    f.write(base64.b64decode(b64_data))
-                return os.path.abspath(output_file)
-            except Exception as e:
-                logger.exception("OpenRouter image generation failed")
-                print(f"Warning: OpenRouter image generation failed ({e}). Falling back to Gemini...")
-                # Do not return; let execution continue to the Gemini block below
+                chunks = resp.iter_content(chunk_size=b64_stream.CHUNK_SIZE)
+                if not b64_stream.save_b64_field(chunks, ("b64_json",), output_file, on_chunk=sp.add_bytes):
+                    raise RuntimeError("No b64_json image data in OpenRouter response")
+            return os.path.abspath(output_file)
 
-        if self.image_provider == "stability":
-            print("Generating image with Stability AI (Ultra)...")
-            if not self.stability_api_key:
-                raise RuntimeError("STABILITY_API_KEY is required for Stability AI.")
-            
+    def _generate_image_stability(self, prompt: str, output_file: str) -> str:
+        with tracing.span("image.stability") as sp:
             # Use Stability AI Ultra endpoint
             url = "https://api.stability.ai/v2beta/stable-image/generate/ultra"
             headers = {
@@ -334,21 +775,35 @@ class GeminiClient:
             }
             # Stability API requires multipart/form-data
             payload = {"prompt": prompt, "output_format": "png", "aspect_ratio": self.image_aspect_ratio}
-            try:
-                # files={"none": ''} forces requests to send multipart/form-data even without a file
-                resp = requests.post(url, headers=headers, files={"none": ''}, data=payload, timeout=60)
+            # files={"none": ''} forces requests to send multipart/form-data even without a file
+            resp = http_session.post(url, headers=headers, files={"none": ''}, data=payload, timeout=60, stream=True)
+            with resp:
                 if resp.status_code == 200:
-                    with open(output_file, "wb") as f:
-                        f.write(resp.content)
+                    b64_stream.save_stream(resp.iter_content(chunk_size=b64_stream.CHUNK_SIZE), output_file, on_chunk=sp.add_bytes)
                     return os.path.abspath(output_file)
-                else:
-                    raise RuntimeError(f"Stability AI Error: {resp.text}")
-            except Exception as e:
-                logger.exception("Stability AI image generation failed")
-                print(f"Warning: Stability AI image generation failed ({e}). Falling back to Gemini...")
-                # Fall through to Gemini
+                raise RuntimeError(f"Stability AI Error: {resp.text}")
+
+    def _uses_image_api(self) -> bool:
+        return self.use_image_api and self.image_provider in IMAGE_API_PROVIDERS and bool(self.image_api_url)
+
+    def _generate_image_via_image_api(self, prompt: str, output_file: str) -> str:
+        """Generate with `ImageGenerator` (IMAGE_API_URL) and download the result locally."""
+        if self._image_api_client is None:
+            from .image_gen import ImageGenerator
+
+            self._image_api_client = ImageGenerator(api_url=self.image_api_url, dry_run=False, provider=self.image_provider)
+        url = self._image_api_client.generate_from_prompt(prompt)
+        if not isinstance(url, str) or not url.startswith(("http://", "https://")):
+            raise RuntimeError(f"{self.image_provider} returned no image URL: {url}")
+        with tracing.span("image.download", provider=self.image_provider) as sp:
+            resp = http_session.get(url, stream=True, timeout=60)
+            with resp:
+                resp.raise_for_status()
+                b64_stream.save_stream(resp.iter_content(chunk_size=b64_stream.CHUNK_SIZE), output_file, on_chunk=sp.add_bytes)
+        return os.path.abspath(output_file)
 
-        print("Generating image with Gemini...")
+    def _gemini_image_request(self, prompt: str) -> Tuple[str, dict, dict, bool]:
+        """Return (url, payload, headers, is_imagen) for the Gemini image call."""
         # Determine endpoint and payload based on model name
         # Imagen models use the :predict endpoint
         # Gemini models (2.0+) use the :generateContent endpoint
@@ -377,46 +832,311 @@ class GeminiClient:
             "Content-Type": "application/json",
             "x-goog-api-key": self.api_key
         }
+        return url, payload, headers, is_imagen
+
+    def _gemini_image_attempt(self, url: str, payload: dict, headers: dict, is_imagen: bool, output_file: str) -> str:
+        """One Gemini / Imagen image call.
+
+        The response is streamed and its base64 image (the first
+        `bytesBase64Encoded` prediction, or the first `inlineData` part) is
+        decoded straight to `output_file`, so peak memory stays at one chunk
+        however large the image is.
+        """
+        with tracing.span("image.gemini", model=self.image_model) as sp:
+            resp = http_session.post(url, json=payload, headers=headers, timeout=60, stream=True)
+            with resp:
+                resp.raise_for_status()
+                fields = ("bytesBase64Encoded",) if is_imagen else ("inlineData.data",)
+                chunks = resp.iter_content(chunk_size=b64_stream.CHUNK_SIZE)
+                if b64_stream.save_b64_field(chunks, fields, output_file, on_chunk=sp.add_bytes):
+                    return os.path.abspath(output_file)
+
+            raise RuntimeError(f"No image data in {self.image_model} response")
+
+    def _gemini_image_retry_delay(self, exc: Exception, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying a Gemini image call, or None to stop."""
+        if isinstance(exc, requests.exceptions.HTTPError):
+            if exc.response.status_code == 429 and attempt < 4:
+                return self._quota_delay(self._image_rate_key(), exc, attempt)
+        return None  # Stop retrying on other errors or max attempts
+
+    def _image_cache_key(self, prompt: str) -> str:
+        """Cache key covering every setting that decides which image a prompt yields."""
+        return self.artifact_cache.key(
+            "image",
+            self.openrouter_image_model if self.use_openrouter_for_images else None,
+            self.image_provider,
+            self.image_api_url if self._uses_image_api() else None,
+            self.image_model,
+            self.image_aspect_ratio,
+            prompt,
+        )
+
+    def generate_image(self, prompt: str, output_file: str = "generated_image.png") -> str:
+        """Generate an image using Gemini (Imagen 3) and save it locally.
+
+        Results are stored in the artifact cache, so the same prompt with the
+        same provider settings is only paid for once. The stock fallback
+        image is never cached.
+        """
+        with tracing.span("gemini.generate_image", provider=self.image_provider) as sp:
+            if self.dry_run:
+                return PLACEHOLDER_IMAGE_URL
+
+            key = self._image_cache_key(prompt)
+            if self.artifact_cache.fetch(key, output_file):
+                print(f"Using cached image for this prompt: {output_file}")
+                sp.set(cache="hit")
+                return os.path.abspath(output_file)
+            sp.set(cache="miss")
+
+            path = self._generate_image_uncached(prompt, output_file, sp)
+            if path is None:
+                return self._download_fallback_image(output_file)
+            self.artifact_cache.put(key, path)
+            return path
+
+    def _image_providers(self) -> List[Tuple[str, str]]:
+        """Ordered (name, label) pairs of the image providers to try; Gemini is always last."""
+        providers = []
+        if self.use_openrouter_for_images:
+            if not self.openrouter_api_key:
+                raise RuntimeError("OPENROUTER_API_KEY is required when USE_OPENROUTER_FOR_IMAGES is true")
+            providers.append(("openrouter", "OpenRouter"))
+        if self._uses_image_api():
+            providers.append((self.image_provider, f"{self.image_provider} ({self.image_api_url})"))
+        if self.image_provider == "stability":
+            if not self.stability_api_key:
+                raise RuntimeError("STABILITY_API_KEY is required for Stability AI.")
+            providers.append(("stability", "Stability AI (Ultra)"))
+        providers.append(("gemini", "Gemini"))
+        return providers
+
+    def _routed_image_providers(self) -> List[Tuple[str, str]]:
+        """`_image_providers` without open circuits, fastest recent provider first (see `ProviderRouter.order`)."""
+        providers = self._image_providers()
+        labels = dict(providers)
+        routed = [key.split(":", 1)[1] for key in self.router.order(f"image:{name}" for name, _ in providers)]
+        skipped = [labels[name] for name, _ in providers if name not in routed]
+        if skipped:
+            print(f"Skipping image providers with an open circuit: {', '.join(skipped)}")
+        return [(name, labels[name]) for name in routed]
+
+    def _image_attempt(self, name: str, prompt: str, output_file: str, sp: tracing.Span, cancelled: Optional[threading.Event] = None) -> str:
+        """Generate with one provider (Gemini including its 429 retries); raises on failure.
+
+        The outcome and latency go to the provider router; `ImageGenerator`
+        records the IMAGE_API_URL providers itself.
+        """
+        if name in IMAGE_API_PROVIDERS:
+            path = self._generate_image_via_image_api(prompt, output_file)
+        else:
+            with self.router.track(f"image:{name}", ignore=(HedgeCancelled,)):
+                if name == "openrouter":
+                    path = self._generate_image_openrouter(prompt, output_file)
+                elif name == "stability":
+                    path = self._generate_image_stability(prompt, output_file)
+                else:
+                    path = self._generate_image_gemini(prompt, output_file, sp, cancelled)
+        if cancelled is not None and cancelled.is_set():
+            # another hedged provider already won; drop the late result
+            _discard(output_file)
+            raise HedgeCancelled(name)
+        return path
+
+    def _generate_image_gemini(self, prompt: str, output_file: str, sp: tracing.Span, cancelled: Optional[threading.Event] = None) -> str:
+        url, payload, headers, is_imagen = self._gemini_image_request(prompt)
 
         last_exc = None
         for attempt in range(5):
+            if cancelled is not None and cancelled.is_set():
+                raise HedgeCancelled("gemini")
+            self.rate_limiter.acquire(self._image_rate_key())
             try:
-                resp = requests.post(url, json=payload, headers=headers, timeout=60)
-                resp.raise_for_status()
-                data = resp.json()
+                return self._gemini_image_attempt(url, payload, headers, is_imagen, output_file)
+            except Exception as e:
+                last_exc = e
+                delay = self._gemini_image_retry_delay(e, attempt)
+                if delay is None:
+                    break
+                sp.add_retry()
+                if delay:
+                    time.sleep(delay)
+        raise RuntimeError(f"Gemini image generation failed ({last_exc})") from last_exc
 
-                b64_data = None
-                if is_imagen:
-                    if "predictions" in data and len(data["predictions"]) > 0:
-                        b64_data = data["predictions"][0].get("bytesBase64Encoded")
-                else:
-                    try:
-                        parts = data.get("candidates", [])[0].get("content", {}).get("parts", [])
-                        for part in parts:
-                            if "inlineData" in part:
-                                b64_data = part["inlineData"]["data"]
-                                break
-                    except (IndexError, AttributeError):
-                        pass
+    def _generate_image_uncached(self, prompt: str, output_file: str, sp: tracing.Span) -> Optional[str]:
+        """Try the configured providers in turn (or hedged, see `IMAGE_HEDGE`); None once all of them failed."""
+        providers = self._routed_image_providers()
+        if self.image_hedge and len(providers) > 1:
+            return self._generate_image_hedged(providers, prompt, output_file, sp)
 
-                if b64_data:
-                    with open(output_file, "wb") as f:
-                        f.write(base64.b64decode(b64_data))
-                    return os.path.abspath(output_file)
+        for name, label in providers:
+            print(f"Generating image with {label}...")
+            try:
+                return self._image_attempt(name, prompt, output_file, sp)
+            except Exception as e:
+                logger.exception("%s image generation failed", label)
+                print(f"Warning: {label} image generation failed ({e}).")
 
-                raise RuntimeError(f"No image data in response: {data}")
+        print("Warning: every image provider failed. Using fallback image.")
+        return None
 
-            except requests.exceptions.HTTPError as e:
-                last_exc = e
-                if e.response.status_code == 429 and attempt < 4:
-                    sleep_time = 30 * (attempt + 1)
-                    print(f"Gemini image generation quota exceeded (429). Retrying in {sleep_time}s...")
-                    time.sleep(sleep_time)
+    def _generate_image_hedged(self, providers: List[Tuple[str, str]], prompt: str, output_file: str, sp: tracing.Span) -> Optional[str]:
+        """Race the providers: start the next one every `IMAGE_HEDGE_DELAY_S` (or as soon as one fails).
+
+        Each provider writes to its own temporary file; the first valid image
+        is moved to `output_file` and the others are cancelled. Requests that
+        are already in flight run to completion in the background and their
+        files are discarded.
+        """
+        cancelled = threading.Event()
+        pool = ThreadPoolExecutor(max_workers=len(providers), thread_name_prefix="image-hedge")
+        pending = {}
+        tmp_files = []
+        queue = list(providers)
+
+        def launch():
+            name, label = queue.pop(0)
+            tmp = _hedge_path(output_file, name)
+            tmp_files.append(tmp)
+            print(f"Generating image with {label} (hedged)...")
+            ctx = contextvars.copy_context()
+            pending[pool.submit(ctx.run, self._image_attempt, name, prompt, tmp, sp, cancelled)] = (name, label, tmp)
+
+        try:
+            launch()
+            while pending:
+                done, _ = wait(pending, timeout=self.image_hedge_delay_s if queue else None, return_when=FIRST_COMPLETED)
+                if not done:
+                    sp.set(hedged=True)
+                    launch()
                     continue
-                break  # Stop retrying on other errors or max attempts
+                for fut in done:
+                    name, label, tmp = pending.pop(fut)
+                    try:
+                        fut.result()
+                    except Exception as e:
+                        logger.exception("%s image generation failed", label)
+                        print(f"Warning: {label} image generation failed ({e}).")
+                        if queue:
+                            launch()
+                        continue
+                    os.replace(tmp, output_file)
+                    sp.set(winner=name)
+                    return os.path.abspath(output_file)
+            print("Warning: every image provider failed. Using fallback image.")
+            return None
+        finally:
+            cancelled.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+            for tmp in tmp_files:
+                _discard(tmp)
+
+    async def generate_image_async(self, prompt: str, output_file: str = "generated_image.png") -> str:
+        """Async variant of `generate_image`; 429 back-off waits use `asyncio.sleep`."""
+        with tracing.span("gemini.generate_image", provider=self.image_provider) as sp:
+            if self.dry_run:
+                return PLACEHOLDER_IMAGE_URL
+
+            key = self._image_cache_key(prompt)
+            if await asyncio.to_thread(self.artifact_cache.fetch, key, output_file):
+                print(f"Using cached image for this prompt: {output_file}")
+                sp.set(cache="hit")
+                return os.path.abspath(output_file)
+            sp.set(cache="miss")
+
+            path = await self._generate_image_uncached_async(prompt, output_file, sp)
+            if path is None:
+                return await asyncio.to_thread(self._download_fallback_image, output_file)
+            await asyncio.to_thread(self.artifact_cache.put, key, path)
+            return path
+
+    async def _image_attempt_async(self, name: str, prompt: str, output_file: str, sp: tracing.Span, cancelled: Optional[threading.Event] = None) -> str:
+        if name == "gemini":
+            with self.router.track("image:gemini", ignore=(HedgeCancelled,)):
+                path = await self._generate_image_gemini_async(prompt, output_file, sp, cancelled)
+            if cancelled is not None and cancelled.is_set():
+                _discard(output_file)
+                raise HedgeCancelled(name)
+            return path
+        return await asyncio.to_thread(self._image_attempt, name, prompt, output_file, sp, cancelled)
+
+    async def _generate_image_gemini_async(self, prompt: str, output_file: str, sp: tracing.Span, cancelled: Optional[threading.Event] = None) -> str:
+        url, payload, headers, is_imagen = self._gemini_image_request(prompt)
+
+        last_exc = None
+        for attempt in range(5):
+            if cancelled is not None and cancelled.is_set():
+                raise HedgeCancelled("gemini")
+            await self.rate_limiter.acquire_async(self._image_rate_key())
+            try:
+                return await asyncio.to_thread(self._gemini_image_attempt, url, payload, headers, is_imagen, output_file)
             except Exception as e:
                 last_exc = e
-                break
+                delay = self._gemini_image_retry_delay(e, attempt)
+                if delay is None:
+                    break
+                sp.add_retry()
+                if delay:
+                    await asyncio.sleep(delay)
+        raise RuntimeError(f"Gemini image generation failed ({last_exc})") from last_exc
+
+    async def _generate_image_uncached_async(self, prompt: str, output_file: str, sp: tracing.Span) -> Optional[str]:
+        providers = self._routed_image_providers()
+        if self.image_hedge and len(providers) > 1:
+            return await self._generate_image_hedged_async(providers, prompt, output_file, sp)
+
+        for name, label in providers:
+            print(f"Generating image with {label}...")
+            try:
+                return await self._image_attempt_async(name, prompt, output_file, sp)
+            except Exception as e:
+                logger.exception("%s image generation failed", label)
+                print(f"Warning: {label} image generation failed ({e}).")
 
-        print(f"Warning: Gemini image generation failed ({last_exc}). Using fallback image.")
-        return self._download_fallback_image(output_file)
+        print("Warning: every image provider failed. Using fallback image.")
+        return None
+
+    async def _generate_image_hedged_async(self, providers: List[Tuple[str, str]], prompt: str, output_file: str, sp: tracing.Span) -> Optional[str]:
+        """Async variant of `_generate_image_hedged`; losing tasks are cancelled."""
+        cancelled = threading.Event()
+        pending = {}
+        tmp_files = []
+        queue = list(providers)
+
+        def launch():
+            name, label = queue.pop(0)
+            tmp = _hedge_path(output_file, name)
+            tmp_files.append(tmp)
+            print(f"Generating image with {label} (hedged)...")
+            pending[asyncio.ensure_future(self._image_attempt_async(name, prompt, tmp, sp, cancelled))] = (name, label, tmp)
+
+        try:
+            launch()
+            while pending:
+                done, _ = await asyncio.wait(pending, timeout=self.image_hedge_delay_s if queue else None, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    sp.set(hedged=True)
+                    launch()
+                    continue
+                for task in done:
+                    name, label, tmp = pending.pop(task)
+                    try:
+                        task.result()
+                    except Exception as e:
+                        logger.exception("%s image generation failed", label)
+                        print(f"Warning: {label} image generation failed ({e}).")
+                        if queue:
+                            launch()
+                        continue
+                    os.replace(tmp, output_file)
+                    sp.set(winner=name)
+                    return os.path.abspath(output_file)
+            print("Warning: every image provider failed. Using fallback image.")
+            return None
+        finally:
+            cancelled.set()
+            for task in pending:
+                task.cancel()
+            for tmp in tmp_files:
+                _discard(tmp)
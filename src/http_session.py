@@ -0,0 +1,116 @@
+"""Shared, pooled HTTP session for every provider client.
+
+Usage:
+    from . import http_session
+    resp = http_session.post(url, json=payload, headers=headers, timeout=60)
+
+Behavior:
+- All clients share one `requests.Session`, so connections to the same host
+  (openrouter.ai, api.stability.ai, graph.facebook.com,
+  generativelanguage.googleapis.com, ...) are kept alive and reused instead
+  of paying a TCP + TLS handshake on every call, poll and upload chunk.
+- Connections are pooled per host. `HTTP_POOL_MAXSIZE` (default 16) caps the
+  idle connections kept per host and `HTTP_POOL_HOSTS` (default 16) the
+  number of hosts with a pool. `HTTP_POOL_SIZES` overrides the size for
+  specific hosts, e.g. `graph.facebook.com=8,api.stability.ai=4`.
+- `prewarm(urls)` opens a connection to each URL's host in parallel (a HEAD
+  request; errors ignored). `build_clients` calls `prewarm_from_env()`, which
+  uses the comma-separated `HTTP_PREWARM` list.
+- No automatic retries at this layer; clients keep their own retry policy.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+_session: Optional[requests.Session] = None
+_lock = threading.Lock()
+
+
+def _host_pool_sizes() -> Dict[str, int]:
+    sizes = {}
+    for item in os.getenv("HTTP_POOL_SIZES", "").split(","):
+        host, _, size = item.strip().partition("=")
+        if host and size.strip().isdigit():
+            sizes[host.strip()] = int(size)
+    return sizes
+
+
+def _new_session() -> requests.Session:
+    session = requests.Session()
+    pool_hosts = int(os.getenv("HTTP_POOL_HOSTS", "16"))
+    pool_maxsize = int(os.getenv("HTTP_POOL_MAXSIZE", "16"))
+    adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    for host, size in _host_pool_sizes().items():
+        host_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size)
+        session.mount(f"https://{host}/", host_adapter)
+        session.mount(f"http://{host}/", host_adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _new_session()
+    return _session
+
+
+def reset_session() -> None:
+    """Close the shared session (e.g. after changing pool settings or in a forked child)."""
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    return get_session().request(method, url, **kwargs)
+
+
+def get(url: str, params=None, **kwargs) -> requests.Response:
+    return get_session().get(url, params=params, **kwargs)
+
+
+def post(url: str, data=None, json=None, **kwargs) -> requests.Response:
+    return get_session().post(url, data=data, json=json, **kwargs)
+
+
+def prewarm(urls: Iterable[str], timeout: float = 5.0) -> int:
+    """Open a pooled connection to each URL's host in parallel.
+
+    Returns the number of hosts that answered. Failures are logged and ignored.
+    """
+    origins = sorted({f"{p.scheme}://{p.netloc}/" for p in map(urlsplit, urls) if p.scheme and p.netloc})
+    if not origins:
+        return 0
+    session = get_session()
+
+    def warm(origin: str) -> bool:
+        try:
+            session.head(origin, timeout=timeout, allow_redirects=False).close()
+            return True
+        except requests.RequestException as e:
+            logger.warning(f"HTTP prewarm failed for {origin}: {e}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=min(8, len(origins)), thread_name_prefix="http-prewarm") as pool:
+        return sum(pool.map(warm, origins))
+
+
+def prewarm_from_env() -> int:
+    """Prewarm the hosts listed in `HTTP_PREWARM` (comma-separated URLs)."""
+    urls = [u.strip() for u in os.getenv("HTTP_PREWARM", "").split(",") if u.strip()]
+    return prewarm(urls) if urls else 0
@@ -1,9 +1,12 @@
 import os
 import json
-import requests
+import asyncio
 from typing import Optional
 
+from . import http_session, tracing
 from .cref_store import CrefStore
+from .media_cache import PLACEHOLDER_IMAGE_URL
+from .provider_router import ProviderRouter
 
 
 class ImageGenerator:
@@ -19,6 +22,10 @@ class ImageGenerator:
 
     The implementation below is intentionally generic so you can point `IMAGE_API_URL`
     to the vendor endpoint or a proxy that adapts SDK calls to the same contract.
+
+    Real calls are recorded with the shared provider router as
+    `image:<provider>`; while that provider's circuit is open the call fails
+    fast with `ProviderUnavailable` instead of waiting out its timeout.
     """
 
     def __init__(self, api_key: str = None, api_url: str = None, dry_run: bool = True, provider: Optional[str] = None):
@@ -29,38 +36,46 @@ class ImageGenerator:
         # character key used to persist/retrieve cref (default 'aria')
         self.character_key = os.getenv("CHARACTER_KEY") or "aria"
         self.cref_store = CrefStore()
+        self.router = ProviderRouter()
 
     def generate_from_prompt(self, prompt: str, cref: Optional[str] = None, width: int = 1024, height: int = 1024) -> str:
         """Generate image and return an image URL (or local path).
 
         cref: optional character reference id to keep character consistent.
         """
-        # if no explicit cref provided, try to load from store
-        if not cref:
-            stored = self.cref_store.get(self.character_key)
-            if stored:
-                cref = stored
+        with tracing.span(f"image.{self.provider}", dry_run=self.dry_run):
+            # if no explicit cref provided, try to load from store
+            if not cref:
+                stored = self.cref_store.get(self.character_key)
+                if stored:
+                    cref = stored
+
+            if self.dry_run:
+                # Return a stable placeholder image URL — replace with real generated result
+                return PLACEHOLDER_IMAGE_URL
 
-        if self.dry_run:
-            # Return a stable placeholder image URL — replace with real generated result
-            return "https://images.unsplash.com/photo-1503264116251-35a269479413"
+            key = f"image:{self.provider}"
+            self.router.check(key)
+            with self.router.track(key):
+                if self.provider == "leonardo":
+                    return self._generate_leonardo(prompt, cref=cref, width=width, height=height)
 
-        if self.provider == "leonardo":
-            return self._generate_leonardo(prompt, cref=cref, width=width, height=height)
+                if self.provider == "midjourney":
+                    return self._generate_midjourney(prompt, cref=cref)
 
-        if self.provider == "midjourney":
-            return self._generate_midjourney(prompt, cref=cref)
+                if self.provider == "gork":
+                    return self._generate_gork(prompt, cref=cref, width=width, height=height)
 
-        if self.provider == "gork":
-            return self._generate_gork(prompt, cref=cref, width=width, height=height)
+                return self._generate_generic(prompt, cref=cref, width=width, height=height)
 
-        # Generic provider: POST to IMAGE_API_URL with prompt/cref
+    def _generate_generic(self, prompt: str, cref: Optional[str] = None, width: int = 1024, height: int = 1024) -> str:
+        """Generic provider: POST to IMAGE_API_URL with prompt/cref."""
         headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
         payload = {"prompt": prompt, "width": width, "height": height}
         if cref:
             payload["cref"] = cref
 
-        resp = requests.post(self.api_url, json=payload, headers=headers, timeout=120)
+        resp = http_session.post(self.api_url, json=payload, headers=headers, timeout=120)
         resp.raise_for_status()
         data = resp.json()
         # Persist cref if provider returned one (common keys)
@@ -73,6 +88,10 @@ class ImageGenerator:
 
         return data.get("image_url") or data.get("result_url") or data.get("url") or json.dumps(data)
 
+    async def generate_from_prompt_async(self, prompt: str, cref: Optional[str] = None, width: int = 1024, height: int = 1024) -> str:
+        """Async variant of `generate_from_prompt`; the provider call runs on the default executor."""
+        return await asyncio.to_thread(self.generate_from_prompt, prompt, cref, width, height)
+
     def _generate_leonardo(self, prompt: str, cref: Optional[str] = None, width: int = 1024, height: int = 1024) -> str:
         """Example Leonardo integration. Adjust the payload to match the provider's API.
 
@@ -91,7 +110,7 @@ class ImageGenerator:
         if cref:
             payload["cref"] = cref
 
-        resp = requests.post(self.api_url, json=payload, headers=headers, timeout=120)
+        resp = http_session.post(self.api_url, json=payload, headers=headers, timeout=120)
         resp.raise_for_status()
         data = resp.json()
         # Leonardo-like responses vary; try common fields
@@ -132,7 +151,7 @@ class ImageGenerator:
         if cref:
             payload["cref"] = cref
 
-        resp = requests.post(self.api_url, json=payload, headers=headers, timeout=180)
+        resp = http_session.post(self.api_url, json=payload, headers=headers, timeout=180)
         resp.raise_for_status()
         data = resp.json()
         try:
@@ -159,7 +178,7 @@ class ImageGenerator:
         if cref:
             payload["cref"] = cref
 
-        resp = requests.post(self.api_url, json=payload, headers=headers, timeout=120)
+        resp = http_session.post(self.api_url, json=payload, headers=headers, timeout=120)
         resp.raise_for_status()
         data = resp.json()
         # persist cref if present in response
@@ -0,0 +1,118 @@
+"""Incremental extraction of the first JSON value from model output.
+
+Usage:
+    extractor = JSONExtractor()
+    for chunk in stream:
+        if extractor.feed(chunk):
+            break  # stop reading; ignore any trailing chatter
+    data = extractor.value
+
+    text = read_until_json(chunks)         # the value's raw text
+
+    data = extract_json(raw_text)          # whole string, first object
+    items = extract_json(raw_text, "[")    # first array instead
+
+Behavior:
+- Text before the JSON (prose, a ```json fence, ...) is skipped. Braces are
+  only counted outside string literals, so `}` inside a value or a stray
+  `{` in the preamble does not end the object early.
+- When a candidate closes but is not valid JSON (e.g. `{placeholder}` in
+  the preamble), scanning resumes just after its opening bracket.
+- Scanning is resumable: each `feed` only looks at the new characters, so
+  a streamed response costs one pass in total.
+"""
+import json
+from typing import Any, Iterable, Optional
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class JSONExtractor:
+    def __init__(self, opener: str = "{"):
+        if opener not in _CLOSERS:
+            raise ValueError(f"opener must be one of {sorted(_CLOSERS)}, got {opener!r}")
+        self.opener = opener
+        self.closer = _CLOSERS[opener]
+        self.value: Any = None
+        self.done = False
+        self._buf = ""
+        self._pos = 0
+        self._reset_candidate()
+
+    def _reset_candidate(self) -> None:
+        self._start: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def text(self) -> Optional[str]:
+        """The raw text of the extracted value, once `done`."""
+        return self._buf[self._start : self._pos] if self.done else None
+
+    @property
+    def buffer(self) -> str:
+        """Everything fed so far."""
+        return self._buf
+
+    def feed(self, chunk: str) -> bool:
+        """Consume `chunk`; return True once the first complete value has been found."""
+        if self.done:
+            return True
+        self._buf += chunk
+        buf = self._buf
+        while self._pos < len(buf):
+            ch = buf[self._pos]
+            self._pos += 1
+            if self._start is None:
+                if ch == self.opener:
+                    self._start = self._pos - 1
+                    self._depth = 1
+                continue
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        self.value = json.loads(buf[self._start : self._pos])
+                    except ValueError:
+                        # not JSON after all; rescan from just past this opener
+                        start = self._start
+                        self._reset_candidate()
+                        self._pos = start + 1
+                        continue
+                    self.done = True
+                    return True
+        return False
+
+
+def extract_json(raw: str, opener: str = "{") -> Any:
+    """Return the first JSON object (or array, with `opener="["`) in `raw`, or None."""
+    extractor = JSONExtractor(opener)
+    extractor.feed(raw)
+    return extractor.value
+
+
+def read_until_json(chunks: Iterable[str], opener: str = "{") -> str:
+    """Read `chunks` until the first JSON value closes and return its text.
+
+    Stops iterating as soon as the value is complete, so the caller can
+    close the underlying stream without waiting for the rest of the reply.
+    If no value ever closes, returns everything that was read.
+    """
+    extractor = JSONExtractor(opener)
+    for chunk in chunks:
+        if chunk and extractor.feed(chunk):
+            return extractor.text
+    return extractor.buffer
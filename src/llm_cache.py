@@ -0,0 +1,113 @@
+"""Persistent response cache for LLM calls.
+
+Usage:
+    cache = LLMCache()
+    key = cache.key(backend, model, instruction)
+    text = cache.get(key)
+    if text is None:
+        text = ...call the model...
+        cache.set(key, text)
+
+Behavior:
+- Two tiers: a small in-process LRU (`LLM_CACHE_MEMORY_ENTRIES`, default 256)
+  in front of a SQLite table at `LLM_CACHE_PATH` (default
+  `.llm_cache.sqlite3`), so hits survive restarts and are shared by every
+  process on the machine.
+- Entries expire after `LLM_CACHE_TTL_S` seconds (default 86400). Expired
+  rows are skipped on read and purged on write.
+- Set `LLM_CACHE=false` to disable; `get` then always misses and `set` is a
+  no-op. SQLite errors are logged and treated as misses, never raised.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCache:
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl_s: Optional[float] = None,
+        memory_entries: Optional[int] = None,
+        enabled: Optional[bool] = None,
+    ):
+        self.path = path or os.getenv("LLM_CACHE_PATH") or ".llm_cache.sqlite3"
+        self.ttl_s = ttl_s if ttl_s is not None else float(os.getenv("LLM_CACHE_TTL_S", "86400"))
+        self.memory_entries = memory_entries if memory_entries is not None else int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "256"))
+        if enabled is None:
+            enabled = os.getenv("LLM_CACHE", "true").lower() in ("1", "true", "yes")
+        self.enabled = enabled
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._table_ready = False
+
+    @staticmethod
+    def key(backend: str, model: str, instruction: str) -> str:
+        digest = hashlib.sha256(instruction.encode("utf-8")).hexdigest()
+        return f"{backend}:{model}:{digest}"
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self._table_ready:
+            conn.execute("CREATE TABLE IF NOT EXISTS llm_responses (key TEXT PRIMARY KEY, response TEXT NOT NULL, expires_at REAL NOT NULL)")
+            conn.commit()
+            self._table_ready = True
+        return conn
+
+    def _remember(self, key: str, response: str, expires_at: float) -> None:
+        with self._lock:
+            self._memory[key] = (response, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for `key`, or None if missing or expired."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._memory.move_to_end(key)
+                    return entry[0]
+                del self._memory[key]
+
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute("SELECT response, expires_at FROM llm_responses WHERE key = ? AND expires_at > ?", (key, now)).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            return None
+        if row is None:
+            return None
+        self._remember(key, row[0], row[1])
+        return row[0]
+
+    def set(self, key: str, response: str, ttl_s: Optional[float] = None) -> None:
+        if not self.enabled:
+            return
+        now = time.time()
+        expires_at = now + (self.ttl_s if ttl_s is None else ttl_s)
+        self._remember(key, response, expires_at)
+        try:
+            conn = self._connect()
+            try:
+                conn.execute("INSERT OR REPLACE INTO llm_responses (key, response, expires_at) VALUES (?, ?, ?)", (key, response, expires_at))
+                conn.execute("DELETE FROM llm_responses WHERE expires_at <= ?", (now,))
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache write failed: {e}")
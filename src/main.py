@@ -1,120 +1,517 @@
 """Orchestrator example: generate concept, image, video, caption, then post to Instagram.
 
 Run as a module: `python -m src.main`
+
+Heavy dependencies are imported lazily to keep cold starts (e.g. Cloud Run
+jobs) fast: `youtube_poster` (google auth / API client) is loaded when the
+YouTube stage first uses it, `database` (SQLAlchemy) only for non-dry runs and
+the cref migration script only when auto-migrate is requested. Check the
+import cost with `python -m src.main --startup-report`.
 """
 import os
+import re
+import sys
+import subprocess
 import time
+import uuid
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
 from dotenv import load_dotenv
 
 from .gemini_client import GeminiClient
 from .video_gen import VideoGenerator
 from .instagram_poster import InstagramPoster
-from .youtube_poster import YouTubePoster
-from .database import init_db, save_generated_content
+from .stage_graph import StageGraph
+from .workspace import Workspace
+from . import encoding, http_session, tracing
 
-try:
-    from scripts.migrate_cref_json_to_sqlite import migrate
-except Exception:
-    migrate = None
+# Resolved on first use by `_load_migrate()` (tests may assign it directly).
+migrate = None
 
 
-def orchestrate(dry_run: bool = True) -> dict:
-    print(f"orchestrate called with dry_run={dry_run}")
+def _load_migrate():
+    global migrate
+    if migrate is None:
+        try:
+            from scripts.migrate_cref_json_to_sqlite import migrate as migrate_fn
+        except Exception:
+            return None
+        migrate = migrate_fn
+    return migrate
 
-    # Init clients
-    gemini = GeminiClient(dry_run=dry_run)
-    video_gen = VideoGenerator(dry_run=dry_run)
-    ig = InstagramPoster(dry_run=dry_run)
-    # Add the YouTube Poster client
-    yt = YouTubePoster(
+
+class _LazyClient:
+    """Build a client on first attribute access instead of at construction.
+
+    Lets `build_clients` hand out the YouTube poster without importing the
+    google auth / API client libraries until an upload actually needs them.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _resolve(self):
+        with self._lock:
+            if self._client is None:
+                self._client = self._factory()
+        return self._client
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+
+def _youtube_enabled() -> bool:
+    return os.getenv("YOUTUBE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+
+def _concept_queue_enabled() -> bool:
+    return os.getenv("CONCEPT_QUEUE", "false").lower() in ("1", "true", "yes")
+
+
+def _claim_queued_concept(run_id: str, dry_run: bool):
+    """Return the next pre-generated (theme, prompt) for this run, or None.
+
+    Only non-dry runs with `CONCEPT_QUEUE` enabled use the queue; an empty
+    queue falls back to asking the model.
+    """
+    if dry_run or not _concept_queue_enabled():
+        return None
+    from .database import claim_concept
+
+    concept = claim_concept(run_id, os.getenv("CONTENT_STYLE", "cinematic"))
+    if concept is None:
+        print("Concept queue is empty; generating a concept with the model.")
+        return None
+    print("Using pre-generated concept from the concept queue.")
+    return concept
+
+
+def _make_youtube_poster(dry_run: bool):
+    from .youtube_poster import YouTubePoster
+
+    return YouTubePoster(
         client_secrets_file=os.getenv("YOUTUBE_CLIENT_SECRETS_FILE", "client_secrets.json"),
         credentials_file=os.getenv("YOUTUBE_TOKEN_FILE", "youtube_token.json"),
         dry_run=dry_run,
     )
 
 
-    # 1. Generate concept and image prompt
-    theme, prompt = gemini.generate_concept()
-    print(f"Concept: {theme}\nPrompt: {prompt}\n")
+def _local_video_path(video_url) -> str:
+    """Return the local file path for `video_url`, or None if it is not local."""
+    if isinstance(video_url, str) and (video_url.startswith("file:") or os.path.exists(video_url)):
+        # normalize file:// prefix
+        if video_url.startswith("file://"):
+            return video_url[len("file://") :]
+        return video_url
+    return None
 
-    # 2. Generate image
-    # If you have a character ref id for consistency, pass it via `cref`.
-    image_url = gemini.generate_image(prompt, output_file="generated_image.png")
-    print(f"Image URL:", image_url)
 
-    # 3. Animate -> produce a short video. In dry-run request a local file so
-    # we can exercise the resumable upload path end-to-end.
-    # We force output_local=True because YouTube API requires a file upload.
-    duration = int(os.getenv("VIDEO_DURATION", "5"))
-    video_url = video_gen.animate_image_to_video(image_url, duration=duration, output_local=True)
-    print("Video URL:", video_url)
+# Rendition each poster gets when VIDEO_RENDITIONS is set (see src/encoding.py)
+INSTAGRAM_RENDITION = "reels"
+YOUTUBE_RENDITION = "shorts"
 
-    # 4. Draft caption and hashtags
-    caption_text, hashtags = gemini.draft_caption_and_hashtags(theme, prompt)
-    caption = caption_text + "\n\n" + " ".join(hashtags)
 
-    # 5. Post to Instagram and YouTube
-    ig_result = None
-    yt_result = None
-    try:
-        if isinstance(video_url, str) and (video_url.startswith("file:") or __import__("os").path.exists(video_url)):
-            # normalize file:// prefix
-            if video_url.startswith("file://"):
-                local_path = video_url[len("file://") :]
-            else:
-                local_path = video_url
-            print(f"Detected local video file, uploading from: {local_path}")
-            
-            # Upload to YouTube first
-            privacy = os.getenv("YOUTUBE_PRIVACY_STATUS", "private")
-            yt_result = yt.upload_video(local_path, title=theme, description=caption, privacy_status=privacy)
-            
-            # Attempt Instagram upload (wrapped in try/except since API might be unavailable)
-            try:
-                ig_result = ig.upload_video_file(local_path, caption=caption)
-                print("Instagram Post result:", ig_result)
-            except Exception as ig_error:
-                print(f"Instagram upload failed (skipping): {ig_error}")
+def _rendition(video, name: Optional[str] = None):
+    """The `name` rendition of a video stage result, else its largest (full-size) rendition.
+
+    The video stage returns a path, or {platform: path} with VIDEO_RENDITIONS.
+    A cut missing from VIDEO_RENDITIONS is never replaced by a smaller one,
+    and never by a review-only one such as `preview`: with nothing else
+    rendered this returns None, so the upload is skipped. Of equal sizes
+    the first listed wins.
+    """
+    if not isinstance(video, dict):
+        return video
+    if video.get(name):
+        return video[name]
+    postable = [platform for platform in video if platform not in encoding.REVIEW_ONLY]
+    if not postable:
+        return None
+    largest = max(postable, key=lambda platform: encoding.platform_target(platform)["width"] * encoding.platform_target(platform)["height"])
+    return video[largest]
+
+
+def _usable_checkpoints(checkpoints: dict) -> dict:
+    """Drop image/video checkpoints whose local file no longer exists."""
+    usable = dict(checkpoints)
+    for stage in ("image", "video"):
+        value = usable.get(stage)
+        for item in value.values() if isinstance(value, dict) else [value]:
+            if isinstance(item, str) and not item.startswith(("http://", "https://")):
+                path = item[len("file://") :] if item.startswith("file://") else item
+                if not os.path.exists(path):
+                    print(f"Checkpointed {stage} file {path} is missing; stage will run again.")
+                    usable.pop(stage)
+                    break
+    return usable
+
+
+def _checkpointing(run_id: str, resume: bool, dry_run: bool):
+    """Return (completed_stages, on_complete) for a run.
+
+    Stage outputs are checkpointed under `run_id` in the database (non-dry
+    runs only). With `resume=True` the stages already checkpointed for
+    `run_id` are skipped.
+    """
+    if dry_run:
+        return {}, None
+
+    from .database import load_checkpoints, save_checkpoint
+
+    completed = {}
+    if resume:
+        completed = _usable_checkpoints(load_checkpoints(run_id))
+        if completed:
+            print(f"Resuming run {run_id}; skipping finished stages: {', '.join(sorted(completed))}")
+        else:
+            print(f"No checkpoints found for run {run_id}; starting from the beginning.")
+
+    def on_complete(stage: str, output) -> None:
+        save_checkpoint(run_id, stage, output)
+
+    return completed, on_complete
+
+
+def build_clients(dry_run: bool = True, render_concurrency: Optional[int] = None) -> dict:
+    """Create the Gemini, video, Instagram and YouTube clients used by `orchestrate`."""
+    if not dry_run:
+        # open keep-alive connections to the HTTP_PREWARM hosts up front
+        http_session.prewarm_from_env()
+    return {
+        "gemini": GeminiClient(dry_run=dry_run),
+        "video": VideoGenerator(dry_run=dry_run, max_concurrent_renders=render_concurrency),
+        "instagram": InstagramPoster(dry_run=dry_run),
+        # YouTube poster is created on first upload; set YOUTUBE_ENABLED=false to skip it.
+        "youtube": _LazyClient(lambda: _make_youtube_poster(dry_run)) if _youtube_enabled() else None,
+    }
+
+
+def _start_run(run_id: Optional[str], resume: bool, dry_run: bool, image_file: Optional[str], video_file: Optional[str]):
+    """Return (run_id, completed, on_complete, workspace, image_file, video_file) for a new or resumed run."""
+    run_id = run_id or uuid.uuid4().hex
+    print(f"Run id: {run_id}")
+    completed, on_complete = _checkpointing(run_id, resume, dry_run)
+
+    # Files go to this run's own workspace unless the caller picked paths
+    workspace = Workspace(run_id)
+    return run_id, completed, on_complete, workspace, image_file or workspace.path("image.png"), video_file or workspace.path("video.mp4")
+
+
+def _blocking_stage(stage):
+    """Run a stage coroutine as a plain function, for synchronous runs.
+
+    In a sync run `call` never awaits anything, so the coroutine finishes on
+    its first step.
+    """
+
+    def run(*args):
+        coro = stage(*args)
+        try:
+            coro.send(None)
+        except StopIteration as done:
+            return done.value
+        coro.close()
+        raise RuntimeError(f"{stage.__name__} suspended during a synchronous run")
+
+    return run
+
+
+def _piece_graph(
+    run_id: str,
+    dry_run: bool,
+    clients: dict,
+    image_file: str,
+    video_file: str,
+    completed: dict,
+    on_complete,
+    asynchronous: bool = False,
+) -> StageGraph:
+    """The stage graph producing one piece, for `orchestrate` or (`asynchronous=True`) `orchestrate_async`.
+
+    Each stage is written once. `call(client, method, ...)` awaits the
+    client's `<method>_async` in async runs and calls `<method>` directly in
+    sync runs.
+    """
+    gemini = clients["gemini"]
+    video_gen = clients["video"]
+    ig = clients["instagram"]
+    yt = clients["youtube"]
+
+    async def call(client, method: str, *args, **kwargs):
+        if asynchronous:
+            return await getattr(client, method + "_async")(*args, **kwargs)
+        return getattr(client, method)(*args, **kwargs)
+
+    async def blocking(fn, *args):
+        # plain blocking helpers (database reads) run in a thread in async runs
+        return await asyncio.to_thread(fn, *args) if asynchronous else fn(*args)
+
+    # Stages run as a dependency graph: caption drafting only needs the
+    # concept, so it overlaps image/video rendering, and the two uploads run
+    # side by side once both the video and the caption are ready.
+    #
+    #   concept -> image -> video ---+--> youtube
+    #          \                    +--> instagram
+    #           `-> caption ---------'
+
+    # With FUSED_CONCEPT_CAPTION the concept stage also drafts the caption
+    # in the same model call; the caption stage then just formats it.
+    fused = getattr(gemini, "fused_generation", False)
+    fused_captions = {}
+
+    async def concept_stage():
+        # 1. Generate concept and image prompt (or take one from the concept queue)
+        queued = await blocking(_claim_queued_concept, run_id, dry_run)
+        if queued:
+            theme, prompt = queued
+        elif fused:
+            theme, prompt, caption_text, hashtags = await call(gemini, "generate_concept_and_caption")
+            fused_captions["caption"] = (caption_text, hashtags)
         else:
-            print("Error: Video generation did not return a local file path. Skipping uploads.")
+            theme, prompt = await call(gemini, "generate_concept")
+        print(f"Concept: {theme}\nPrompt: {prompt}\n")
+        return theme, prompt
+
+    async def image_stage(concept):
+        # 2. Generate image
+        # If you have a character ref id for consistency, pass it via `cref`.
+        image_url = await call(gemini, "generate_image", concept[1], output_file=image_file)
+        print("Image URL:", image_url)
+        return image_url
+
+    async def video_stage(image_url):
+        # 3. Animate -> produce a short video. In dry-run request a local file so
+        # we can exercise the resumable upload path end-to-end.
+        # We force output_local=True because YouTube API requires a file upload.
+        # With VIDEO_RENDITIONS, every platform's cut comes from one ffmpeg pass.
+        duration = int(os.getenv("VIDEO_DURATION", "5"))
+        if getattr(video_gen, "renditions", None):
+            video_url = await call(video_gen, "animate_image_to_renditions", image_url, duration=duration, output_file=video_file)
+        else:
+            video_url = await call(video_gen, "animate_image_to_video", image_url, duration=duration, output_local=True, output_file=video_file)
+        print("Video URL:", video_url)
+        return video_url
+
+    async def caption_stage(concept):
+        # 4. Draft caption and hashtags (already drafted in fused mode, unless the concept was resumed)
+        caption_text, hashtags = fused_captions.get("caption") or await call(gemini, "draft_caption_and_hashtags", *concept)
+        return caption_text + "\n\n" + " ".join(hashtags)
 
-        
+    # 5. Post to Instagram and YouTube
+    async def youtube_stage(video_url, concept, caption):
+        local_path = _local_video_path(_rendition(video_url, YOUTUBE_RENDITION))
+        if not local_path or yt is None:
+            return None
+        privacy = os.getenv("YOUTUBE_PRIVACY_STATUS", "private")
+        yt_result = await call(yt, "upload_video", local_path, title=concept[0], description=caption, privacy_status=privacy)
         print("YouTube Post result:", yt_result)
-    except Exception as e:
-        print(f"Failed to post to social media: {e}")
-    finally:
-        if not dry_run:
-            save_generated_content(theme, prompt, image_url, video_url, caption)
-            print("Saved generated content to database.")
+        return yt_result
 
-    return {"theme": theme, "image_url": image_url, "video_url": video_url, "caption": caption, "instagram_post_result": ig_result, "youtube_post_result": yt_result}
+    async def instagram_stage(video_url, caption):
+        local_path = _local_video_path(_rendition(video_url, INSTAGRAM_RENDITION))
+        if not local_path:
+            return None
+        ig_result = await call(ig, "upload_video_file", local_path, caption=caption)
+        print("Instagram Post result:", ig_result)
+        return ig_result
 
+    stage = (lambda fn: fn) if asynchronous else _blocking_stage
+    graph = StageGraph(completed=completed, on_complete=on_complete)
+    graph.add("concept", stage(concept_stage))
+    graph.add("image", stage(image_stage), deps=["concept"])
+    graph.add("video", stage(video_stage), deps=["image"])
+    graph.add("caption", stage(caption_stage), deps=["concept"])
+    # Upload failures are logged and skipped; the piece is still saved.
+    graph.add("youtube", stage(youtube_stage), deps=["video", "concept", "caption"], optional=True)
+    graph.add("instagram", stage(instagram_stage), deps=["video", "caption"], optional=True)
+    return graph
 
-def run(dry_run: bool = True, auto_migrate: bool = False, fail_on_migrate_error: bool = False) -> dict:
-    """Run optional one-time migration then orchestrator.
 
-    If `auto_migrate` is True (or env var `AUTO_MIGRATE_ON_START` is set), the
-    function will attempt to run the migration once. A marker file at
-    `AUTO_MIGRATE_MARKER_PATH` (default `.cref_auto_migrated`) prevents repeated
-    runs.
+def _settle_workspace(workspace: Workspace, graph: StageGraph, dry_run: bool) -> None:
+    """Decide whether the run's workspace outlives it, and publish the piece's files if it does not.
+
+    Dry runs publish nothing, so they never accumulate files in `OUTPUT_DIR`.
+    """
+    # keep the files a `--resume` of the failed stages will need
+    workspace.keep = workspace.keep or (bool(graph.errors) and not dry_run)
+    if not workspace.keep and not dry_run:
+        # the workspace is removed on exit; move the finished image and video somewhere lasting
+        for stage in ("image", "video"):
+            graph.results[stage] = workspace.publish(graph.results.get(stage))
+
+
+def orchestrate(
+    dry_run: bool = True,
+    clients: Optional[dict] = None,
+    image_file: Optional[str] = None,
+    video_file: Optional[str] = None,
+    run_id: Optional[str] = None,
+    resume: bool = False,
+) -> dict:
+    """Produce one piece: concept, image, video, caption, then the uploads.
+
+    Image and video files default to the run's workspace
+    (`WORKSPACE_DIR/<run_id>`), which is removed once the run succeeds.
     """
+    print(f"orchestrate called with dry_run={dry_run}")
+    run_id, completed, on_complete, workspace, image_file, video_file = _start_run(run_id, resume, dry_run, image_file, video_file)
+    # Init clients (batch runs pass a shared set)
+    clients = clients or build_clients(dry_run=dry_run)
+    graph = _piece_graph(run_id, dry_run, clients, image_file, video_file, completed, on_complete)
+
+    with workspace, tracing.span("orchestrate", run_id=run_id, dry_run=dry_run, resumed=sorted(completed)):
+        graph.run()
+        _settle_workspace(workspace, graph, dry_run)
+        return _finish_run(graph, dry_run, run_id)
+
+
+def _finish_run(graph: StageGraph, dry_run: bool, run_id: str) -> dict:
+    """Report upload outcomes, save the piece and build the result dict."""
+    results = graph.results
+    theme, prompt = results["concept"]
+    image_url = results["image"]
+    videos = results["video"]
+    # the first full-size rendition (or the only video) is the one saved with the piece
+    video_url = _rendition(videos)
+    caption = results["caption"]
+    ig_result = results["instagram"]
+    yt_result = results["youtube"]
+
+    if not _local_video_path(video_url):
+        print("Error: Video generation did not return a local file path. Skipping uploads.")
+    if "youtube" in graph.errors:
+        print(f"Failed to post to YouTube: {graph.errors['youtube']}")
+    if "instagram" in graph.errors:
+        print(f"Instagram upload failed (skipping): {graph.errors['instagram']}")
+
+    # Join point: both uploads have finished (or failed) before the write.
     if not dry_run:
-        init_db()
-        print("Database initialized.")
+        from .database import save_generated_content
+
+        save_generated_content(theme, prompt, image_url, video_url, caption)
+        print("Saved generated content to database.")
+
+    return {"run_id": run_id, "theme": theme, "image_url": image_url, "video_url": video_url, "caption": caption, "instagram_post_result": ig_result, "youtube_post_result": yt_result, "renditions": videos if isinstance(videos, dict) else None}
+
+
+async def orchestrate_async(
+    dry_run: bool = True,
+    clients: Optional[dict] = None,
+    image_file: Optional[str] = None,
+    video_file: Optional[str] = None,
+    run_id: Optional[str] = None,
+    resume: bool = False,
+) -> dict:
+    """Async variant of `orchestrate` built on the clients' `*_async` methods.
+
+    Remote waits (retry back-off, quota sleeps, Stability polling) happen on
+    the event loop, so one worker process can keep many pieces in flight, e.g.
+    `await asyncio.gather(*(orchestrate_async(...) for _ in range(n)))`.
+    """
+    print(f"orchestrate_async called with dry_run={dry_run}")
+    run_id, completed, on_complete, workspace, image_file, video_file = _start_run(run_id, resume, dry_run, image_file, video_file)
+    clients = clients or build_clients(dry_run=dry_run)
+    graph = _piece_graph(run_id, dry_run, clients, image_file, video_file, completed, on_complete, asynchronous=True)
+
+    with workspace, tracing.span("orchestrate", run_id=run_id, dry_run=dry_run, resumed=sorted(completed)):
+        await graph.run_async()
+        _settle_workspace(workspace, graph, dry_run)
+        return await asyncio.to_thread(_finish_run, graph, dry_run, run_id)
+
+
+def orchestrate_batch(
+    n: int,
+    max_concurrency: int = 4,
+    dry_run: bool = True,
+    render_concurrency: Optional[int] = None,
+) -> List[dict]:
+    """Produce `n` content pieces in one process.
+
+    Up to `max_concurrency` pieces are in flight at once, so the network-bound
+    stages (Gemini, image providers, uploads) of different pieces overlap. The
+    clients are shared across pieces; the video generator limits concurrent
+    ffmpeg renders to `render_concurrency` (env `RENDER_CONCURRENCY`, default 1).
 
+    Returns one result dict per piece, in order. A piece that fails gets
+    `{"error": "..."}` instead of aborting the whole batch.
+    """
+    print(f"orchestrate_batch called with n={n}, max_concurrency={max_concurrency}, dry_run={dry_run}")
+    clients = build_clients(dry_run=dry_run, render_concurrency=render_concurrency)
+
+    def one(index: int) -> dict:
+        # every piece renders in its own workspace (see `src/workspace.py`)
+        return orchestrate(dry_run=dry_run, clients=clients)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="batch") as pool:
+        # copy the caller's tracing context (job id) into each item
+        futures = [pool.submit(contextvars.copy_context().run, one, i) for i in range(n)]
+
+    results = []
+    for index, future in enumerate(futures):
+        try:
+            results.append(future.result())
+        except Exception as e:
+            print(f"Batch item {index} failed: {e}")
+            results.append({"error": str(e)})
+
+    succeeded = sum(1 for r in results if "error" not in r)
+    print(f"Batch finished: {succeeded}/{n} pieces succeeded.")
+    return results
+
+
+def fill_concept_queue(n: int, dry_run: bool = True) -> int:
+    """Generate `n` concepts in one model call and add them to the concept queue.
+
+    Runs with `CONCEPT_QUEUE=true` then take their concept from the queue, so
+    a scheduled fill (e.g. weekly) replaces the per-run concept call.
+    Concepts are tagged with the current `CONTENT_STYLE`. Dry runs print the
+    placeholder concepts without touching the database. Returns the number
+    of concepts added.
+    """
+    gemini = GeminiClient(dry_run=dry_run)
+    concepts = gemini.generate_concepts(n)
+    if len(concepts) < n:
+        print(f"Model returned {len(concepts)} usable concepts (asked for {n}).")
+    if dry_run:
+        for theme, prompt in concepts:
+            print(f"Concept: {theme}\nPrompt: {prompt}\n")
+        return 0
+
+    from .database import count_unclaimed_concepts, enqueue_concepts, init_db
+
+    init_db()
+    style = os.getenv("CONTENT_STYLE", "cinematic")
+    added = enqueue_concepts(concepts, style)
+    print(f"Queued {added} concepts; {count_unclaimed_concepts(style)} unused for style {style!r}.")
+    return added
+
+
+def auto_migrate_on_start(auto_migrate: bool = False, fail_on_migrate_error: bool = False) -> None:
+    """Run the one-time cref store migration if `auto_migrate` or `AUTO_MIGRATE_ON_START` asks for it.
+
+    A marker file at `AUTO_MIGRATE_MARKER_PATH` (default `.cref_auto_migrated`)
+    prevents repeated runs. Used by `run()` and the warm worker runtime.
+    """
     env_auto = os.getenv("AUTO_MIGRATE_ON_START", "false").lower() in ("1", "true", "yes")
     do_migrate = auto_migrate or env_auto
 
     marker = os.getenv("AUTO_MIGRATE_MARKER_PATH") or os.path.join(os.getcwd(), ".cref_auto_migrated")
 
-    if do_migrate and migrate is not None:
+    migrate_fn = _load_migrate() if do_migrate else None
+    if migrate_fn is not None:
         if os.path.exists(marker):
             print(f"Auto-migrate marker present ({marker}), skipping migration.")
         else:
             print("Auto-migrate: running one-time migration of cref store...")
             # Run migration with safe defaults: create JSON backup, verify, and rollback on fail
             try:
-                rc = migrate(None, None, backup=True, dry_run=False, verify=True, rollback_on_fail=True)
+                rc = migrate_fn(None, None, backup=True, dry_run=False, verify=True, rollback_on_fail=True)
                 # migrate handles default src/dst via env vars
                 if rc == -1:
                     print("Auto-migrate: migration failed or verification failed; see logs.")
@@ -133,7 +530,116 @@ def run(dry_run: bool = True, auto_migrate: bool = False, fail_on_migrate_error:
                 if fail_on_migrate_error or os.getenv("AUTO_MIGRATE_FAIL_ON_ERROR", "false").lower() in ("1", "true", "yes"):
                     raise
 
-    return orchestrate(dry_run=dry_run)
+
+def run(
+    dry_run: bool = True,
+    auto_migrate: bool = False,
+    fail_on_migrate_error: bool = False,
+    batch: Optional[int] = None,
+    max_concurrency: int = 4,
+    resume: Optional[str] = None,
+    job_id: Optional[str] = None,
+):
+    """Run optional one-time migration then orchestrator.
+
+    With `batch` set, `orchestrate_batch(batch, max_concurrency)` is run
+    instead of a single `orchestrate()` and a list of results is returned.
+    With `resume` set to a run id, the stages that run already finished are
+    skipped; it cannot be combined with `batch` (a batch starts new runs).
+    `job_id` (e.g. the worker's job id) tags every tracing span.
+
+    If `auto_migrate` is True (or env var `AUTO_MIGRATE_ON_START` is set), the
+    function will attempt to run the migration once (see `auto_migrate_on_start`).
+    """
+    if batch and resume:
+        raise ValueError("resume applies to a single run; it cannot be combined with batch")
+
+    if not dry_run:
+        from .database import init_db
+
+        init_db()
+        print("Database initialized.")
+
+    auto_migrate_on_start(auto_migrate, fail_on_migrate_error)
+
+    with tracing.job_context(job_id):
+        if batch:
+            return orchestrate_batch(batch, max_concurrency=max_concurrency, dry_run=dry_run)
+        if resume:
+            return orchestrate(dry_run=dry_run, run_id=resume, resume=True)
+        return orchestrate(dry_run=dry_run)
+
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(output: str) -> List[dict]:
+    """Parse `python -X importtime` stderr into [{module, self_us, cumulative_us, depth}]."""
+    rows = []
+    for line in output.splitlines():
+        m = _IMPORTTIME_LINE.match(line)
+        if m:
+            self_us, cumulative_us, indent, module = m.groups()
+            # one leading space, then two more per nesting level
+            rows.append({"module": module, "self_us": int(self_us), "cumulative_us": int(cumulative_us), "depth": (len(indent) - 1) // 2})
+    return rows
+
+
+def startup_report(module: str = "src.main", top: int = 15, budget_ms: Optional[float] = None) -> int:
+    """Print an import-time breakdown for a cold `import module`.
+
+    Behavior:
+    - Imports `module` in a fresh interpreter with `-X importtime`, so the
+      numbers reflect a cold start rather than this already-warm process.
+    - Prints the total plus the `top` most expensive imports made directly by
+      our own code and the slowest modules overall.
+    - Returns 1 if the total exceeds `budget_ms` (or env `STARTUP_BUDGET_MS`),
+      else 0, so CI / deploy scripts can gate on it.
+    """
+    if budget_ms is None and os.getenv("STARTUP_BUDGET_MS"):
+        budget_ms = float(os.getenv("STARTUP_BUDGET_MS"))
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=root,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        print(f"Startup report: importing {module} failed:\n{proc.stderr[-2000:]}")
+        return 1
+
+    rows = parse_importtime(proc.stderr)
+    # importtime lists a module after everything it imported, so the subtree
+    # of `import module` is the run of nested rows just before its own row.
+    end = max((i for i, r in enumerate(rows) if r["module"] == module), default=len(rows) - 1)
+    start = end
+    while start > 0 and rows[start - 1]["depth"] > 0:
+        start -= 1
+    subtree = rows[start : end + 1]
+    total_ms = subtree[-1]["cumulative_us"] / 1000.0 if subtree else 0.0
+    print(f"Cold import of {module}: {total_ms:.1f} ms ({len(subtree)} modules)")
+
+    ours = [r for r in subtree if r["module"].startswith("src.") and r["module"] != module]
+    print(f"\n{'project module':40} {'cumulative ms':>14} {'self ms':>10}")
+    for r in sorted(ours, key=lambda r: -r["cumulative_us"])[:top]:
+        print(f"{r['module']:40} {r['cumulative_us'] / 1000.0:>14.1f} {r['self_us'] / 1000.0:>10.1f}")
+
+    # Third-party / stdlib cost, charged to the first import of each package.
+    packages = {}
+    for r in subtree:
+        name = r["module"].split(".")[0]
+        if name != "src":
+            packages[name] = max(packages.get(name, 0), r["cumulative_us"])
+    print(f"\n{'package':40} {'cumulative ms':>14}")
+    for name, cumulative_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"{name:40} {cumulative_us / 1000.0:>14.1f}")
+
+    if budget_ms is not None:
+        within = total_ms <= budget_ms
+        print(f"\nStartup budget {budget_ms:.0f} ms: {'OK' if within else 'EXCEEDED'}")
+        return 0 if within else 1
+    return 0
 
 
 if __name__ == "__main__":
@@ -153,8 +659,50 @@ if __name__ == "__main__":
     parser.add_argument(
         "--fail-on-migrate-error", dest="fail_on_migrate_error", action="store_true", help="If auto-migrate fails, abort startup"
     )
+    # a batch starts new runs, so it cannot resume one
+    runs = parser.add_mutually_exclusive_group()
+    runs.add_argument("--batch", type=int, default=None, metavar="N", help="Produce N content pieces in one process")
+    parser.add_argument(
+        "--max-concurrency",
+        dest="max_concurrency",
+        type=int,
+        default=int(os.getenv("BATCH_MAX_CONCURRENCY", "4")),
+        help="With --batch, how many pieces may be in flight at once",
+    )
+    runs.add_argument("--resume", default=None, metavar="RUN_ID", help="Resume a failed run, skipping the stages it already finished")
+    parser.add_argument("--job-id", dest="job_id", default=os.getenv("JOB_ID"), help="Job id to tag tracing spans with")
+    parser.add_argument(
+        "--startup-report",
+        dest="startup_report",
+        action="store_true",
+        help="Print a cold-start import-time breakdown and exit (non-zero if over STARTUP_BUDGET_MS)",
+    )
+    parser.add_argument("--startup-budget-ms", dest="startup_budget_ms", type=float, default=None, help="Budget for --startup-report")
+    parser.add_argument(
+        "--fill-concept-queue",
+        dest="fill_concept_queue",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Generate N concepts in one model call, add them to the concept queue and exit",
+    )
     parser.set_defaults(dry_run=is_dry_run, auto_migrate=False, fail_on_migrate_error=False)
     args = parser.parse_args()
     print(f"args.dry_run: {args.dry_run}")
 
-    run(dry_run=args.dry_run, auto_migrate=args.auto_migrate, fail_on_migrate_error=args.fail_on_migrate_error)
+    if args.startup_report:
+        sys.exit(startup_report(budget_ms=args.startup_budget_ms))
+
+    if args.fill_concept_queue:
+        fill_concept_queue(args.fill_concept_queue, dry_run=args.dry_run)
+        sys.exit(0)
+
+    run(
+        dry_run=args.dry_run,
+        auto_migrate=args.auto_migrate,
+        fail_on_migrate_error=args.fail_on_migrate_error,
+        batch=args.batch,
+        max_concurrency=args.max_concurrency,
+        resume=args.resume,
+        job_id=args.job_id,
+    )
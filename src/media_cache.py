@@ -0,0 +1,164 @@
+"""Shared on-disk cache for downloaded media (stock images, background music).
+
+Usage:
+    cache = MediaCache()
+    path = cache.get(BACKGROUND_MUSIC_URL)       # local file, or None if unavailable
+    cache.copy_to(FALLBACK_IMAGE_URL, "generated_image.png")
+
+Pre-seed at image build time (e.g. in the Dockerfile), so containers start warm:
+    python -m src.media_cache seed [URL ...]     # defaults to DEFAULT_SEED_URLS
+
+Behavior:
+- Bodies are stored content-addressed under `MEDIA_CACHE_DIR` (default
+  `.media_cache`) as `blobs/<sha256>`; `urls/<sha256 of url>.json` maps a URL
+  to its blob plus the `ETag` / `Last-Modified` the server sent.
+- A URL fetched within `MEDIA_CACHE_TTL_S` (default 86400) is served from
+  disk with no network round-trip. After that it is revalidated with
+  `If-None-Match` / `If-Modified-Since`; a 304 just refreshes the entry.
+- If revalidation fails (network down, 5xx), the stale copy is served.
+- Blobs and index entries are written to a temp file and renamed into place,
+  so any number of processes can share the directory. Two processes that
+  miss at once both download; either result is valid.
+- Set `MEDIA_CACHE=false` to bypass the cache (every `get` downloads to a
+  fresh file in the cache directory, as before).
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Iterable, Optional
+
+from . import http_session, tracing
+
+logger = logging.getLogger(__name__)
+
+# Stock media used by the fallback and dry-run paths
+FALLBACK_IMAGE_URL = "https://images.unsplash.com/photo-1620641788421-7a1c342ea42e?q=80&w=1974&auto=format&fit=crop"
+PLACEHOLDER_IMAGE_URL = "https://images.unsplash.com/photo-1503264116251-35a269479413"
+BACKGROUND_MUSIC_URL = "https://www.soundhelix.com/examples/mp3/SoundHelix-Song-1.mp3"
+DEFAULT_SEED_URLS = (FALLBACK_IMAGE_URL, PLACEHOLDER_IMAGE_URL, BACKGROUND_MUSIC_URL)
+
+
+class MediaCache:
+    def __init__(self, directory: Optional[str] = None, ttl_s: Optional[float] = None, enabled: Optional[bool] = None):
+        self.directory = directory or os.getenv("MEDIA_CACHE_DIR") or ".media_cache"
+        self.ttl_s = ttl_s if ttl_s is not None else float(os.getenv("MEDIA_CACHE_TTL_S", "86400"))
+        if enabled is None:
+            enabled = os.getenv("MEDIA_CACHE", "true").lower() in ("1", "true", "yes")
+        self.enabled = enabled
+
+    def _index_path(self, url: str) -> str:
+        return os.path.join(self.directory, "urls", hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "blobs", digest)
+
+    def _read_index(self, url: str) -> Optional[dict]:
+        try:
+            with open(self._index_path(url)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if os.path.exists(self._blob_path(entry.get("digest", ""))) else None
+
+    def _write_atomic(self, path: str, write) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+
+    def _write_index(self, url: str, entry: dict) -> None:
+        self._write_atomic(self._index_path(url), lambda f: f.write(json.dumps(entry).encode()))
+
+    def _download(self, url: str, entry: Optional[dict], timeout: float) -> dict:
+        """GET `url` (conditionally if we hold a copy); returns the new index entry."""
+        headers = {}
+        if entry and self.enabled:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        with tracing.span("http.media", url=url, revalidate=bool(headers)) as sp:
+            resp = http_session.get(url, headers=headers, stream=True, timeout=timeout)
+            with resp:
+                if resp.status_code == 304 and entry:
+                    sp.set(status=304)
+                    return dict(entry, fetched_at=time.time())
+                resp.raise_for_status()
+
+                digest = hashlib.sha256()
+                blobs = os.path.join(self.directory, "blobs")
+                os.makedirs(blobs, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=blobs, prefix=".tmp-")
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        for chunk in resp.iter_content(chunk_size=1024 * 1024):
+                            f.write(chunk)
+                            digest.update(chunk)
+                            sp.add_bytes(len(chunk))
+                    os.replace(tmp, self._blob_path(digest.hexdigest()))
+                finally:
+                    if os.path.exists(tmp):
+                        os.unlink(tmp)
+                return {
+                    "url": url,
+                    "digest": digest.hexdigest(),
+                    "etag": resp.headers.get("ETag"),
+                    "last_modified": resp.headers.get("Last-Modified"),
+                    "fetched_at": time.time(),
+                }
+
+    def get(self, url: str, timeout: float = 60) -> Optional[str]:
+        """Local path holding `url`'s content, downloading or revalidating as needed; None if unavailable.
+
+        The returned file is shared: copy it (see `copy_to`) before modifying it.
+        """
+        entry = self._read_index(url) if self.enabled else None
+        if entry and time.time() - entry.get("fetched_at", 0) < self.ttl_s:
+            return self._blob_path(entry["digest"])
+        try:
+            fresh = self._download(url, entry, timeout)
+        except Exception as e:
+            if entry:
+                logger.warning(f"Revalidating {url} failed ({e}); serving the cached copy.")
+                return self._blob_path(entry["digest"])
+            logger.warning(f"Failed to download {url}: {e}")
+            return None
+        try:
+            self._write_index(url, fresh)
+        except OSError as e:
+            logger.warning(f"Media cache index write failed for {url}: {e}")
+        return self._blob_path(fresh["digest"])
+
+    def copy_to(self, url: str, output_path: str, timeout: float = 60) -> Optional[str]:
+        """Copy `url`'s content to `output_path` and return it, or None if unavailable."""
+        path = self.get(url, timeout=timeout)
+        if path is None:
+            return None
+        shutil.copyfile(path, output_path)
+        return output_path
+
+    def seed(self, urls: Iterable[str]) -> int:
+        """Fetch every URL into the cache; returns how many are available."""
+        return sum(self.get(url) is not None for url in urls)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if not args or args[0] != "seed":
+        print("usage: python -m src.media_cache seed [URL ...]", file=sys.stderr)
+        sys.exit(2)
+    urls = args[1:] or DEFAULT_SEED_URLS
+    cached = MediaCache().seed(urls)
+    print(f"Media cache: {cached}/{len(urls)} URLs available")
+    sys.exit(0 if cached == len(urls) else 1)
@@ -0,0 +1,233 @@
+"""Latency-aware provider routing with circuit breakers.
+
+Usage:
+    router = ProviderRouter()
+    for name in router.order(["image:openrouter", "image:stability", "image:gemini"]):
+        try:
+            with router.track(name):
+                return call(name)
+        except Exception:
+            continue  # next provider
+
+Summarise the recorded calls:
+    python -m src.provider_router
+
+Behavior:
+- Every tracked call records (provider, ok, latency) in SQLite at
+  `PROVIDER_STATS_PATH` (default `.provider_stats.sqlite3`), shared by every
+  process on the machine. Only the last `PROVIDER_WINDOW` calls (default 50)
+  per provider are kept, so the stats follow recent behaviour.
+- `stats(name)` gives the rolling success rate and p50/p95 latency of
+  successful calls.
+- After `CIRCUIT_FAILURES` consecutive failures (default 3) a provider's
+  circuit opens for `CIRCUIT_COOLDOWN_S` seconds (default 300). While it is
+  open, `order` leaves the provider out and `allow` returns False. Once the
+  cooldown has passed, calls are let through again (half-open): a success
+  closes the circuit, and since the failure count is kept until then, a
+  single further failure opens it again.
+- `order(names)` ranks the providers whose circuit is closed by expected
+  latency (p50 divided by success rate). Providers with fewer than
+  `PROVIDER_MIN_CALLS` (default 3) recorded calls keep their configured
+  order behind the measured ones. Callers keep their own last resort
+  (ffmpeg, the stock image) for when every circuit is open.
+- Storage errors are logged and ignored; routing then falls back to the
+  configured order. Set `PROVIDER_ROUTING=false` to disable recording,
+  circuits and reordering.
+"""
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderUnavailable(RuntimeError):
+    """Raised instead of calling a provider whose circuit is open."""
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class ProviderRouter:
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        window: Optional[int] = None,
+        failure_threshold: Optional[int] = None,
+        cooldown_s: Optional[float] = None,
+        min_calls: Optional[int] = None,
+        enabled: Optional[bool] = None,
+    ):
+        self.path = path or os.getenv("PROVIDER_STATS_PATH") or ".provider_stats.sqlite3"
+        self.window = window or int(os.getenv("PROVIDER_WINDOW", "50"))
+        self.failure_threshold = failure_threshold or int(os.getenv("CIRCUIT_FAILURES", "3"))
+        self.cooldown_s = cooldown_s if cooldown_s is not None else float(os.getenv("CIRCUIT_COOLDOWN_S", "300"))
+        self.min_calls = min_calls or int(os.getenv("PROVIDER_MIN_CALLS", "3"))
+        if enabled is None:
+            enabled = os.getenv("PROVIDER_ROUTING", "true").lower() in ("1", "true", "yes")
+        self.enabled = enabled
+        self._table_lock = threading.Lock()
+        self._table_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        if not self._table_ready:
+            with self._table_lock:
+                conn.execute("CREATE TABLE IF NOT EXISTS provider_calls (id INTEGER PRIMARY KEY AUTOINCREMENT, provider TEXT NOT NULL, ok INTEGER NOT NULL, latency_ms REAL NOT NULL, at REAL NOT NULL)")
+                conn.execute("CREATE INDEX IF NOT EXISTS provider_calls_provider ON provider_calls (provider, id)")
+                conn.execute("CREATE TABLE IF NOT EXISTS provider_circuits (provider TEXT PRIMARY KEY, failures INTEGER NOT NULL, open_until REAL NOT NULL)")
+                self._table_ready = True
+        return conn
+
+    # -- recording -------------------------------------------------------
+
+    def record(self, provider: str, ok: bool, latency_s: float) -> None:
+        """Record one call and update the provider's circuit."""
+        if not self.enabled:
+            return
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.execute("INSERT INTO provider_calls (provider, ok, latency_ms, at) VALUES (?, ?, ?, ?)", (provider, int(ok), latency_s * 1000.0, now))
+                    conn.execute(
+                        "DELETE FROM provider_calls WHERE provider = ? AND id NOT IN "
+                        "(SELECT id FROM provider_calls WHERE provider = ? ORDER BY id DESC LIMIT ?)",
+                        (provider, provider, self.window),
+                    )
+                    row = conn.execute("SELECT failures FROM provider_circuits WHERE provider = ?", (provider,)).fetchone()
+                    failures = 0 if ok else (row[0] if row else 0) + 1
+                    open_until = now + self.cooldown_s if failures >= self.failure_threshold else 0.0
+                    conn.execute("INSERT OR REPLACE INTO provider_circuits (provider, failures, open_until) VALUES (?, ?, ?)", (provider, failures, open_until))
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Provider stats write failed for {provider}: {e}")
+            return
+        if not ok and open_until:
+            print(f"Circuit open for {provider} for {self.cooldown_s:.0f}s after {failures} consecutive failures")
+
+    @contextmanager
+    def track(self, provider: str, ignore: tuple = (), neutral: Optional[Callable[[Exception], bool]] = None):
+        """Time the enclosed call and record its outcome; exceptions propagate.
+
+        `ProviderUnavailable` and the exception types in `ignore` (e.g. a
+        cancelled hedge) are not the provider's fault and are not recorded;
+        neither is an exception for which `neutral(exc)` is true (e.g. a 429,
+        which the rate limiter handles).
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except (ProviderUnavailable,) + tuple(ignore):
+            raise
+        except Exception as exc:
+            if neutral is None or not neutral(exc):
+                self.record(provider, False, time.perf_counter() - start)
+            raise
+        self.record(provider, True, time.perf_counter() - start)
+
+    # -- querying --------------------------------------------------------
+
+    def allow(self, provider: str) -> bool:
+        """False while `provider`'s circuit is open."""
+        if not self.enabled:
+            return True
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute("SELECT open_until FROM provider_circuits WHERE provider = ?", (provider,)).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Provider stats read failed for {provider}: {e}")
+            return True
+        return row is None or row[0] <= time.time()
+
+    def check(self, provider: str) -> None:
+        """Raise `ProviderUnavailable` while `provider`'s circuit is open."""
+        if not self.allow(provider):
+            raise ProviderUnavailable(f"{provider} circuit is open; skipping it")
+
+    def stats(self, provider: str) -> Dict[str, object]:
+        """Rolling calls, success rate, p50/p95 latency (ms, successful calls) and circuit state."""
+        try:
+            conn = self._connect()
+            try:
+                rows = conn.execute("SELECT ok, latency_ms FROM provider_calls WHERE provider = ?", (provider,)).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Provider stats read failed for {provider}: {e}")
+            rows = []
+        latencies = [latency for ok, latency in rows if ok]
+        return {
+            "calls": len(rows),
+            "success_rate": round(len(latencies) / len(rows), 3) if rows else None,
+            "p50_ms": round(_percentile(latencies, 50), 1) if latencies else None,
+            "p95_ms": round(_percentile(latencies, 95), 1) if latencies else None,
+            "open": not self.allow(provider),
+        }
+
+    def _score(self, stats: Dict[str, object]) -> Optional[float]:
+        """Expected latency per successful call, or None without enough data."""
+        if stats["calls"] < self.min_calls:
+            return None
+        if not stats["success_rate"]:
+            return float("inf")
+        return stats["p50_ms"] / stats["success_rate"]
+
+    def order(self, providers: Sequence[str]) -> List[str]:
+        """Providers with a closed circuit, fastest first (see module docstring)."""
+        providers = list(providers)
+        if not self.enabled:
+            return providers
+        candidates = []
+        for index, name in enumerate(providers):
+            stats = self.stats(name)
+            if stats["open"]:
+                continue
+            score = self._score(stats)
+            candidates.append((score is None, score or 0.0, index, name))
+        return [name for *_, name in sorted(candidates)]
+
+    def providers(self) -> List[str]:
+        try:
+            conn = self._connect()
+            try:
+                rows = conn.execute("SELECT DISTINCT provider FROM provider_calls UNION SELECT provider FROM provider_circuits ORDER BY 1").fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Provider stats read failed: {e}")
+            return []
+        return [row[0] for row in rows]
+
+
+def _print_summary(router: ProviderRouter) -> None:
+    print(f"{'provider':<28} {'calls':>6} {'success':>8} {'p50_ms':>10} {'p95_ms':>10}  circuit")
+    for name in router.providers():
+        s = router.stats(name)
+        success = "-" if s["success_rate"] is None else f"{s['success_rate']:.0%}"
+        p50 = "-" if s["p50_ms"] is None else f"{s['p50_ms']:.1f}"
+        p95 = "-" if s["p95_ms"] is None else f"{s['p95_ms']:.1f}"
+        print(f"{name:<28} {s['calls']:>6} {success:>8} {p50:>10} {p95:>10}  {'open' if s['open'] else 'closed'}")
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else None
+    _print_summary(ProviderRouter(path=path))
@@ -0,0 +1,245 @@
+"""Cross-process token-bucket rate limiter for provider quotas.
+
+Usage:
+    limiter = RateLimiter()
+    key = "gemini:gemini-pro"
+    limiter.acquire(key)              # waits only as long as the bucket needs
+    try:
+        ...call the provider...
+    except requests.HTTPError as exc:
+        if exc.response.status_code == 429:
+            limiter.penalize(key, retry_after_seconds(exc) or 30)
+
+Behavior:
+- One bucket per provider and model (e.g. `gemini:gemini-pro`,
+  `gemini:imagen-3.0-generate-002`, `openrouter:<model>`). Bucket state lives
+  in SQLite at `RATE_LIMIT_PATH` (default `.rate_limits.sqlite3`), updated
+  under `BEGIN IMMEDIATE`, so every worker process on the machine draws from
+  the same bucket. With `REDIS_URL` set (and the `redis` package installed)
+  the state lives in Redis instead and is shared across machines.
+- Rates come from `RATE_LIMITS`, comma-separated `key=count/seconds[/burst]`
+  entries, e.g. `gemini=60/60,gemini:imagen-3.0-generate-002=10/60`. A key
+  matches exactly or by its provider prefix. Burst defaults to 1, so calls
+  are spaced evenly and a window never sees more than `count` (+1) calls.
+  Buckets without a rate never wait for tokens, and reserving one only
+  reads its `penalize` block (no write transaction, no file created).
+- `acquire` reserves a token and sleeps until it is due. Reservations can
+  run the bucket negative, so concurrent callers queue up behind each other
+  instead of all retrying at once.
+- `penalize(key, seconds)` blocks the bucket for everyone, e.g. for the
+  `Retry-After` of a 429; `acquire` then also waits out the block.
+- Storage errors are logged and the call proceeds without waiting. Set
+  `RATE_LIMIT=false` to disable.
+"""
+import asyncio
+import datetime
+import email.utils
+import logging
+import os
+import re
+import sqlite3
+import time
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_REDIS_SCRIPT = """
+local now = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local burst = tonumber(ARGV[3])
+local block_until = tonumber(ARGV[4])
+local take = tonumber(ARGV[5])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at', 'blocked_until')
+local tokens = tonumber(state[1]) or burst
+local updated_at = tonumber(state[2]) or now
+local blocked_until = tonumber(state[3]) or 0
+if rate > 0 then tokens = math.min(burst, tokens + (now - updated_at) * rate) end
+if block_until > blocked_until then
+  blocked_until = block_until
+  if tokens > 0 then tokens = 0 end
+end
+local wait = 0
+if rate > 0 and take > 0 then
+  tokens = tokens - take
+  if tokens < 0 then wait = -tokens / rate end
+end
+if blocked_until - now > wait then wait = blocked_until - now end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now, 'blocked_until', blocked_until)
+redis.call('EXPIRE', KEYS[1], 86400)
+return tostring(wait)
+"""
+
+
+def parse_rate_limits(spec: str) -> Dict[str, Tuple[float, float]]:
+    """Parse `key=count/seconds[/burst]` entries into {key: (tokens_per_second, burst)}."""
+    limits = {}
+    for item in spec.split(","):
+        key, _, value = item.strip().partition("=")
+        parts = value.strip().split("/")
+        try:
+            count, seconds = float(parts[0]), float(parts[1])
+            burst = float(parts[2]) if len(parts) > 2 else 1.0
+        except (IndexError, ValueError):
+            if item.strip():
+                logger.warning(f"Ignoring malformed RATE_LIMITS entry: {item.strip()!r}")
+            continue
+        if key.strip() and count > 0 and seconds > 0:
+            limits[key.strip()] = (count / seconds, max(1.0, burst))
+    return limits
+
+
+def retry_after_seconds(exc: Exception) -> Optional[float]:
+    """Seconds the server asked us to wait, from a `Retry-After` header or a quota error message."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("Retry-After") if hasattr(headers, "get") else None
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+            return max(0.0, (when - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            pass
+    # google api_core ResourceExhausted carries the hint in its message
+    m = re.search(r"retry_delay\s*\{\s*seconds:\s*(\d+)", str(exc)) or re.search(r"retry in ([\d.]+)\s*s", str(exc), re.IGNORECASE)
+    return float(m.group(1)) if m else None
+
+
+def _advance(state, now: float, rate: float, burst: float, block_until: float, take: int) -> Tuple[Tuple[float, float, float], float]:
+    """Apply one reservation / block to (tokens, updated_at, blocked_until); returns (new_state, wait_s)."""
+    tokens, updated_at, blocked_until = state if state else (burst, now, 0.0)
+    if rate > 0:
+        tokens = min(burst, tokens + (now - updated_at) * rate)
+    if block_until > blocked_until:
+        blocked_until = block_until
+        tokens = min(tokens, 0.0)
+    wait = 0.0
+    if rate > 0 and take > 0:
+        tokens -= take
+        if tokens < 0:
+            wait = -tokens / rate
+    wait = max(wait, blocked_until - now)
+    return (tokens, now, blocked_until), wait
+
+
+class RateLimiter:
+    def __init__(self, path: Optional[str] = None, redis_url: Optional[str] = None, limits: Optional[Dict[str, Tuple[float, float]]] = None, enabled: Optional[bool] = None):
+        self.path = path or os.getenv("RATE_LIMIT_PATH") or ".rate_limits.sqlite3"
+        self.limits = limits if limits is not None else parse_rate_limits(os.getenv("RATE_LIMITS", ""))
+        if enabled is None:
+            enabled = os.getenv("RATE_LIMIT", "true").lower() in ("1", "true", "yes")
+        self.enabled = enabled
+        self._redis = None
+        self._redis_script = None
+        redis_url = redis_url or os.getenv("REDIS_URL")
+        if redis_url and enabled:
+            try:
+                import redis
+
+                self._redis = redis.Redis.from_url(redis_url)
+                self._redis_script = self._redis.register_script(_REDIS_SCRIPT)
+            except ImportError:
+                logger.warning("REDIS_URL is set but the redis package is not installed; using SQLite rate limits.")
+        self._table_ready = False
+
+    @property
+    def backend(self) -> str:
+        return "redis" if self._redis is not None else "sqlite"
+
+    def limit_for(self, key: str) -> Tuple[float, float]:
+        """(tokens_per_second, burst) for `key`; (0, 1) means no rate limit."""
+        if key in self.limits:
+            return self.limits[key]
+        provider = key.split(":", 1)[0]
+        return self.limits.get(provider, (0.0, 1.0))
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        if not self._table_ready:
+            conn.execute("CREATE TABLE IF NOT EXISTS rate_buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL, blocked_until REAL NOT NULL)")
+            self._table_ready = True
+        return conn
+
+    def _update(self, key: str, block_until: float, take: int) -> float:
+        rate, burst = self.limit_for(key)
+        now = time.time()
+        if self._redis is not None:
+            return float(self._redis_script(keys=[f"rate_limit:{key}"], args=[now, rate, burst, block_until, take]))
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                state = conn.execute("SELECT tokens, updated_at, blocked_until FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+                new_state, wait = _advance(state, now, rate, burst, block_until, take)
+                conn.execute("INSERT OR REPLACE INTO rate_buckets (key, tokens, updated_at, blocked_until) VALUES (?, ?, ?, ?)", (key,) + new_state)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+        return wait
+
+    def _blocked_for(self, key: str) -> float:
+        """Seconds left on `key`'s `penalize` block, read without taking a write lock."""
+        now = time.time()
+        if self._redis is not None:
+            blocked_until = self._redis.hget(f"rate_limit:{key}", "blocked_until")
+            return float(blocked_until) - now if blocked_until is not None else 0.0
+        if not os.path.exists(self.path):
+            return 0.0
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            row = conn.execute("SELECT blocked_until FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+        except sqlite3.OperationalError:
+            return 0.0  # nothing was ever penalized, so the table does not exist yet
+        finally:
+            conn.close()
+        return row[0] - now if row else 0.0
+
+    def reserve(self, key: str) -> float:
+        """Take a token from `key`'s bucket; returns the seconds to wait before using it."""
+        if not self.enabled:
+            return 0.0
+        try:
+            if self.limit_for(key)[0] <= 0:
+                # no rate: there are no tokens to take, only a 429 block to honour
+                return max(0.0, self._blocked_for(key))
+            return max(0.0, self._update(key, 0.0, 1))
+        except Exception as e:
+            logger.warning(f"Rate limiter unavailable ({e}); not waiting.")
+            return 0.0
+
+    def acquire(self, key: str) -> float:
+        """Block until a call against `key` is allowed; returns the seconds waited."""
+        wait = self.reserve(key)
+        if wait > 0:
+            print(f"Rate limit for {key}: waiting {wait:.1f}s")
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, key: str) -> float:
+        wait = await asyncio.to_thread(self.reserve, key)
+        if wait > 0:
+            print(f"Rate limit for {key}: waiting {wait:.1f}s")
+            await asyncio.sleep(wait)
+        return wait
+
+    def penalize(self, key: str, seconds: float) -> bool:
+        """Block `key` for every worker for `seconds` (e.g. a 429's `Retry-After`).
+
+        Returns whether the block was recorded; when it was not, the caller's
+        next `acquire` will not wait it out.
+        """
+        if not self.enabled or seconds <= 0:
+            return False
+        try:
+            self._update(key, time.time() + seconds, 0)
+            return True
+        except Exception as e:
+            logger.warning(f"Rate limiter unavailable ({e}); could not record back-off for {key}.")
+            return False
@@ -0,0 +1,132 @@
+"""Warm in-process runtime for long-lived workers.
+
+The scaffold worker used to start `python -m src.main` for every job, paying
+interpreter start-up, the google SDK imports, dotenv loading, YouTube auth /
+discovery and SQLAlchemy engine creation each time. `WarmRuntime` keeps all
+of that alive across jobs instead.
+
+Behavior:
+- Client sets (Gemini, video, Instagram, YouTube) are built once per
+  distinct (dry_run, settings overrides) combination and reused; the least
+  recently used sets are dropped beyond `max_client_sets`.
+- `run_job(job)` runs one job in-process. Whitelisted keys of
+  `job["settings"]` (see `JOB_SETTING_ENV`) are applied as environment
+  overrides for the duration of the job only. Because `os.environ` is
+  process-wide, jobs run one at a time under a lock.
+- The one-time `AUTO_MIGRATE_ON_START` cref migration (`src.main.run()`'s
+  start-up step) runs before the first job, as it did in each subprocess.
+- Any exception raised by a job is captured in the returned status dict; it
+  never escapes into the worker loop. Spans are tagged with the job id.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from . import tracing
+from .main import auto_migrate_on_start, build_clients, orchestrate
+
+# job["settings"] key -> environment variable it overrides for that job.
+# Credentials and storage locations are deliberately not overridable.
+JOB_SETTING_ENV = {
+    "content_style": "CONTENT_STYLE",
+    "video_duration": "VIDEO_DURATION",
+    "privacy_status": "YOUTUBE_PRIVACY_STATUS",
+    "image_provider": "IMAGE_PROVIDER",
+    "image_aspect_ratio": "IMAGE_ASPECT_RATIO",
+    "video_provider": "VIDEO_PROVIDER",
+    "gemini_model": "GEMINI_MODEL",
+}
+
+
+def job_overrides(settings: Optional[dict]) -> Dict[str, str]:
+    """Map a job's settings to the environment overrides applied while it runs."""
+    overrides = {}
+    for key, value in (settings or {}).items():
+        env_name = JOB_SETTING_ENV.get(key)
+        if env_name and value is not None:
+            overrides[env_name] = str(value)
+    return overrides
+
+
+@contextmanager
+def env_overrides(overrides: Dict[str, str]):
+    """Temporarily set environment variables, restoring the previous values."""
+    previous = {name: os.environ.get(name) for name in overrides}
+    os.environ.update(overrides)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+class WarmRuntime:
+    def __init__(self, default_dry_run: Optional[bool] = None, max_client_sets: int = 4):
+        if default_dry_run is None:
+            default_dry_run = os.getenv("DRY_RUN", "true").lower() in ("1", "true", "yes")
+        self.default_dry_run = default_dry_run
+        self.max_client_sets = max(1, max_client_sets)
+        self._clients: "OrderedDict[Tuple, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_ready = False
+        self._migrated = False
+
+    def clients_for(self, dry_run: bool, overrides: Dict[str, str]) -> dict:
+        """Return the cached client set for this configuration, building it if needed.
+
+        Must be called with `overrides` already applied to the environment,
+        since the clients read their configuration at construction time.
+        """
+        key = (dry_run, tuple(sorted(overrides.items())))
+        clients = self._clients.get(key)
+        if clients is None:
+            print(f"Runtime: building clients for dry_run={dry_run}, overrides={overrides or '{}'}")
+            clients = build_clients(dry_run=dry_run)
+            self._clients[key] = clients
+            while len(self._clients) > self.max_client_sets:
+                self._clients.popitem(last=False)
+        else:
+            self._clients.move_to_end(key)
+        return clients
+
+    def _ensure_db(self) -> None:
+        if not self._db_ready:
+            from .database import init_db
+
+            init_db()
+            self._db_ready = True
+
+    def _ensure_migrated(self) -> None:
+        if not self._migrated:
+            auto_migrate_on_start()
+            self._migrated = True
+
+    def run_job(self, job: dict) -> dict:
+        """Run one job in-process and return a status dict for the job event."""
+        job_id = job.get("id")
+        settings = job.get("settings") or {}
+        job_dry = settings.get("dry_run")
+        dry_run = self.default_dry_run if job_dry is None else bool(job_dry)
+        overrides = job_overrides(settings)
+
+        started = time.perf_counter()
+        status = {"job_id": job_id, "dry_run": dry_run}
+        with self._lock, env_overrides(overrides), tracing.job_context(job_id):
+            try:
+                if not dry_run:
+                    self._ensure_db()
+                self._ensure_migrated()
+                clients = self.clients_for(dry_run, overrides)
+                result = orchestrate(dry_run=dry_run, clients=clients)
+                status.update(status="completed", run_id=result.get("run_id"))
+            except (Exception, SystemExit) as e:  # SystemExit: AUTO_MIGRATE_FAIL_ON_ERROR
+                print(f"Runtime: job {job_id} failed: {e}")
+                status.update(status="failed", error=str(e))
+        status["duration_s"] = round(time.perf_counter() - started, 3)
+        return status
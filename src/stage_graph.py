@@ -0,0 +1,181 @@
+"""Small dependency-graph executor used by the orchestrator.
+
+Each stage names the stages it depends on. A stage starts as soon as all of
+its dependencies have finished, so independent stages (e.g. caption drafting
+and image rendering) run concurrently on a thread pool.
+
+Behavior:
+- A stage function receives the results of its dependencies as positional
+  arguments, in the order the dependencies were declared.
+- If a required stage raises, no new stages are started and the exception is
+  re-raised from `run()` once running stages have finished.
+- If an `optional` stage raises, the error is logged and recorded in
+  `errors`, and its result is `None` for any dependents.
+- `run_async()` drives the same graph from an event loop: coroutine stage
+  functions are awaited directly and plain functions run in a thread.
+- Stages listed in `completed` (e.g. loaded from checkpoints) are not run;
+  their stored result is handed to dependents. `on_complete(name, result)`
+  is called after every stage that finishes successfully.
+- Each executed stage is wrapped in a `stage.<name>` tracing span; the
+  caller's tracing context (job id, parent span) is carried into the stage
+  threads.
+"""
+import asyncio
+import contextvars
+import inspect
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional
+
+from . import tracing
+
+logger = logging.getLogger(__name__)
+
+
+class Stage:
+    def __init__(self, name: str, fn: Callable, deps: Iterable[str] = (), optional: bool = False):
+        self.name = name
+        self.fn = fn
+        self.deps = list(deps)
+        self.optional = optional
+
+
+class StageGraph:
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        completed: Optional[Dict[str, object]] = None,
+        on_complete: Optional[Callable[[str, object], None]] = None,
+    ):
+        self.max_workers = max_workers
+        self.stages: Dict[str, Stage] = {}
+        self.results: Dict[str, object] = dict(completed or {})
+        self.errors: Dict[str, BaseException] = {}
+        self.on_complete = on_complete
+
+    def add(self, name: str, fn: Callable, deps: Iterable[str] = (), optional: bool = False) -> None:
+        if name in self.stages:
+            raise ValueError(f"Stage '{name}' is already defined")
+        self.stages[name] = Stage(name, fn, deps, optional=optional)
+
+    def _validate(self) -> None:
+        for stage in self.stages.values():
+            for dep in stage.deps:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+
+        # Kahn's algorithm: every stage must be reachable without a cycle
+        indegree = {name: len(stage.deps) for name, stage in self.stages.items()}
+        ready = [name for name, n in indegree.items() if n == 0]
+        seen = 0
+        while ready:
+            current = ready.pop()
+            seen += 1
+            for stage in self.stages.values():
+                if current in stage.deps:
+                    indegree[stage.name] -= 1
+                    if indegree[stage.name] == 0:
+                        ready.append(stage.name)
+        if seen != len(self.stages):
+            raise ValueError("Stage graph contains a cycle")
+
+    def _ready_stages(self, done: set, running: set) -> List[Stage]:
+        return [
+            stage
+            for name, stage in self.stages.items()
+            if name not in done and name not in running and all(dep in done for dep in stage.deps)
+        ]
+
+    def _record(self, name: str, result: object = None, exc: Optional[BaseException] = None) -> Optional[BaseException]:
+        """Store a finished stage's outcome. Returns the exception if the run must stop."""
+        stage = self.stages[name]
+        if exc is None:
+            self.results[name] = result
+            if self.on_complete is not None:
+                try:
+                    self.on_complete(name, result)
+                except Exception as cb_exc:
+                    logger.warning("on_complete callback failed for stage '%s': %s", name, cb_exc)
+            return None
+        self.errors[name] = exc
+        self.results[name] = None
+        if stage.optional:
+            logger.warning("Optional stage '%s' failed: %s", name, exc)
+            return None
+        logger.error("Stage '%s' failed: %s", name, exc)
+        return exc
+
+    @staticmethod
+    def _call_stage(stage: Stage, args: list):
+        with tracing.span(f"stage.{stage.name}"):
+            return stage.fn(*args)
+
+    @staticmethod
+    async def _call_stage_async(stage: Stage, args: list):
+        with tracing.span(f"stage.{stage.name}"):
+            return await stage.fn(*args)
+
+    def run(self) -> Dict[str, object]:
+        """Run all stages and return a mapping of stage name -> result."""
+        self._validate()
+        done: set = {name for name in self.results if name in self.stages}
+        running: dict = {}
+        failure: Optional[BaseException] = None
+
+        workers = self.max_workers or max(1, len(self.stages))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stage") as pool:
+            while len(done) < len(self.stages):
+                if failure is None:
+                    for stage in self._ready_stages(done, set(running.values())):
+                        args = [self.results.get(dep) for dep in stage.deps]
+                        ctx = contextvars.copy_context()
+                        running[pool.submit(ctx.run, self._call_stage, stage, args)] = stage.name
+
+                if not running:
+                    break
+
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    done.add(name)
+                    exc = future.exception()
+                    stop = self._record(name, None if exc else future.result(), exc)
+                    if failure is None:
+                        failure = stop
+
+        if failure is not None:
+            raise failure
+        return self.results
+
+    async def run_async(self) -> Dict[str, object]:
+        """Async variant of `run()` with the same failure semantics."""
+        self._validate()
+        done: set = {name for name in self.results if name in self.stages}
+        running: dict = {}
+        failure: Optional[BaseException] = None
+
+        while len(done) < len(self.stages):
+            if failure is None:
+                for stage in self._ready_stages(done, set(running.values())):
+                    args = [self.results.get(dep) for dep in stage.deps]
+                    if inspect.iscoroutinefunction(stage.fn):
+                        coro = self._call_stage_async(stage, args)
+                    else:
+                        coro = asyncio.to_thread(self._call_stage, stage, args)
+                    running[asyncio.ensure_future(coro)] = stage.name
+
+            if not running:
+                break
+
+            finished, _ = await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                name = running.pop(task)
+                done.add(name)
+                exc = task.exception()
+                stop = self._record(name, None if exc else task.result(), exc)
+                if failure is None:
+                    failure = stop
+
+        if failure is not None:
+            raise failure
+        return self.results
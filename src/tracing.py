@@ -0,0 +1,277 @@
+"""Lightweight tracing for orchestrator stages and outbound provider calls.
+
+Usage:
+    with tracing.span("gemini.call_api", backend="sdk") as sp:
+        ...
+        sp.add_retry()
+        sp.add_bytes(len(resp.content))
+
+Behavior:
+- Every span records start/end time, duration, retries, bytes moved, outcome
+  (`ok` or `error`) and free-form attributes, and is tagged with the current
+  job id (see `job_context`) and its parent span.
+- The job id and the active span live in context variables, so they follow
+  work into `asyncio` tasks, `asyncio.to_thread` and threads started through
+  `contextvars.copy_context()` (the stage graph does this).
+- Finished spans go to every registered exporter. Set `TRACE_EXPORT_PATH` to
+  append them as JSON lines to a file, or use `InMemoryCollector` as a local
+  collector stand-in (tests, benchmarks).
+
+Summarise an exported file with p50/p95 per span name:
+    python -m src.tracing summarize spans.jsonl
+"""
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional
+
+_job_id: contextvars.ContextVar = contextvars.ContextVar("trace_job_id", default=None)
+_current_span: contextvars.ContextVar = contextvars.ContextVar("trace_current_span", default=None)
+
+_exporters: List[Callable[[dict], None]] = []
+_exporters_lock = threading.Lock()
+
+
+class Span:
+    def __init__(self, name: str, parent: Optional["Span"] = None, job_id: Optional[str] = None, attrs: Optional[dict] = None):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent is not None else None
+        self.job_id = job_id
+        self.attrs = dict(attrs or {})
+        self.start = time.time()
+        self._start_perf = time.perf_counter()
+        self.end: Optional[float] = None
+        self.duration_ms: Optional[float] = None
+        self.retries = 0
+        self.bytes = 0
+        self.outcome = "ok"
+        self.error: Optional[str] = None
+
+    def add_retry(self, n: int = 1) -> None:
+        self.retries += n
+
+    def add_bytes(self, n: int) -> None:
+        if n:
+            self.bytes += int(n)
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def finish(self) -> None:
+        self.end = time.time()
+        self.duration_ms = round((time.perf_counter() - self._start_perf) * 1000.0, 3)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "job_id": self.job_id,
+            "start": self.start,
+            "end": self.end,
+            "duration_ms": self.duration_ms,
+            "retries": self.retries,
+            "bytes": self.bytes,
+            "outcome": self.outcome,
+            "error": self.error,
+            "attrs": self.attrs,
+        }
+
+
+class _NullSpan(Span):
+    """Returned by `current_span()` outside any span; records nothing."""
+
+    def __init__(self):
+        super().__init__("null")
+
+    def add_retry(self, n: int = 1) -> None:
+        pass
+
+    def add_bytes(self, n: int) -> None:
+        pass
+
+    def set(self, **attrs) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class JsonlExporter:
+    """Append finished spans to a JSON-lines file (safe across threads)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, record: dict) -> None:
+        line = json.dumps(record, default=str)
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+
+
+_env_exporters: Dict[str, JsonlExporter] = {}
+
+
+def _active_exporters() -> List[Callable[[dict], None]]:
+    with _exporters_lock:
+        exporters = list(_exporters)
+        path = os.getenv("TRACE_EXPORT_PATH")
+        if path:
+            if path not in _env_exporters:
+                _env_exporters[path] = JsonlExporter(path)
+            exporters.append(_env_exporters[path])
+    return exporters
+
+
+def add_exporter(exporter: Callable[[dict], None]) -> None:
+    with _exporters_lock:
+        _exporters.append(exporter)
+
+
+def remove_exporter(exporter: Callable[[dict], None]) -> None:
+    with _exporters_lock:
+        if exporter in _exporters:
+            _exporters.remove(exporter)
+
+
+def _export(sp: Span) -> None:
+    exporters = _active_exporters()
+    if not exporters:
+        return
+    record = sp.to_dict()
+    for exporter in exporters:
+        try:
+            exporter(record)
+        except Exception as e:
+            print(f"Warning: trace exporter failed: {e}", file=sys.stderr)
+
+
+def response_size(resp) -> int:
+    """Best-effort size of a fully-read `requests` response body."""
+    content = getattr(resp, "content", None)
+    return len(content) if isinstance(content, (bytes, str)) else 0
+
+
+def current_span() -> Span:
+    """The innermost active span, or a no-op span if there is none."""
+    return _current_span.get() or _NULL_SPAN
+
+
+def current_job_id() -> Optional[str]:
+    return _job_id.get()
+
+
+@contextmanager
+def job_context(job_id: Optional[str]):
+    """Tag every span started inside this block with `job_id`."""
+    token = _job_id.set(str(job_id) if job_id is not None else None)
+    try:
+        yield
+    finally:
+        _job_id.reset(token)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    sp = Span(name, parent=_current_span.get(), job_id=_job_id.get(), attrs=attrs)
+    token = _current_span.set(sp)
+    try:
+        yield sp
+    except BaseException as exc:
+        sp.outcome = "error"
+        sp.error = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        _current_span.reset(token)
+        sp.finish()
+        _export(sp)
+
+
+class InMemoryCollector:
+    """Local collector stand-in: keeps finished spans in memory.
+
+    with InMemoryCollector() as collector:
+        orchestrate(...)
+    summarize(collector.spans)
+    """
+
+    def __init__(self):
+        self.spans: List[dict] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, record: dict) -> None:
+        with self._lock:
+            self.spans.append(record)
+
+    def __enter__(self) -> "InMemoryCollector":
+        add_exporter(self)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        remove_exporter(self)
+
+    def by_name(self, name: str) -> List[dict]:
+        with self._lock:
+            return [s for s in self.spans if s["name"] == name]
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summarize(spans: Iterable[dict]) -> Dict[str, dict]:
+    """Aggregate spans per name: count, errors, retries, bytes, p50/p95 duration."""
+    grouped: Dict[str, List[dict]] = {}
+    for record in spans:
+        grouped.setdefault(record["name"], []).append(record)
+
+    summary = {}
+    for name, records in grouped.items():
+        durations = [r["duration_ms"] or 0.0 for r in records]
+        summary[name] = {
+            "count": len(records),
+            "errors": sum(1 for r in records if r["outcome"] != "ok"),
+            "retries": sum(r["retries"] for r in records),
+            "bytes": sum(r["bytes"] for r in records),
+            "p50_ms": _percentile(durations, 50),
+            "p95_ms": _percentile(durations, 95),
+        }
+    return summary
+
+
+def _print_summary(summary: Dict[str, dict]) -> None:
+    print(f"{'span':40} {'count':>6} {'errors':>6} {'retries':>7} {'p50 ms':>10} {'p95 ms':>10} {'bytes':>12}")
+    for name, row in sorted(summary.items(), key=lambda item: -item[1]["p95_ms"]):
+        print(
+            f"{name:40} {row['count']:>6} {row['errors']:>6} {row['retries']:>7} "
+            f"{row['p50_ms']:>10.1f} {row['p95_ms']:>10.1f} {row['bytes']:>12}"
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect exported trace spans")
+    sub = parser.add_subparsers(dest="command", required=True)
+    summarize_cmd = sub.add_parser("summarize", help="Print p50/p95 per span name from a JSONL export")
+    summarize_cmd.add_argument("path")
+    summarize_cmd.add_argument("--job-id", default=None, help="Only include spans for this job id")
+    args = parser.parse_args()
+
+    with open(args.path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    if args.job_id:
+        records = [r for r in records if r.get("job_id") == args.job_id]
+    _print_summary(summarize(records))
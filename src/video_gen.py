@@ -1,58 +1,201 @@
+import math
 import os
 import time
-import requests
+import asyncio
 import subprocess
 import logging
 import shutil
 import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from . import encoding, http_session, tracing
+from .artifact_cache import ArtifactCache, file_digest
+from .media_cache import BACKGROUND_MUSIC_URL, MediaCache
+from .provider_router import ProviderRouter
 
 logger = logging.getLogger(__name__)
 
+# Ken Burns camera paths as (zoom, x, y) at the start and end of the clip,
+# interpolated along the eased clip progress. "Z" is KEN_BURNS_ZOOM; x and y
+# place the view within the free space (0 = left/top, 0.5 = centre, 1 = right/bottom).
+KEN_BURNS_PATHS = {
+    "zoom_in": ((1, "Z"), (0.5, 0.5), (0.5, 0.5)),
+    "zoom_out": (("Z", 1), (0.5, 0.5), (0.5, 0.5)),
+    "pan_left": (("Z", "Z"), (1, 0), (0.5, 0.5)),
+    "pan_right": (("Z", "Z"), (0, 1), (0.5, 0.5)),
+    "pan_up": (("Z", "Z"), (0.5, 0.5), (1, 0)),
+    "pan_down": (("Z", "Z"), (0.5, 0.5), (0, 1)),
+}
+
+# Easing curves for the clip progress p in [0, 1]: (NumPy/float function, ffmpeg expression).
+KEN_BURNS_EASINGS = {
+    "linear": (lambda p: p, "{p}"),
+    "ease_in": (lambda p: p * p, "pow({p},2)"),
+    "ease_out": (lambda p: 1 - (1 - p) * (1 - p), "(1-pow(1-{p},2))"),
+    "ease_in_out": (lambda p: (1 - math.cos(math.pi * p)) / 2, "((1-cos(PI*{p}))/2)"),
+}
+
+VIDEO_PROVIDER_LABELS = {"luma": "the Luma-compatible API", "stability": "Stability AI", "openrouter": "OpenRouter"}
+
+# Resolved on first use by `_load_numpy()`; only the numpy renderer needs it.
+numpy = None
+
+
+def _load_numpy():
+    """Import NumPy on first use; None if it is not installed."""
+    global numpy
+    if numpy is None:
+        try:
+            import numpy as numpy_module
+        except ImportError:
+            return None
+        numpy = numpy_module
+    return numpy
+
+
+def _sample_axis(np, start: float, length: float, size: int, limit: int):
+    """Bilinear sampling of `size` output pixels from [start, start + length) of a `limit`-pixel axis.
+
+    Returns (low index, high index, 8-bit weight of the high pixel) per output pixel.
+    """
+    coords = np.clip(start + (np.arange(size) + 0.5) * (length / size) - 0.5, 0, limit - 1)
+    low = coords.astype(np.intp)
+    high = np.minimum(low + 1, limit - 1)
+    weight = np.round((coords - low) * 256).astype(np.uint64)
+    return low, high, weight
+
+
+# Per-lane mask and +0.5 rounding for pixels packed as 16-bit R, G, B lanes in a uint64
+_LANE_MASK = 0x000000FF00FF00FF
+_LANE_ROUNDING = 0x0000008000800080
+
+
 class VideoGenerator:
     """Video generator client.
 
     Behavior:
     - If `USE_OPENROUTER_FOR_VIDEOS` is true, it will attempt to generate a video
       using an image-to-video model via OpenRouter.
+    - `VIDEO_PROVIDER=luma` POSTs `{image_url, duration}` to `VIDEO_API_URL`
+      (a Luma-compatible API or `scripts/luma_video_proxy.py`) and downloads
+      the returned `video_url`.
     - Otherwise, it falls back to using `ffmpeg` to create a simple Ken Burns
-      effect video from the input image.
+      effect video from the input image, encoded with the
+      `VIDEO_ENCODE_PROFILE` profile for the `VIDEO_PLATFORM` target (see
+      `src/encoding.py`). Dry-run previews always use the `draft` profile.
+    - Before zoompan, the source image is cropped to the target aspect and
+      scaled once to `KEN_BURNS_OVERSAMPLE` (default 1.25) times the output
+      size, so render time no longer grows with the source resolution. The
+      camera follows `KEN_BURNS_PATH` (zoom_in, zoom_out, pan_left,
+      pan_right, pan_up or pan_down) up to `KEN_BURNS_ZOOM` (default 1.3).
+      Set `KEN_BURNS_OVERSAMPLE=0` to only crop, at full source resolution.
+      `KEN_BURNS_EASING` (linear, ease_in, ease_out, ease_in_out) shapes
+      the motion.
+    - `VIDEO_RENDERER=numpy` synthesizes the Ken Burns frames in NumPy and
+      streams them to a single ffmpeg encoder instead of using `zoompan`
+      (falls back to `zoompan` if NumPy is not installed).
+    - `VIDEO_RENDITIONS` (e.g. `reels,shorts,preview`) makes
+      `animate_image_to_renditions` encode one file per platform target in a
+      single ffmpeg pass: the frames are rendered (or, for a provider clip,
+      decoded) once and a `split` filter feeds one encoder per rendition.
     - In `dry_run=True` mode, it returns a placeholder path.
+    - ffmpeg invocations are CPU-bound, so at most `max_concurrent_renders`
+      (env `RENDER_CONCURRENCY`, default 1) run at once per generator, even
+      when several pieces are produced in parallel.
+    - Rendered videos are stored in the artifact cache keyed on the source
+      image content, duration, provider, filter/encoder settings and audio,
+      so re-rendering identical inputs is skipped. Fallback renders (a
+      provider failed and ffmpeg stepped in) are not cached.
+    - Remote providers are tried fastest-first by recent latency, skipping
+      any whose circuit is open (see `src/provider_router.py`); every call,
+      including the ffmpeg render, is recorded as `video:<provider>`.
     """
 
-    def __init__(self, dry_run: bool = True):
+    def __init__(self, dry_run: bool = True, max_concurrent_renders: Optional[int] = None):
         self.dry_run = dry_run
+        self.max_concurrent_renders = max_concurrent_renders or int(os.getenv("RENDER_CONCURRENCY", "1"))
+        self._render_slots = threading.BoundedSemaphore(max(1, self.max_concurrent_renders))
         self.use_openrouter = os.getenv("USE_OPENROUTER_FOR_VIDEOS", "false").lower() in ("1", "true", "yes")
         self.openrouter_api_key = os.getenv("OPENROUTER_API_KEY")
         self.openrouter_video_model = os.getenv("OPENROUTER_VIDEO_MODEL", "stabilityai/stable-video-diffusion")
         self.video_provider = os.getenv("VIDEO_PROVIDER", "ffmpeg")
+        self.encode_profile = encoding.profile_name()
+        self.platform = encoding.platform_name()
+        self.renditions = encoding.rendition_names()
+        self.ken_burns_path = os.getenv("KEN_BURNS_PATH", "zoom_in").lower()
+        if self.ken_burns_path not in KEN_BURNS_PATHS:
+            raise ValueError(f"Unknown KEN_BURNS_PATH {self.ken_burns_path!r}; expected one of {', '.join(KEN_BURNS_PATHS)}")
+        self.ken_burns_easing = os.getenv("KEN_BURNS_EASING", "linear").lower()
+        if self.ken_burns_easing not in KEN_BURNS_EASINGS:
+            raise ValueError(f"Unknown KEN_BURNS_EASING {self.ken_burns_easing!r}; expected one of {', '.join(KEN_BURNS_EASINGS)}")
+        self.ken_burns_zoom = float(os.getenv("KEN_BURNS_ZOOM", "1.3"))
+        self.ken_burns_oversample = float(os.getenv("KEN_BURNS_OVERSAMPLE", "1.25"))
+        self.video_renderer = os.getenv("VIDEO_RENDERER", "zoompan").lower()
+        if self.video_renderer not in ("zoompan", "numpy"):
+            raise ValueError(f"Unknown VIDEO_RENDERER {self.video_renderer!r}; expected zoompan or numpy")
         self.stability_api_key = os.getenv("STABILITY_API_KEY")
+        self.video_api_url = os.getenv("VIDEO_API_URL")
+        self.video_api_key = os.getenv("VIDEO_API_KEY")
+        self.artifact_cache = ArtifactCache()
+        self.media_cache = MediaCache()
+        self.router = ProviderRouter()
+
+    def _run_ffmpeg(self, command, **kwargs) -> subprocess.CompletedProcess:
+        """Run an ffmpeg command once a render slot is free."""
+        with tracing.span("ffmpeg", args=" ".join(str(c) for c in command[1:])) as sp:
+            queued = time.perf_counter()
+            with self._render_slots:
+                sp.set(slot_wait_ms=round((time.perf_counter() - queued) * 1000.0, 3))
+                return subprocess.run(command, **kwargs)
 
     def _ensure_background_music(self) -> str:
-        """Ensures a background music file exists. Returns path or None."""
-        audio_path = "background_music.mp3"
-        if os.path.exists(audio_path):
-            return audio_path
-        
-        print("Downloading default background music...")
-        # Using a sample royalty-free track for testing
-        url = "https://www.soundhelix.com/examples/mp3/SoundHelix-Song-1.mp3"
+        """Ensures a background music file exists. Returns path or None.
+
+        A `background_music.mp3` in the working directory wins; otherwise the
+        default track comes from the shared media cache.
+        """
+        with tracing.span("http.background_music"):
+            audio_path = "background_music.mp3"
+            if os.path.exists(audio_path):
+                return audio_path
+            # Using a sample royalty-free track for testing
+            return self.media_cache.get(BACKGROUND_MUSIC_URL)
+
+    @contextmanager
+    def _local_image(self, image_path: str, near: str):
+        """A local file for `image_path` for the duration of the block.
+
+        A remote URL is downloaded to a temp file next to `near` (the run's
+        workspace, for the orchestrator) and removed afterwards. Source
+        images differ on every run, so they stay out of the media cache,
+        which only holds the fixed stock media.
+        """
+        if not (isinstance(image_path, str) and image_path.startswith(("http://", "https://"))):
+            yield image_path
+            return
+        suffix = os.path.splitext(image_path.split("?", 1)[0])[1] or ".jpg"
+        fd, local = tempfile.mkstemp(dir=os.path.dirname(near) or None, prefix=".source-", suffix=suffix)
         try:
-            resp = requests.get(url, stream=True, timeout=60)
-            if resp.status_code == 200:
-                with open(audio_path, "wb") as f:
+            with tracing.span("http.source_image") as sp, os.fdopen(fd, "wb") as f:
+                try:
+                    resp = http_session.get(image_path, stream=True, timeout=30)
+                    resp.raise_for_status()
                     for chunk in resp.iter_content(chunk_size=1024 * 1024):
                         f.write(chunk)
-                return audio_path
-        except Exception as e:
-            logger.warning(f"Failed to download background music: {e}")
-        return None
+                        sp.add_bytes(len(chunk))
+                except Exception as e:
+                    raise RuntimeError(f"Could not download {image_path}: {e}") from e
+            yield local
+        finally:
+            os.unlink(local)
 
-    def _resize_image_for_video(self, input_path: str) -> str:
+    def _resize_image_for_video(self, input_path: str, resized_path: str) -> str:
         """Resizes image to 576x1024 (supported by SVD) using ffmpeg."""
-        resized_path = "resized_image_for_video.png"
         try:
             # Scale to 576x1024 (9:16 aspect ratio required by SVD)
-            subprocess.run([
+            self._run_ffmpeg([
                 "ffmpeg", "-y", "-i", input_path,
                 "-vf", "scale=576:1024",
                 resized_path
@@ -62,43 +205,385 @@ class VideoGenerator:
             logger.warning(f"Failed to resize image: {e}")
             return input_path
 
-    def animate_image_to_video(self, image_path: str, duration: int = 5, output_local: bool = True) -> str:
-        if self.dry_run:
-            print("[DRY RUN] Would generate video from image:", image_path)
-            # Try to create a tiny valid MP4 using ffmpeg so downstream upload
-            # code paths that check for a real video file can be exercised.
-            out_path = "/tmp/dry_run_video.mp4"
-            if os.path.exists(out_path):
-                return out_path
-
-            ffmpeg_path = shutil.which("ffmpeg")
-            temp_image = None
+    @staticmethod
+    def _dry_run_output(output_file: str) -> str:
+        """Where a dry run writes instead of `output_file`.
+
+        Previews go next to the requested file (the run's workspace, for the
+        orchestrator); a bare file name goes to the temp directory so dry
+        runs stay out of the working directory.
+        """
+        directory = os.path.dirname(output_file) or tempfile.gettempdir()
+        return os.path.join(directory, "dry_run_" + os.path.basename(output_file))
+
+    @staticmethod
+    def _dry_run_duration(duration) -> int:
+        return max(2, min(int(duration), 10)) if isinstance(duration, int) else 2
+
+    @staticmethod
+    def _prescale_size(width: int, height: int, oversample: float) -> Tuple[int, int]:
+        # even dimensions keep yuv420p happy
+        return round(width * oversample / 2) * 2, round(height * oversample / 2) * 2
+
+    @staticmethod
+    def _prescale_filter(width: int, height: int, oversample: float) -> str:
+        """Crop the source to the width:height aspect, then scale it to `oversample` x the output size.
+
+        zoompan's per-frame cost follows its input size, so shrinking a 4K
+        source here once is much cheaper than zooming the full image every
+        frame. A little oversampling keeps the zoomed-in end sharp and the
+        sub-pixel pan smooth. `oversample <= 0` only crops.
+        """
+        crop = f"crop='min(iw,ih*{width}/{height})':'min(ih,iw*{height}/{width})'"
+        if oversample <= 0:
+            return crop
+        scaled_w, scaled_h = VideoGenerator._prescale_size(width, height, oversample)
+        return f"{crop},scale={scaled_w}:{scaled_h},setsar=1"
+
+    def _dry_run_filter(self, dry_duration: int) -> str:
+        # Short Ken Burns effect (gentle zoom + fade) for dry-run previews.
+        fade_dur = min(0.5, dry_duration / 4.0)
+        zoom_inc = 0.003
+        max_zoom = 1.15
+        return (
+            f"{self._prescale_filter(1080, 1920, self.ken_burns_oversample)},"
+            f"zoompan=z='min(zoom+{zoom_inc},{max_zoom})':d=1:x=iw/2-(iw/zoom/2):y=ih/2-(ih/zoom/2):s=1080x1920:fps=25,"
+            f"setsar=1,fade=t=in:st=0:d={fade_dur},fade=t=out:st={dry_duration-fade_dur}:d={fade_dur}"
+        )
+
+    def _path_value(self, value) -> float:
+        return self.ken_burns_zoom if value == "Z" else float(value)
+
+    def _camera(self, progress: float) -> Tuple[float, float, float]:
+        """(zoom, x, y) of the camera at clip progress 0..1, after easing."""
+        eased = KEN_BURNS_EASINGS[self.ken_burns_easing][0](progress)
+        return tuple(
+            self._path_value(start) + (self._path_value(end) - self._path_value(start)) * eased
+            for start, end in KEN_BURNS_PATHS[self.ken_burns_path]
+        )
+
+    def _path_expr(self, start, end, eased: str) -> str:
+        """zoompan expression interpolating a KEN_BURNS_PATHS pair along `eased`."""
+        a, b = self._path_value(start), self._path_value(end)
+        if a == b:
+            return f"{a:g}"
+        if (a, b) == (0, 1):
+            return eased
+        if (a, b) == (1, 0):
+            return f"(1-{eased})"
+        return f"{a:g}+({b:g}-{a:g})*{eased}"
+
+    def _ken_burns_filter(self, duration: int, width: int = 1080, height: int = 1920, fps: int = 25) -> str:
+        # Ken Burns effect along KEN_BURNS_PATH, rendered straight at the output size
+        frames = max(2, int(duration * fps))
+        eased = KEN_BURNS_EASINGS[self.ken_burns_easing][1].format(p=f"min(on/{frames - 1},1)")
+        zoom, x, y = (self._path_expr(start, end, eased) for start, end in KEN_BURNS_PATHS[self.ken_burns_path])
+        return (
+            f"{self._prescale_filter(width, height, self.ken_burns_oversample)},"
+            f"zoompan=z='{zoom}':d=1:x='(iw-iw/zoom)*{x}':y='(ih-ih/zoom)*{y}':s={width}x{height}:fps={fps},setsar=1"
+        )
+
+    def _ffmpeg_command(
+        self,
+        input_image: str,
+        duration: int,
+        output_path: str,
+        audio_path: Optional[str] = None,
+        profile: Optional[str] = None,
+        renderer: str = "zoompan",
+    ) -> List[str]:
+        """The Ken Burns render command for `profile` (default: the configured one) on this generator's platform.
+
+        With `renderer="numpy"` the video input is raw RGB frames on stdin
+        (see `_render_numpy`) and `input_image` is unused.
+        """
+        target = encoding.platform_target(self.platform)
+        if renderer == "numpy":
+            video_input = ["-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{target['width']}x{target['height']}", "-r", str(target["fps"]), "-i", "-"]
+            video_filter = []
+        else:
+            video_input = ["-loop", "1", "-i", input_image]
+            video_filter = ["-vf", self._ken_burns_filter(duration, target["width"], target["height"], target["fps"])]
+        command = [
+            "ffmpeg",
+            "-y",
+            *video_input,  # Input 0: Image, or frames on stdin
+        ]
+        if audio_path:
+            command.extend(["-stream_loop", "-1", "-i", audio_path]) # Input 1: Audio (looped)
+
+        command.extend([
+            *video_filter,
+            *encoding.encode_args(profile or self.encode_profile, self.platform),
+            "-t", str(duration)
+        ])
+        if audio_path:
+            # Map video from stream 0, audio from stream 1, encode audio to aac
+            command.extend(["-map", "0:v", "-map", "1:a", *encoding.audio_args(self.platform), "-shortest"])
+
+        command.append(output_path)
+        return command
+
+    def _renderer(self) -> str:
+        """The Ken Burns renderer to use; `numpy` falls back to `zoompan` if NumPy is missing."""
+        if self.video_renderer == "numpy" and _load_numpy() is None:
+            logger.warning("VIDEO_RENDERER=numpy but NumPy is not installed; using zoompan.")
+            self.video_renderer = "zoompan"
+        return self.video_renderer
+
+    def _synth_frame(self, np, source, progress: float, width: int, height: int) -> bytes:
+        """One rgb24 frame: the camera window at `progress`, bilinearly resampled to width x height.
+
+        `source` holds one pixel per uint64 with R, G and B in separate 16-bit
+        lanes (see `_pack_rgb`). 8-bit weights keep every lane below 2**16,
+        so each blend step handles all three channels in one operation.
+        """
+        zoom, x, y = self._camera(progress)
+        source_h, source_w = source.shape
+        crop_w, crop_h = source_w / zoom, source_h / zoom
+        x_low, x_high, x_weight = _sample_axis(np, (source_w - crop_w) * x, crop_w, width, source_w)
+        y_low, y_high, y_weight = _sample_axis(np, (source_h - crop_h) * y, crop_h, height, source_h)
+        lanes, rounding, shift = np.uint64(_LANE_MASK), np.uint64(_LANE_ROUNDING), np.uint64(8)
+
+        # Vertical pass, over only the columns under the window
+        first, last = int(x_low[0]), int(x_high[-1]) + 1
+        band = source[:, first:last]
+        y_weight = y_weight[:, None]
+        rows = band[y_low]
+        rows *= 256 - y_weight
+        below = band[y_high]
+        below *= y_weight
+        rows += below
+        rows += rounding
+        rows >>= shift
+        rows &= lanes
+
+        # Horizontal pass
+        frame = np.take(rows, x_low - first, axis=1)
+        frame *= 256 - x_weight
+        right = np.take(rows, x_high - first, axis=1)
+        right *= x_weight
+        frame += right
+        frame += rounding
+        frame >>= shift
+        frame &= lanes
+        # little-endian lanes: bytes 0, 2 and 4 of each pixel are R, G and B
+        return frame.view(np.uint8).reshape(height, width, 8)[:, :, 0:6:2].tobytes()
+
+    @staticmethod
+    def _pack_rgb(np, rgb):
+        """Pack an (h, w, 3) uint8 image into (h, w) uint64 pixels with one 16-bit lane per channel."""
+        rgb = rgb.astype(np.uint64)
+        return rgb[:, :, 0] | (rgb[:, :, 1] << np.uint64(16)) | (rgb[:, :, 2] << np.uint64(32))
+
+    def _render_numpy(
+        self,
+        input_image: str,
+        duration: int,
+        output_path: str,
+        audio_path: Optional[str] = None,
+        profile: Optional[str] = None,
+        platform: Optional[str] = None,
+        command: Optional[List[str]] = None,
+    ) -> str:
+        """Ken Burns render with the frames synthesized in NumPy and piped to one ffmpeg encoder.
+
+        The source is decoded and pre-scaled once. Each frame is then a
+        bilinear resample of the camera window. The window is axis-aligned,
+        so the sampling grid is one index/weight vector per axis. ffmpeg only
+        encodes, and the camera moves by sub-pixel steps, where zoompan rounds
+        the window to whole pixels.
+
+        Frames are synthesized at `platform`'s size (default: this generator's
+        platform). A prebuilt encoder `command` reading rgb24 frames on stdin
+        (e.g. from `_renditions_command`) replaces the single-output one.
+        """
+        np = _load_numpy()
+        target = encoding.platform_target(platform or self.platform)
+        width, height, fps = target["width"], target["height"], target["fps"]
+        oversample = self.ken_burns_oversample if self.ken_burns_oversample > 0 else 1.0
+        source_w, source_h = self._prescale_size(width, height, oversample)
+        frames = max(2, int(duration * fps))
+        command = command or self._ffmpeg_command(input_image, duration, output_path, audio_path, profile, renderer="numpy")
+
+        with tracing.span("ffmpeg.numpy_render", frames=frames) as sp:
+            queued = time.perf_counter()
+            with self._render_slots:
+                sp.set(slot_wait_ms=round((time.perf_counter() - queued) * 1000.0, 3))
+                decoded = subprocess.run(
+                    ["ffmpeg", "-v", "error", "-i", input_image, "-vf", self._prescale_filter(width, height, oversample),
+                     "-frames:v", "1", "-f", "rawvideo", "-pix_fmt", "rgb24", "-"],
+                    check=True,
+                    capture_output=True,
+                )
+                source = self._pack_rgb(np, np.frombuffer(decoded.stdout, dtype=np.uint8).reshape(source_h, source_w, 3))
+
+                # stderr goes to a file so a chatty encoder can never block on a full pipe
+                with tempfile.TemporaryFile() as stderr:
+                    proc = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=stderr)
+                    try:
+                        for index in range(frames):
+                            proc.stdin.write(self._synth_frame(np, source, index / (frames - 1), width, height))
+                        proc.stdin.close()
+                    except BrokenPipeError:
+                        pass  # the encoder exited early; its exit code and stderr say why
+                    except BaseException:
+                        proc.kill()
+                        proc.wait()
+                        raise
+                    if proc.wait() != 0:
+                        stderr.seek(0)
+                        raise subprocess.CalledProcessError(proc.returncode, command, stderr=stderr.read().decode(errors="replace"))
+        return output_path
+
+    @staticmethod
+    def _base_platform(outputs: Dict[str, str]) -> str:
+        """The largest target in `outputs`; the shared frames are rendered at its size."""
+        return max(outputs, key=lambda name: encoding.platform_target(name)["width"] * encoding.platform_target(name)["height"])
+
+    def _renditions_command(
+        self,
+        source: str,
+        duration: int,
+        outputs: Dict[str, str],
+        audio_path: Optional[str] = None,
+        kind: str = "zoompan",
+        profile: Optional[str] = None,
+    ) -> List[str]:
+        """One ffmpeg command that encodes `source` to every `outputs` entry (platform -> path).
+
+        The frames are produced once at the largest target: the Ken Burns
+        filter for `kind="zoompan"`, raw frames on stdin for `kind="numpy"`,
+        or a crop/scale of an existing clip for `kind="video"`. `split` then
+        feeds one branch per rendition, scaled to that platform's size and
+        encoded with its own bitrate cap, level and audio settings.
+        """
+        base = encoding.platform_target(self._base_platform(outputs))
+        width, height, fps = base["width"], base["height"], base["fps"]
+        if kind == "numpy":
+            video_input = ["-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}", "-r", str(fps), "-i", "-"]
+            graph = "[0:v]"
+        elif kind == "video":
+            video_input = ["-i", source]
+            graph = f"[0:v]{self._prescale_filter(width, height, 1)},fps={fps},"
+        else:
+            video_input = ["-loop", "1", "-i", source]
+            graph = f"[0:v]{self._ken_burns_filter(duration, width, height, fps)},"
+        graph += f"split={len(outputs)}" + "".join(f"[s{i}]" for i in range(len(outputs)))
+
+        command = ["ffmpeg", "-y", *video_input]
+        if audio_path:
+            command.extend(["-stream_loop", "-1", "-i", audio_path])
+        encoders = []
+        for i, (name, path) in enumerate(outputs.items()):
+            target = encoding.platform_target(name)
+            branch = []
+            if (target["width"], target["height"]) != (width, height):
+                branch.append(f"scale={target['width']}:{target['height']},setsar=1")
+            if target["fps"] != fps:
+                branch.append(f"fps={target['fps']}")
+            graph += f";[s{i}]{','.join(branch) or 'null'}[v{i}]"
+            encoders.extend(["-map", f"[v{i}]", *encoding.encode_args(profile or self.encode_profile, name), "-t", str(duration)])
+            if audio_path:
+                encoders.extend(["-map", "1:a", *encoding.audio_args(name), "-shortest"])
+            elif kind == "video":
+                encoders.extend(["-map", "0:a?", *encoding.audio_args(name)])  # keep the clip's own audio, if any
+            encoders.append(path)
+        return command + ["-filter_complex", graph, *encoders]
+
+    def _rendition_paths(self, output_file: str) -> Dict[str, str]:
+        stem = os.path.splitext(output_file)[0]
+        return {name: f"{stem}_{name}.mp4" for name in self.renditions}
+
+    def _encode_renditions(self, source_path: str, duration: int, output_file: str, kind: str) -> Dict[str, str]:
+        """Encode every rendition of `source_path` in one ffmpeg pass; returns platform -> path.
+
+        Each rendition is cached on its own key, so a later run only skips
+        the render when every rendition is cached. If ffmpeg fails, every
+        rendition falls back to `source_path`.
+        """
+        outputs = self._rendition_paths(output_file)
+        audio_path = self._ensure_background_music() if kind != "video" else None
+        # the command with the inputs and outputs replaced by placeholders, as in `_video_cache_key`
+        command = self._renditions_command("<source>", duration, {name: f"<{name}>" for name in outputs}, "<audio>" if audio_path else None, kind)
+        source = file_digest(source_path) if os.path.isfile(source_path) else source_path
+        audio = file_digest(audio_path) if audio_path else None
+        # the numpy command has no motion filter in it; key on the camera settings it synthesizes instead
+        base = encoding.platform_target(self._base_platform(outputs))
+        motion = self._ken_burns_filter(duration, base["width"], base["height"], base["fps"]) if kind != "video" else None
+        keys = {name: self.artifact_cache.key("video", "rendition", kind, source, command, motion, audio, name) for name in outputs}
+
+        with tracing.span("video.renditions", source=kind, renditions=",".join(outputs), profile=self.encode_profile) as sp:
+            if all(self.artifact_cache.fetch(keys[name], path) for name, path in outputs.items()):
+                print(f"Using cached renditions for these inputs: {', '.join(outputs.values())}")
+                sp.set(cache="hit")
+                return outputs
+            sp.set(cache="miss")
+
+            start = time.perf_counter()
             try:
-                # Prepare input image: if it's a remote URL, download it to a temp file.
-                input_image = image_path
-                if isinstance(image_path, str) and image_path.startswith(("http://", "https://")):
-                    tmpf = tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(image_path)[1] or '.jpg')
-                    temp_image = tmpf.name
-                    with tmpf:
-                        resp = requests.get(image_path, stream=True, timeout=30)
-                        resp.raise_for_status()
-                        for chunk in resp.iter_content(chunk_size=1024 * 1024):
-                            tmpf.write(chunk)
-                    input_image = temp_image
+                with self._local_image(source_path, output_file) as local:
+                    command = self._renditions_command(local, duration, outputs, audio_path, kind)
+                    if kind == "numpy":
+                        self._render_numpy(local, duration, output_file, audio_path, platform=self._base_platform(outputs), command=command)
+                    else:
+                        self._run_ffmpeg(command, check=True, capture_output=True, text=True)
+            except (subprocess.CalledProcessError, FileNotFoundError, RuntimeError) as e:
+                logger.error(f"ffmpeg rendition encode failed: {e}")
+                if isinstance(e, subprocess.CalledProcessError):
+                    logger.error(f"ffmpeg stderr: {e.stderr}")
+                self.router.record("video:ffmpeg", False, time.perf_counter() - start)
+                print(f"Warning: ffmpeg failed. Using {source_path} for every rendition.")
+                return {name: source_path for name in outputs}
+            self.router.record("video:ffmpeg", True, time.perf_counter() - start)
+            for name, path in outputs.items():
+                self.artifact_cache.put(keys[name], path)
+            print(f"Encoded {len(outputs)} renditions in one ffmpeg pass: {', '.join(outputs.values())}")
+            return outputs
+
+    def _ffmpeg_is_primary(self) -> bool:
+        return self.video_provider not in ("stability", "luma") and not self.use_openrouter
+
+    def _video_cache_key(self, image_path: str, duration: int) -> str:
+        """Artifact cache key for rendering `image_path` with the current settings."""
+        if isinstance(image_path, str) and os.path.isfile(image_path):
+            source = file_digest(image_path)
+        else:
+            source = image_path  # remote URL: key on the URL itself
+        if self.dry_run:
+            dry_duration = self._dry_run_duration(duration)
+            return self.artifact_cache.key("video", "dry_run", source, dry_duration, self._dry_run_filter(dry_duration), encoding.encode_args("draft", self.platform))
+
+        if self._ffmpeg_is_primary():
+            audio_path = self._ensure_background_music()
+            audio = file_digest(audio_path) if audio_path else None
+            # the zoompan command (motion, encoder and audio settings) with the inputs replaced by their digests
+            command = self._ffmpeg_command("<image>", duration, "<output>", "<audio>" if audio_path else None)
+            return self.artifact_cache.key("video", "ffmpeg", source, command, self._renderer(), audio)
+        if self.video_provider == "luma":
+            return self.artifact_cache.key("video", "luma", self.video_api_url, source, duration)
+        provider = "stability" if self.video_provider == "stability" else "openrouter"
+        return self.artifact_cache.key("video", provider, self.openrouter_video_model if provider == "openrouter" else None, source)
 
+    def _animate_dry_run(self, image_path: str, duration: int, out_path: str) -> Tuple[str, bool]:
+        """Render a short preview video; returns (path, cacheable).
+
+        Placeholder files written when ffmpeg is unavailable or fails are not
+        cacheable.
+        """
+        print("[DRY RUN] Would generate video from image:", image_path)
+        # Try to create a tiny valid MP4 using ffmpeg so downstream upload
+        # code paths that check for a real video file can be exercised.
+        ffmpeg_path = shutil.which("ffmpeg")
+        try:
+            # Prepare input image: a remote URL is downloaded next to the output.
+            with self._local_image(image_path, out_path) as input_image:
                 if ffmpeg_path:
                     # Create a short video from the image using ffmpeg with a
                     # small Ken Burns effect (zoom + fade). Use the requested
                     # duration where possible to exercise the same code paths.
-                    dry_duration = max(2, min(int(duration), 10)) if isinstance(duration, int) else 2
-                    fade_dur = min(0.5, dry_duration / 4.0)
-                    # gentle zoom parameters
-                    zoom_inc = 0.003
-                    max_zoom = 1.15
-                    vf_filter = (
-                        f"zoompan=z=min(zoom+{zoom_inc},{max_zoom}):d=1:x=iw/2-(iw/zoom/2):y=ih/2-(ih/zoom/2),"
-                        f"fps=25,scale=1080:1920,setsar=1,fade=t=in:st=0:d={fade_dur},fade=t=out:st={dry_duration-fade_dur}:d={fade_dur}"
-                    )
+                    dry_duration = self._dry_run_duration(duration)
+                    vf_filter = self._dry_run_filter(dry_duration)
 
                     cmd = [
                         ffmpeg_path,
@@ -106,155 +591,308 @@ class VideoGenerator:
                         "-loop", "1",
                         "-i", input_image,
                         "-vf", vf_filter,
-                        "-c:v", "libx264",
+                        *encoding.encode_args("draft", self.platform),
                         "-t", str(dry_duration),
-                        "-pix_fmt", "yuv420p",
-                        "-movflags", "+faststart",
                         out_path,
                     ]
                     try:
-                        subprocess.run(cmd, check=True, capture_output=True)
-                        return out_path
+                        self._run_ffmpeg(cmd, check=True, capture_output=True)
+                        return out_path, True
                     except subprocess.CalledProcessError as e:
                         stderr = getattr(e, 'stderr', None)
                         logger.warning(f"ffmpeg dry-run video creation failed: {stderr if stderr else e}")
-                # If ffmpeg not available or failed, fall back to a minimal placeholder file
+            # If ffmpeg not available or failed, fall back to a minimal placeholder file
+            with open(out_path, "wb") as f:
+                f.write(b"DRY_RUN_PLACEHOLDER_MP4\n")
+            return out_path, False
+        except Exception as e:
+            logger.warning(f"Failed to create dry-run video: {e}")
+            try:
                 with open(out_path, "wb") as f:
-                    f.write(b"DRY_RUN_PLACEHOLDER_MP4\n")
-                return out_path
-            except Exception as e:
-                logger.warning(f"Failed to create dry-run video: {e}")
-                try:
-                    with open(out_path, "wb") as f:
-                        f.write(b"DRY_RUN_PLACEHOLDER\n")
-                except Exception:
-                    pass
-                return out_path
-            finally:
-                if temp_image:
-                    try:
-                        os.unlink(temp_image)
-                    except Exception:
-                        pass
+                    f.write(b"DRY_RUN_PLACEHOLDER\n")
+            except Exception:
+                pass
+            return out_path, False
 
-        if not output_local:
-            raise ValueError("VideoGenerator currently only supports local output.")
+    def animate_image_to_video(self, image_path: str, duration: int = 5, output_local: bool = True, output_file: str = "generated_video.mp4") -> str:
+        with tracing.span("video.animate", provider=self.video_provider, dry_run=self.dry_run) as sp:
+            if not self.dry_run and not output_local:
+                raise ValueError("VideoGenerator currently only supports local output.")
 
-        output_path = "generated_video.mp4"
+            if self.dry_run:
+                output_file = self._dry_run_output(output_file)
 
+            key = self._video_cache_key(image_path, duration)
+            if self.artifact_cache.fetch(key, output_file):
+                print(f"Using cached video for these inputs: {output_file}")
+                sp.set(cache="hit")
+                return output_file
+            sp.set(cache="miss")
+
+            if self.dry_run:
+                path, cacheable = self._animate_dry_run(image_path, duration, output_file)
+            else:
+                path, cacheable = self._animate_uncached(image_path, duration, output_file)
+            if cacheable:
+                self.artifact_cache.put(key, path)
+            return path
+
+    def animate_image_to_renditions(self, image_path: str, duration: int = 5, output_file: str = "generated_video.mp4") -> Dict[str, str]:
+        """One video per `VIDEO_RENDITIONS` platform (platform -> path), encoded in a single ffmpeg pass.
+
+        With ffmpeg as the provider, the Ken Burns frames are rendered once
+        for all renditions. A remote provider's clip is generated as usual,
+        then transcoded to every rendition in one pass. Dry runs and failed
+        renders map every rendition to the single file produced. Without
+        `VIDEO_RENDITIONS`, returns `{platform: animate_image_to_video(...)}`.
+        """
+        if not self.renditions:
+            return {self.platform: self.animate_image_to_video(image_path, duration, output_file=output_file)}
+        if not self.dry_run and self._ffmpeg_is_primary():
+            return self._encode_renditions(image_path, duration, output_file, self._renderer())
+        video = self.animate_image_to_video(image_path, duration, output_file=output_file)
+        if self.dry_run or video == image_path:
+            return {name: video for name in self.renditions}
+        return self._encode_renditions(video, duration, output_file, "video")
+
+    def _video_providers(self) -> List[str]:
+        """Remote video providers to try, in configured order; ffmpeg is always the last resort."""
+        providers = []
+        if self.video_provider == "luma":
+            if not self.video_api_url:
+                raise RuntimeError("VIDEO_API_URL is required for the luma video provider.")
+            providers.append("luma")
         if self.video_provider == "stability":
-            print("Generating video with Stability AI...")
             if not self.stability_api_key:
                 raise RuntimeError("STABILITY_API_KEY is required for Stability AI video generation.")
-            
-            # Resize image to 576x1024 to match SVD requirements
-            processed_image_path = self._resize_image_for_video(image_path)
-
-            try:
-                # 1. Submit generation request
-                with open(processed_image_path, "rb") as f:
-                    resp = requests.post(
-                        "https://api.stability.ai/v2beta/image-to-video",
-                        headers={"Authorization": f"Bearer {self.stability_api_key}"},
-                        files={"image": ("image.png", f, "image/png")},
-                        data={"seed": 0, "cfg_scale": 1.8, "motion_bucket_id": 127},
-                        timeout=60
-                    )
-                    if resp.status_code != 200:
-                        raise RuntimeError(f"Stability AI submit failed: {resp.text}")
-                    generation_id = resp.json().get("id")
-                    print(f"Stability AI generation started. ID: {generation_id}")
-
-                # 2. Poll for result
-                for _ in range(60): # Wait up to 60 * 2 = 120 seconds
-                    time.sleep(2)
-                    resp = requests.get(
-                        f"https://api.stability.ai/v2beta/image-to-video/result/{generation_id}",
-                        headers={"Authorization": f"Bearer {self.stability_api_key}", "Accept": "video/*"},
-                        timeout=30
-                    )
-                    if resp.status_code == 202:
-                        print(".", end="", flush=True)
-                        continue # Still processing
-                    elif resp.status_code == 200:
-                        print("\nVideo generation complete!")
-                        with open(output_path, "wb") as f:
-                            f.write(resp.content)
-                        return output_path
-                    else:
-                        raise RuntimeError(f"Stability AI polling failed: {resp.text}")
-            except Exception as e:
-                logger.error(f"Stability AI video generation failed: {e}. Falling back to ffmpeg.")
-
+            providers.append("stability")
         if self.use_openrouter:
-            print("Generating video with OpenRouter...")
             if not self.openrouter_api_key:
                 raise RuntimeError("OPENROUTER_API_KEY is required for video generation via OpenRouter.")
-            
-            # Resize image to 576x1024 to match SVD requirements
-            processed_image_path = self._resize_image_for_video(image_path)
+            providers.append("openrouter")
+        return providers
+
+    def _routed_video_providers(self) -> List[str]:
+        """`_video_providers` without open circuits, fastest recent provider first."""
+        providers = self._video_providers()
+        routed = [key.split(":", 1)[1] for key in self.router.order(f"video:{name}" for name in providers)]
+        skipped = [VIDEO_PROVIDER_LABELS[name] for name in providers if name not in routed]
+        if skipped:
+            print(f"Skipping video providers with an open circuit: {', '.join(skipped)}")
+        return routed
+
+    def _animate_uncached(self, image_path: str, duration: int, output_path: str) -> Tuple[str, bool]:
+        """Render with the configured providers, then ffmpeg; returns (path, cacheable)."""
+        # Keep the intermediate next to the output so parallel renders don't share it
+        resized_path = os.path.splitext(output_path)[0] + "_resized.png"
 
+        for name in self._routed_video_providers():
+            label = VIDEO_PROVIDER_LABELS[name]
+            print(f"Generating video with {label}...")
             try:
-                # NOTE: This uses the Stability AI API structure, proxied via OpenRouter.
-                # The exact endpoint on OpenRouter for this might vary.
-                with open(processed_image_path, "rb") as f:
-                    files = {"image": f}
-                    headers = {"Authorization": f"Bearer {self.openrouter_api_key}"}
-                    # This endpoint is a structured guess. OpenRouter may require a different path.
-                    response = requests.post(
-                        "https://openrouter.ai/api/v1/stability-ai/image-to-video",
-                        headers=headers,
-                        files=files,
-                        data={"seed": 0, "cfg_scale": 2.5, "motion_bucket_id": 40},
-                        timeout=300
-                    )
-                    response.raise_for_status()
-
-                with open(output_path, "wb") as f:
-                    f.write(response.content)
-                print(f"Successfully generated video with OpenRouter: {output_path}")
-                return output_path
+                with self.router.track(f"video:{name}"):
+                    return self._animate_with(name, image_path, duration, output_path, resized_path), True
             except Exception as e:
-                logger.error(f"OpenRouter video generation failed: {e}. Falling back to ffmpeg.")
-        
+                logger.error(f"{label} video generation failed: {e}. Falling back.")
+
         # Fallback to ffmpeg
-        print("Using ffmpeg for local video generation...")
-        audio_path = self._ensure_background_music()
+        path = self._animate_ffmpeg(image_path, duration, output_path)
+        return path, path == output_path and self._ffmpeg_is_primary()
 
-        try:
-            # Simple Ken Burns effect: zoom in and pan slightly
-            zoom_rate = 1.2
-            vf_filter = (
-                f"zoompan=z='min(zoom+{zoom_rate/duration/25},1.5)':d=1:x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)',"
-                f"scale=1080:1920,setsar=1"
-            )
-            command = [
-                "ffmpeg",
-                "-y",
-                "-loop", "1", "-i", image_path,  # Input 0: Image
-            ]
+    def _animate_with(self, name: str, image_path: str, duration: int, output_path: str, resized_path: str) -> str:
+        """Render with one remote provider; raises on failure."""
+        if name == "luma":
+            return self._animate_luma(image_path, duration, output_path)
 
-            if audio_path:
-                command.extend(["-stream_loop", "-1", "-i", audio_path]) # Input 1: Audio (looped)
-            
-            command.extend([
-                "-vf", vf_filter,
-                "-c:v", "libx264", "-pix_fmt", "yuv420p", "-preset", "veryslow", "-crf", "28",
-                "-t", str(duration)
-            ])
+        # Resize image to 576x1024 to match SVD requirements
+        processed_image_path = self._resize_image_for_video(image_path, resized_path)
+        if name == "openrouter":
+            return self._animate_openrouter(processed_image_path, output_path)
 
-            if audio_path:
-                # Map video from stream 0, audio from stream 1, encode audio to aac
-                command.extend(["-map", "0:v", "-map", "1:a", "-c:a", "aac", "-b:a", "128k", "-shortest"])
-            
-            command.append(output_path)
+        # 1. Submit generation request
+        generation_id = self._stability_submit(processed_image_path)
+
+        # 2. Poll for result
+        with tracing.span("video.stability.wait", generation_id=generation_id) as sp:
+            for poll in range(60): # Wait up to 60 * 2 = 120 seconds
+                time.sleep(2)
+                sp.set(polls=poll + 1)
+                if self._stability_poll_once(generation_id, output_path):
+                    sp.add_bytes(os.path.getsize(output_path))
+                    return output_path
+        raise RuntimeError(f"Stability AI generation {generation_id} did not finish in time")
+
+    async def animate_image_to_video_async(self, image_path: str, duration: int = 5, output_local: bool = True, output_file: str = "generated_video.mp4") -> str:
+        """Async variant of `animate_image_to_video`.
+
+        Stability polling waits with `asyncio.sleep`; requests and ffmpeg run
+        on the default executor.
+        """
+        with tracing.span("video.animate", provider=self.video_provider, dry_run=self.dry_run) as sp:
+            if not self.dry_run and not output_local:
+                raise ValueError("VideoGenerator currently only supports local output.")
+
+            if self.dry_run:
+                output_file = self._dry_run_output(output_file)
+
+            key = await asyncio.to_thread(self._video_cache_key, image_path, duration)
+            if await asyncio.to_thread(self.artifact_cache.fetch, key, output_file):
+                print(f"Using cached video for these inputs: {output_file}")
+                sp.set(cache="hit")
+                return output_file
+            sp.set(cache="miss")
+
+            if self.dry_run:
+                path, cacheable = await asyncio.to_thread(self._animate_dry_run, image_path, duration, output_file)
+            else:
+                path, cacheable = await self._animate_uncached_async(image_path, duration, output_file)
+            if cacheable:
+                await asyncio.to_thread(self.artifact_cache.put, key, path)
+            return path
+
+    async def animate_image_to_renditions_async(self, image_path: str, duration: int = 5, output_file: str = "generated_video.mp4") -> Dict[str, str]:
+        """Async variant of `animate_image_to_renditions`; the encode runs on the default executor."""
+        if not self.renditions:
+            return {self.platform: await self.animate_image_to_video_async(image_path, duration, output_file=output_file)}
+        if not self.dry_run and self._ffmpeg_is_primary():
+            return await asyncio.to_thread(self._encode_renditions, image_path, duration, output_file, self._renderer())
+        video = await self.animate_image_to_video_async(image_path, duration, output_file=output_file)
+        if self.dry_run or video == image_path:
+            return {name: video for name in self.renditions}
+        return await asyncio.to_thread(self._encode_renditions, video, duration, output_file, "video")
+
+    async def _animate_uncached_async(self, image_path: str, duration: int, output_path: str) -> Tuple[str, bool]:
+        resized_path = os.path.splitext(output_path)[0] + "_resized.png"
+
+        for name in await asyncio.to_thread(self._routed_video_providers):
+            label = VIDEO_PROVIDER_LABELS[name]
+            print(f"Generating video with {label}...")
+            try:
+                with self.router.track(f"video:{name}"):
+                    return await self._animate_with_async(name, image_path, duration, output_path, resized_path), True
+            except Exception as e:
+                logger.error(f"{label} video generation failed: {e}. Falling back.")
+
+        path = await asyncio.to_thread(self._animate_ffmpeg, image_path, duration, output_path)
+        return path, path == output_path and self._ffmpeg_is_primary()
 
-            subprocess.run(command, check=True, capture_output=True, text=True)
-            print(f"Successfully generated video with ffmpeg: {output_path}")
+    async def _animate_with_async(self, name: str, image_path: str, duration: int, output_path: str, resized_path: str) -> str:
+        if name != "stability":
+            return await asyncio.to_thread(self._animate_with, name, image_path, duration, output_path, resized_path)
+
+        processed_image_path = await asyncio.to_thread(self._resize_image_for_video, image_path, resized_path)
+        generation_id = await asyncio.to_thread(self._stability_submit, processed_image_path)
+        with tracing.span("video.stability.wait", generation_id=generation_id) as sp:
+            for poll in range(60):
+                await asyncio.sleep(2)
+                sp.set(polls=poll + 1)
+                if await asyncio.to_thread(self._stability_poll_once, generation_id, output_path):
+                    sp.add_bytes(os.path.getsize(output_path))
+                    return output_path
+        raise RuntimeError(f"Stability AI generation {generation_id} did not finish in time")
+
+    def _stability_submit(self, processed_image_path: str) -> str:
+        """Submit an image-to-video job to Stability AI and return its generation id."""
+        with tracing.span("video.stability.submit") as sp:
+            sp.add_bytes(os.path.getsize(processed_image_path))
+            with open(processed_image_path, "rb") as f:
+                resp = http_session.post(
+                    "https://api.stability.ai/v2beta/image-to-video",
+                    headers={"Authorization": f"Bearer {self.stability_api_key}"},
+                    files={"image": ("image.png", f, "image/png")},
+                    data={"seed": 0, "cfg_scale": 1.8, "motion_bucket_id": 127},
+                    timeout=60
+                )
+                if resp.status_code != 200:
+                    raise RuntimeError(f"Stability AI submit failed: {resp.text}")
+                generation_id = resp.json().get("id")
+                print(f"Stability AI generation started. ID: {generation_id}")
+                return generation_id
+
+    def _stability_poll_once(self, generation_id: str, output_path: str) -> bool:
+        """Poll a Stability AI job once. Returns True once the video is written."""
+        resp = http_session.get(
+            f"https://api.stability.ai/v2beta/image-to-video/result/{generation_id}",
+            headers={"Authorization": f"Bearer {self.stability_api_key}", "Accept": "video/*"},
+            timeout=30
+        )
+        if resp.status_code == 202:
+            print(".", end="", flush=True)
+            return False # Still processing
+        elif resp.status_code == 200:
+            print("\nVideo generation complete!")
+            with open(output_path, "wb") as f:
+                f.write(resp.content)
+            return True
+        else:
+            raise RuntimeError(f"Stability AI polling failed: {resp.text}")
+
+    def _animate_openrouter(self, processed_image_path: str, output_path: str) -> str:
+        with tracing.span("video.openrouter", model=self.openrouter_video_model) as sp:
+            # NOTE: This uses the Stability AI API structure, proxied via OpenRouter.
+            # The exact endpoint on OpenRouter for this might vary.
+            with open(processed_image_path, "rb") as f:
+                files = {"image": f}
+                headers = {"Authorization": f"Bearer {self.openrouter_api_key}"}
+                # This endpoint is a structured guess. OpenRouter may require a different path.
+                response = http_session.post(
+                    "https://openrouter.ai/api/v1/stability-ai/image-to-video",
+                    headers=headers,
+                    files=files,
+                    data={"seed": 0, "cfg_scale": 2.5, "motion_bucket_id": 40},
+                    timeout=300
+                )
+                response.raise_for_status()
+
+            sp.add_bytes(tracing.response_size(response))
+            with open(output_path, "wb") as f:
+                f.write(response.content)
+            print(f"Successfully generated video with OpenRouter: {output_path}")
+            return output_path
+
+    def _animate_luma(self, image_path: str, duration: int, output_path: str) -> str:
+        """Submit to a Luma-compatible `VIDEO_API_URL` and download the result.
+
+        The API takes an image URL; a local path is sent as-is, which the
+        local proxy accepts (a hosted API needs the image at a public URL).
+        """
+        with tracing.span("video.luma", duration=duration) as sp:
+            headers = {"Authorization": f"Bearer {self.video_api_key}", "Content-Type": "application/json"}
+            resp = http_session.post(self.video_api_url, json={"image_url": image_path, "duration": duration}, headers=headers, timeout=300)
+            resp.raise_for_status()
+            video_url = resp.json().get("video_url")
+            if not video_url:
+                raise RuntimeError(f"No video_url in response: {resp.text}")
+
+            download = http_session.get(video_url, stream=True, timeout=120)
+            download.raise_for_status()
+            with open(output_path, "wb") as f:
+                for chunk in download.iter_content(chunk_size=1024 * 1024):
+                    f.write(chunk)
+                    sp.add_bytes(len(chunk))
+            print(f"Successfully generated video with Luma: {output_path}")
             return output_path
-        except (subprocess.CalledProcessError, FileNotFoundError) as e:
-            logger.error(f"ffmpeg video generation failed: {e}")
-            if isinstance(e, subprocess.CalledProcessError):
-                logger.error(f"ffmpeg stderr: {e.stderr}")
-            print("Warning: ffmpeg failed. Returning image path as fallback.")
-            return image_path # Fallback to image if video fails
\ No newline at end of file
+
+    def _animate_ffmpeg(self, image_path: str, duration: int, output_path: str) -> str:
+        with tracing.span("video.ffmpeg_fallback", duration=duration, profile=self.encode_profile, platform=self.platform):
+            start = time.perf_counter()
+            print("Using ffmpeg for local video generation...")
+            audio_path = self._ensure_background_music()
+
+            try:
+                with self._local_image(image_path, output_path) as input_image:
+                    if self._renderer() == "numpy":
+                        self._render_numpy(input_image, duration, output_path, audio_path)
+                    else:
+                        command = self._ffmpeg_command(input_image, duration, output_path, audio_path)
+                        self._run_ffmpeg(command, check=True, capture_output=True, text=True)
+                self.router.record("video:ffmpeg", True, time.perf_counter() - start)
+                print(f"Successfully generated video with ffmpeg: {output_path}")
+                return output_path
+            except (subprocess.CalledProcessError, FileNotFoundError, RuntimeError) as e:
+                logger.error(f"ffmpeg video generation failed: {e}")
+                if isinstance(e, subprocess.CalledProcessError):
+                    logger.error(f"ffmpeg stderr: {e.stderr}")
+                self.router.record("video:ffmpeg", False, time.perf_counter() - start)
+                print("Warning: ffmpeg failed. Returning image path as fallback.")
+                return image_path # Fallback to image if video fails
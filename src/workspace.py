@@ -0,0 +1,96 @@
+"""Per-run scratch directories, so several pieces can render in one container.
+
+Usage:
+    with Workspace(run_id) as ws:
+        image_file = ws.path("image.png")
+        video_file = ws.path("video.mp4")
+        ...
+        video_file = ws.publish(video_file)     # OUTPUT_DIR/<run_id>/video.mp4
+
+Behavior:
+- Each run writes its intermediate and final files (image, resized frames,
+  video, dry-run preview) to its own directory, `WORKSPACE_DIR/<run_id>`
+  (default `.workspaces/<run_id>`). Concurrent runs never share a file name.
+- `publish` moves a finished file (or a dict of them) out of the workspace
+  to `OUTPUT_DIR/<run_id>/` (default `output`), so the paths a run returns
+  and saves outlive the workspace. Anything else in it is an intermediate.
+- The directory is removed when the run finishes cleanly. If the run raised,
+  or `keep` was set (e.g. an upload failed), it stays, so `--resume <run_id>`
+  can reuse the checkpointed files. Set `KEEP_WORKSPACES=true` to keep every
+  workspace.
+- Opening a workspace removes any other workspace older than
+  `WORKSPACE_MAX_AGE_S` (default 7 days), so leftovers from failed runs do
+  not pile up.
+"""
+import logging
+import os
+import shutil
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Workspace:
+    def __init__(self, run_id: str, root: Optional[str] = None, keep: Optional[bool] = None, max_age_s: Optional[float] = None):
+        self.root = os.path.abspath(root or os.getenv("WORKSPACE_DIR") or ".workspaces")
+        self.directory = os.path.join(self.root, run_id)
+        self.output_dir = os.path.join(os.path.abspath(os.getenv("OUTPUT_DIR") or "output"), run_id)
+        if keep is None:
+            keep = os.getenv("KEEP_WORKSPACES", "false").lower() in ("1", "true", "yes")
+        self.keep = keep
+        self.max_age_s = max_age_s if max_age_s is not None else float(os.getenv("WORKSPACE_MAX_AGE_S", str(7 * 86400)))
+
+    def path(self, name: str) -> str:
+        """Absolute path for `name` inside this workspace."""
+        return os.path.join(self.directory, name)
+
+    def publish(self, value):
+        """Move workspace files in `value` (a path, or a dict of paths) to `output_dir`; returns the new path(s).
+
+        Values that are not files in this workspace (URLs, files elsewhere,
+        None) are returned unchanged. Publishing a path twice (e.g. a video
+        stage that fell back to the image) returns the same published file.
+        """
+        if isinstance(value, dict):
+            return {name: self.publish(path) for name, path in value.items()}
+        if not (isinstance(value, str) and os.path.dirname(os.path.abspath(value)) == self.directory):
+            return value
+        published = os.path.join(self.output_dir, os.path.basename(value))
+        if os.path.isfile(value):
+            os.makedirs(self.output_dir, exist_ok=True)
+            shutil.move(value, published)
+        return published if os.path.exists(published) else value
+
+    def prune(self) -> int:
+        """Remove other workspaces untouched for `max_age_s`; returns how many were removed."""
+        removed = 0
+        cutoff = time.time() - self.max_age_s
+        try:
+            entries = list(os.scandir(self.root))
+        except OSError:
+            return 0
+        for entry in entries:
+            try:
+                stale = entry.is_dir() and entry.path != self.directory and entry.stat().st_mtime < cutoff
+            except OSError:
+                continue
+            if stale:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed += 1
+        return removed
+
+    def cleanup(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __enter__(self) -> "Workspace":
+        os.makedirs(self.directory, exist_ok=True)
+        if self.prune():
+            logger.info(f"Removed stale workspaces from {self.root}")
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None and not self.keep:
+            self.cleanup()
+        else:
+            print(f"Keeping workspace {self.directory}")
@@ -1,16 +1,23 @@
 import os
+import asyncio
+import threading
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaFileUpload
 
+from . import tracing
+
 class YouTubePoster:
     def __init__(self, client_secrets_file, credentials_file, dry_run=True):
         self.client_secrets_file = client_secrets_file
         self.credentials_file = credentials_file
         self.dry_run = dry_run
         self.scopes = ['https://www.googleapis.com/auth/youtube.upload']
+        # The googleapiclient service object is not thread-safe; batch runs
+        # share one poster, so uploads through it are serialized.
+        self._lock = threading.Lock()
         self.youtube = self.get_authenticated_service()
 
     def get_authenticated_service(self):
@@ -41,42 +48,49 @@ class YouTubePoster:
         return build('youtube', 'v3', credentials=credentials)
 
     def upload_video(self, file_path, title, description, privacy_status='private'):
-        if self.dry_run:
-            print(f"[DRY RUN] Would upload video: {file_path}")
-            print(f"  Title: {title}")
-            print(f"  Description: {description}")
-            return {"id": "dryrun_youtube_123", "status": "dry_run"}
+        with tracing.span("youtube.upload", dry_run=self.dry_run) as sp:
+            if self.dry_run:
+                print(f"[DRY RUN] Would upload video: {file_path}")
+                print(f"  Title: {title}")
+                print(f"  Description: {description}")
+                return {"id": "dryrun_youtube_123", "status": "dry_run"}
 
-        # Ensure #Shorts is in the title for better visibility
-        if "#Shorts" not in title and "#Shorts" not in description:
-            title = f"{title} #Shorts"
+            # Ensure #Shorts is in the title for better visibility
+            if "#Shorts" not in title and "#Shorts" not in description:
+                title = f"{title} #Shorts"
 
-        body = {
-            'snippet': {
-                'title': title,
-                'description': description,
-                'tags': ['Shorts', 'AI', 'Generated'],
-                'categoryId': '22'
-            },
-            'status': {
-                'privacyStatus': privacy_status,
-                'selfDeclaredMadeForKids': False,
-            },
-        }
+            body = {
+                'snippet': {
+                    'title': title,
+                    'description': description,
+                    'tags': ['Shorts', 'AI', 'Generated'],
+                    'categoryId': '22'
+                },
+                'status': {
+                    'privacyStatus': privacy_status,
+                    'selfDeclaredMadeForKids': False,
+                },
+            }
 
-        media = MediaFileUpload(file_path, chunksize=-1, resumable=True)
+            sp.add_bytes(os.path.getsize(file_path))
+            media = MediaFileUpload(file_path, chunksize=-1, resumable=True)
+
+            with self._lock:
+                request = self.youtube.videos().insert(
+                    part=','.join(body.keys()),
+                    body=body,
+                    media_body=media
+                )
 
-        request = self.youtube.videos().insert(
-            part=','.join(body.keys()),
-            body=body,
-            media_body=media
-        )
+                response = None
+                while response is None:
+                    status, response = request.next_chunk()
+                    if status:
+                        print(f"Uploaded {int(status.progress() * 100)}%")
 
-        response = None
-        while response is None:
-            status, response = request.next_chunk()
-            if status:
-                print(f"Uploaded {int(status.progress() * 100)}%")
+            print(f"Upload successful! Video ID: {response.get('id')}")
+            return response
 
-        print(f"Upload successful! Video ID: {response.get('id')}")
-        return response
+    async def upload_video_async(self, file_path, title, description, privacy_status='private'):
+        """Async variant of `upload_video`; the resumable upload runs on the default executor."""
+        return await asyncio.to_thread(self.upload_video, file_path, title, description, privacy_status)
@@ -0,0 +1,122 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_caches(monkeypatch, tmp_path):
+    """Give every test its own artifact / LLM caches, rate-limit buckets, provider stats, media cache, run workspaces and outputs so state never leaks between tests or runs."""
+    monkeypatch.setenv("ARTIFACT_CACHE_DIR", str(tmp_path / "artifact_cache"))
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "llm_cache.sqlite3"))
+    monkeypatch.setenv("RATE_LIMIT_PATH", str(tmp_path / "rate_limits.sqlite3"))
+    monkeypatch.setenv("MEDIA_CACHE_DIR", str(tmp_path / "media_cache"))
+    monkeypatch.setenv("PROVIDER_STATS_PATH", str(tmp_path / "provider_stats.sqlite3"))
+    monkeypatch.setenv("WORKSPACE_DIR", str(tmp_path / "workspaces"))
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path / "output"))
+
+
+@pytest.fixture
+def temp_db(monkeypatch, tmp_path):
+    """Point `src.database` at a fresh SQLite file with every table created."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    import src.database as database
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'content.db'}")
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    database.metadata.create_all(engine)
+    return engine
+
+
+class FakeGemini:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def generate_concept(self):
+        self.calls.append("concept")
+        return "Sunday Morning", "Aria prompt"
+
+    def generate_image(self, prompt, output_file):
+        self.calls.append("image")
+        with open(output_file, "wb") as f:
+            f.write(b"png")
+        return output_file
+
+    def draft_caption_and_hashtags(self, theme, prompt):
+        self.calls.append("caption")
+        return "Caption", ["#aria"]
+
+
+class FakeVideo:
+    def __init__(self, calls, renditions=None, barrier=None, fail=False):
+        self.calls = calls
+        self.renditions = renditions
+        self.barrier = barrier
+        self.fail = fail
+        self.paths = []
+
+    def animate_image_to_video(self, image_url, duration, output_local, output_file):
+        self.calls.append("video")
+        if self.fail:
+            raise RuntimeError("render failed")
+        self.paths.append((image_url, output_file))
+        with open(output_file, "wb") as f:
+            f.write(b"mp4")
+        if self.barrier:
+            self.barrier.wait(timeout=5)  # every run has written before any finishes
+        return output_file
+
+    def animate_image_to_renditions(self, image_url, duration, output_file):
+        self.calls.append("video")
+        videos = {}
+        for name in self.renditions:
+            videos[name] = output_file.replace(".mp4", f"_{name}.mp4")
+            with open(videos[name], "wb") as f:
+                f.write(b"mp4")
+        return videos
+
+
+class FakeInstagram:
+    def __init__(self, calls):
+        self.calls = calls
+        self.uploaded = {}
+
+    def upload_video_file(self, path, caption):
+        self.calls.append("instagram")
+        with open(path, "rb") as f:
+            self.uploaded[path] = f.read()
+        return {"id": "ig-1"}
+
+
+class FakeYouTube:
+    def __init__(self, calls, fail=False):
+        self.calls = calls
+        self.fail = fail
+        self.uploaded = {}
+
+    def upload_video(self, path, title, description, privacy_status):
+        self.calls.append("youtube")
+        if self.fail:
+            raise RuntimeError("youtube quota")
+        with open(path, "rb") as f:
+            self.uploaded[path] = f.read()
+        return {"id": "yt-1"}
+
+
+@pytest.fixture
+def make_clients():
+    """Build fake `orchestrate` clients; each stage they run is appended to `calls`.
+
+    YouTube is only included with `youtube=True`; other keywords go to `FakeVideo`.
+    """
+
+    def make(calls=None, youtube=False, youtube_fails=False, **video):
+        calls = [] if calls is None else calls
+        return {
+            "gemini": FakeGemini(calls),
+            "video": FakeVideo(calls, **video),
+            "instagram": FakeInstagram(calls),
+            "youtube": FakeYouTube(calls, fail=youtube_fails) if youtube else None,
+        }
+
+    return make
@@ -0,0 +1,112 @@
+import base64
+import json
+import os
+import time
+
+from src.artifact_cache import ArtifactCache
+from src.gemini_client import GeminiClient
+from src.video_gen import VideoGenerator
+
+
+class DummyResp:
+    def __init__(self, data, status_code=200):
+        self._data = data
+        self.status_code = status_code
+        self.content = b"{}"
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self._data
+
+    def iter_content(self, chunk_size=1):
+        body = json.dumps(self._data).encode()
+        for i in range(0, len(body), chunk_size):
+            yield body[i : i + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+
+def test_fetch_put_and_lru_eviction(tmp_path):
+    cache = ArtifactCache(directory=str(tmp_path / "cache"), max_bytes=10)
+    src = tmp_path / "a.bin"
+
+    src.write_bytes(b"123456")
+    cache.put("a" * 64, str(src))
+    old = time.time() - 100
+    os.utime(cache._entry_path("a" * 64), (old, old))
+
+    src.write_bytes(b"abcdef")
+    cache.put("b" * 64, str(src))  # 12 bytes > quota: the older entry goes
+
+    assert cache.fetch("a" * 64, str(tmp_path / "out_a")) is None
+    assert cache.fetch("b" * 64, str(tmp_path / "out_b")) == str(tmp_path / "out_b")
+    assert (tmp_path / "out_b").read_bytes() == b"abcdef"
+
+
+def test_key_depends_on_every_part():
+    assert ArtifactCache.key("image", "gemini", "a cat") == ArtifactCache.key("image", "gemini", "a cat")
+    assert ArtifactCache.key("image", "gemini", "a cat") != ArtifactCache.key("image", "gemini", "a dog")
+
+
+def test_generate_image_is_served_from_cache(monkeypatch, tmp_path):
+    monkeypatch.setenv("IMAGE_PROVIDER", "gemini")
+    calls = []
+
+    def fake_post(url, json=None, headers=None, timeout=None, stream=False):
+        calls.append(url)
+        image = base64.b64encode(b"png-bytes").decode()
+        return DummyResp({"candidates": [{"content": {"parts": [{"inlineData": {"data": image}}]}}]})
+
+    monkeypatch.setattr("src.http_session.post", fake_post)
+    client = GeminiClient(api_key="k", dry_run=False, use_sdk=False)
+
+    first = client.generate_image("a neon city", output_file=str(tmp_path / "one.png"))
+    second = client.generate_image("a neon city", output_file=str(tmp_path / "two.png"))
+    client.generate_image("a quiet forest", output_file=str(tmp_path / "three.png"))
+
+    assert len(calls) == 2
+    assert open(first, "rb").read() == open(second, "rb").read() == b"png-bytes"
+
+
+def test_fallback_image_is_not_cached(monkeypatch, tmp_path):
+    monkeypatch.setenv("IMAGE_PROVIDER", "gemini")
+    monkeypatch.setattr("src.http_session.post", lambda *a, **k: DummyResp({}, status_code=500))
+    monkeypatch.setattr(GeminiClient, "_download_fallback_image", lambda self, output_file: "https://fallback/img.jpg")
+
+    client = GeminiClient(api_key="k", dry_run=False, use_sdk=False)
+    assert client.generate_image("a neon city", output_file=str(tmp_path / "one.png")) == "https://fallback/img.jpg"
+    assert not os.path.exists(client.artifact_cache.directory)
+
+
+def test_video_cache_hit_and_invalidation_on_new_image(monkeypatch, tmp_path):
+    renders = []
+
+    def fake_ffmpeg(self, image_path, duration, output_path):
+        renders.append(image_path)
+        with open(output_path, "wb") as f:
+            f.write(b"mp4:" + open(image_path, "rb").read())
+        return output_path
+
+    monkeypatch.setattr(VideoGenerator, "_animate_ffmpeg", fake_ffmpeg)
+    monkeypatch.setattr(VideoGenerator, "_ensure_background_music", lambda self: None)
+
+    image = tmp_path / "image.png"
+    image.write_bytes(b"first")
+    gen = VideoGenerator(dry_run=False)
+
+    gen.animate_image_to_video(str(image), output_file=str(tmp_path / "a.mp4"))
+    out = gen.animate_image_to_video(str(image), output_file=str(tmp_path / "b.mp4"))
+    assert len(renders) == 1
+    assert open(out, "rb").read() == b"mp4:first"
+
+    image.write_bytes(b"second")
+    out = gen.animate_image_to_video(str(image), output_file=str(tmp_path / "c.mp4"))
+    assert len(renders) == 2
+    assert open(out, "rb").read() == b"mp4:second"
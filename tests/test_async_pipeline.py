@@ -0,0 +1,100 @@
+import asyncio
+
+from src.gemini_client import GeminiClient
+from src.main import orchestrate_async
+from src.stage_graph import StageGraph
+from src.video_gen import VideoGenerator
+
+
+class DummyResp:
+    def __init__(self, data=None, status_code=200, content=b""):
+        self._data = data
+        self.status_code = status_code
+        self.content = content
+        self.text = str(data)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self._data
+
+
+def test_orchestrate_async_dry_run():
+    result = asyncio.run(orchestrate_async(dry_run=True))
+    assert result["theme"] == "Sunday Morning"
+    assert result["caption"].startswith("Slow mornings")
+    assert result["youtube_post_result"]["status"] == "dry_run"
+
+
+def test_stage_graph_run_async_mixes_coroutines_and_functions():
+    async def concept():
+        await asyncio.sleep(0)
+        return "theme"
+
+    graph = StageGraph()
+    graph.add("concept", concept)
+    graph.add("caption", lambda c: c.upper(), deps=["concept"])
+    results = asyncio.run(graph.run_async())
+    assert results["caption"] == "THEME"
+
+
+def test_call_api_async_backs_off_with_asyncio_sleep(monkeypatch):
+    calls = {"n": 0}
+    sleeps = []
+
+    def fake_post(url, json=None, headers=None, timeout=None):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            return DummyResp(status_code=503)
+        return DummyResp({"theme": "Neon", "prompt": "Aria at night"})
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    def blocking_sleep(seconds):
+        raise AssertionError("async path must not call time.sleep")
+
+    monkeypatch.setattr("src.http_session.post", fake_post)
+    monkeypatch.setattr("src.gemini_client.time.sleep", blocking_sleep)
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+
+    client = GeminiClient(api_key="k", api_url="https://gemini.example/v1/agent", dry_run=False, use_sdk=False)
+    theme, prompt = asyncio.run(client.generate_concept_async())
+
+    assert (theme, prompt) == ("Neon", "Aria at night")
+    assert sleeps == [1]
+
+
+def test_stability_video_polling_async(monkeypatch, tmp_path):
+    monkeypatch.setenv("VIDEO_PROVIDER", "stability")
+    monkeypatch.setenv("STABILITY_API_KEY", "sk")
+    image = tmp_path / "image.png"
+    image.write_bytes(b"png")
+    polls = {"n": 0}
+    sleeps = []
+
+    def fake_post(url, headers=None, files=None, data=None, timeout=None):
+        return DummyResp({"id": "gen-1"})
+
+    def fake_get(url, headers=None, timeout=None):
+        polls["n"] += 1
+        if polls["n"] < 3:
+            return DummyResp(status_code=202)
+        return DummyResp(status_code=200, content=b"mp4")
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr("src.http_session.post", fake_post)
+    monkeypatch.setattr("src.http_session.get", fake_get)
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+
+    gen = VideoGenerator(dry_run=False)
+    monkeypatch.setattr(gen, "_resize_image_for_video", lambda path, resized: path)
+    out = asyncio.run(gen.animate_image_to_video_async(str(image), output_file=str(tmp_path / "clip.mp4")))
+
+    assert out == str(tmp_path / "clip.mp4")
+    assert (tmp_path / "clip.mp4").read_bytes() == b"mp4"
+    assert sleeps == [2, 2, 2]
@@ -0,0 +1,96 @@
+import base64
+import json
+import os
+import tracemalloc
+
+import pytest
+
+from src.b64_stream import save_b64_field, save_stream
+
+
+def chunked(body: bytes, size: int):
+    return (body[i : i + size] for i in range(0, len(body), size))
+
+
+IMAGE = bytes(range(256)) * 7 + b"tail"
+
+
+def gemini_body(image: bytes) -> bytes:
+    data = {
+        "candidates": [{"content": {"parts": [
+            {"text": "here is \"your\" image {data}", "data": "bm90IHRoaXM="},
+            {"inlineData": {"mimeType": "image/png", "data": base64.b64encode(image).decode()}},
+        ]}}],
+        "usageMetadata": {"data": 1},
+    }
+    return json.dumps(data).encode()
+
+
+def test_decodes_nested_field_across_any_chunk_boundary(tmp_path):
+    out = str(tmp_path / "img.png")
+    body = gemini_body(IMAGE)
+    for size in (1, 3, 7, 64, len(body)):
+        assert save_b64_field(chunked(body, size), ("inlineData.data",), out)
+        assert open(out, "rb").read() == IMAGE
+
+
+def test_json_escaped_slashes_and_top_level_field(tmp_path):
+    out = str(tmp_path / "img.png")
+    encoded = base64.b64encode(b"\xff\xfe\xfd" * 50).decode()
+    assert "/" in encoded
+    body = ('{"predictions": [{"mimeType": "image/png", "bytesBase64Encoded": "%s"}]}' % encoded.replace("/", "\\/")).encode()
+    assert save_b64_field(chunked(body, 5), ("bytesBase64Encoded",), out)
+    assert open(out, "rb").read() == b"\xff\xfe\xfd" * 50
+
+
+def test_unicode_escapes_are_decoded_and_anything_else_is_rejected(tmp_path):
+    out = str(tmp_path / "img.png")
+    encoded = base64.b64encode(b"\xfb\xff\xbf" * 50).decode()
+    assert "+" in encoded and "/" in encoded
+    escaped = encoded.replace("+", "\\u002B").replace("/", "\\u002f")
+    body = ('{"predictions": [{"bytesBase64Encoded": "%s"}]}' % escaped).encode()
+    for size in (1, 3, 64):
+        assert save_b64_field(chunked(body, size), ("bytesBase64Encoded",), out)
+        assert open(out, "rb").read() == b"\xfb\xff\xbf" * 50
+
+    os.remove(out)
+    with pytest.raises(ValueError):
+        save_b64_field(chunked(b'{"bytesBase64Encoded": "AAAA\\u00e9AAA"}', 4), ("bytesBase64Encoded",), out)
+    assert os.listdir(tmp_path) == []
+
+
+def test_missing_or_truncated_field_leaves_no_file(tmp_path):
+    out = str(tmp_path / "img.png")
+    assert not save_b64_field(chunked(b'{"predictions": []}', 4), ("bytesBase64Encoded",), out)
+    body = gemini_body(IMAGE)
+    assert not save_b64_field(chunked(body[: len(body) // 2], 16), ("inlineData.data",), out)
+    assert os.listdir(tmp_path) == []
+
+
+def test_peak_memory_does_not_grow_with_image_size(tmp_path):
+    out = str(tmp_path / "big.png")
+    encoded = base64.b64encode(os.urandom(8 * 1024 * 1024))
+    prefix, suffix = b'{"predictions": [{"bytesBase64Encoded": "', b'"}]}'
+
+    def body():
+        yield prefix
+        for i in range(0, len(encoded), 64 * 1024):
+            yield encoded[i : i + 64 * 1024]
+        yield suffix
+
+    tracemalloc.start()
+    try:
+        assert save_b64_field(body(), ("bytesBase64Encoded",), out)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert os.path.getsize(out) == 8 * 1024 * 1024
+    assert peak < 1024 * 1024
+
+
+def test_save_stream_writes_raw_chunks(tmp_path):
+    out = str(tmp_path / "img.png")
+    sizes = []
+    assert save_stream(chunked(IMAGE, 100), out, on_chunk=sizes.append)
+    assert open(out, "rb").read() == IMAGE
+    assert sum(sizes) == len(IMAGE)
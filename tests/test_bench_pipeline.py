@@ -0,0 +1,23 @@
+import os
+
+from bench.pipeline import run_benchmark
+
+
+def test_pipeline_benchmark_runs_offline(monkeypatch, tmp_path):
+    for name in ("GORK_PROXY_LATENCY_S", "LUMA_PROXY_LATENCY_S", "GRAPH_PROXY_LATENCY_S"):
+        monkeypatch.setenv(name, "0")
+    monkeypatch.setenv("LUMA_PROXY_BYTES_PER_SECOND", "1024")
+    monkeypatch.setenv("KEEP_WORKSPACES", "true")
+    cwd = os.getcwd()
+
+    (report,) = run_benchmark(2, [2], workdir=str(tmp_path))
+
+    assert os.getcwd() == cwd
+    assert report["failed"] == 0
+    assert report["throughput_per_s"] > 0
+    assert {"concept", "image", "video", "caption", "instagram"} <= set(report["stages"])
+    assert all(row["errors"] == 0 for row in report["stages"].values())
+    assert report["peak_rss_mb"] > 0
+    videos = list((tmp_path / "workspaces").glob("*/video.mp4"))
+    assert len(videos) == 2
+    assert all(v.stat().st_size == 5 * 1024 for v in videos)
@@ -0,0 +1,106 @@
+import json
+
+import src.database as database
+from src.gemini_client import GeminiClient
+from src.main import fill_concept_queue, orchestrate
+
+
+class DummyResp:
+    def __init__(self, data):
+        self._data = data
+        self.status_code = 200
+        self.content = json.dumps(data).encode()
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return self._data
+
+
+def make_client():
+    return GeminiClient(api_key="k", api_url="https://gemini.example/v1/agent", dry_run=False, use_sdk=False)
+
+
+def run_once(clients, tmp_path, run_id):
+    return orchestrate(
+        dry_run=False,
+        clients=clients,
+        image_file=str(tmp_path / f"{run_id}.png"),
+        video_file=str(tmp_path / f"{run_id}.mp4"),
+        run_id=run_id,
+    )
+
+
+def test_generate_concepts_parses_distinct_pairs_from_one_call(monkeypatch):
+    calls = []
+    batch = [
+        {"theme": "Neon Night", "prompt": "Aria under neon"},
+        {"theme": "neon night", "prompt": "duplicate theme"},
+        {"theme": "Rainy Cafe", "prompt": "Aria in a cafe"},
+        {"theme": "", "prompt": "missing theme"},
+        "not an object",
+    ]
+
+    def fake_post(url, json=None, headers=None, timeout=None):
+        calls.append(json["instruction"])
+        return DummyResp(batch)
+
+    monkeypatch.setattr("src.http_session.post", fake_post)
+
+    assert make_client().generate_concepts(5) == [("Neon Night", "Aria under neon"), ("Rainy Cafe", "Aria in a cafe")]
+    assert len(calls) == 1
+    assert "JSON array of 5" in calls[0]
+
+
+def test_claims_are_oldest_first_and_never_repeat(temp_db):
+    database.enqueue_concepts([("A", "a"), ("B", "b")], "cinematic")
+    database.enqueue_concepts([("Noir", "n")], "noir")
+
+    assert database.claim_concept("run-1", "cinematic") == ("A", "a")
+    assert database.claim_concept("run-2", "cinematic") == ("B", "b")
+    assert database.claim_concept("run-3", "cinematic") is None
+    assert database.count_unclaimed_concepts("noir") == 1
+
+
+def test_orchestrate_takes_queued_concept_instead_of_calling_model(monkeypatch, make_clients, temp_db, tmp_path):
+    monkeypatch.setenv("CONCEPT_QUEUE", "true")
+    monkeypatch.delenv("CONTENT_STYLE", raising=False)
+    database.enqueue_concepts([("Queued Theme", "Queued prompt")], "cinematic")
+
+    calls = []
+    first = run_once(make_clients(calls), tmp_path, "run-1")
+    assert first["theme"] == "Queued Theme"
+    assert "concept" not in calls
+
+    # queue drained: falls back to the model
+    second = run_once(make_clients(calls), tmp_path, "run-2")
+    assert second["theme"] == "Sunday Morning"
+    assert calls.count("concept") == 1
+
+
+def test_queue_is_ignored_unless_enabled(monkeypatch, make_clients, temp_db, tmp_path):
+    monkeypatch.delenv("CONCEPT_QUEUE", raising=False)
+    database.enqueue_concepts([("Queued Theme", "Queued prompt")], "cinematic")
+
+    result = run_once(make_clients(), tmp_path, "run-1")
+    assert result["theme"] == "Sunday Morning"
+    assert database.count_unclaimed_concepts("cinematic") == 1
+
+
+def test_fill_concept_queue_stores_batch_under_current_style(monkeypatch, temp_db):
+    monkeypatch.setenv("CONTENT_STYLE", "noir")
+    monkeypatch.setenv("GEMINI_API_KEY", "k")
+    monkeypatch.setenv("GEMINI_API_URL", "https://gemini.example/v1/agent")
+    monkeypatch.setenv("GEMINI_USE_SDK", "false")
+    monkeypatch.setenv("USE_OPENROUTER", "false")
+    monkeypatch.setattr(database, "init_db", lambda: None)
+
+    def fake_post(url, json=None, headers=None, timeout=None):
+        return DummyResp([{"theme": f"T{i}", "prompt": f"p{i}"} for i in range(3)])
+
+    monkeypatch.setattr("src.http_session.post", fake_post)
+
+    assert fill_concept_queue(3, dry_run=False) == 3
+    assert database.count_unclaimed_concepts("noir") == 3
+    assert database.claim_concept("run-1", "noir") == ("T0", "p0")
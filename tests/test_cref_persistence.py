@@ -33,7 +33,7 @@ def test_cref_is_persisted_and_reused(tmp_path, monkeypatch):
         calls.append(json)
         return DummyResp({"data": [{"url": fake_url, "cref": fake_cref}]})
 
-    monkeypatch.setattr("requests.post", fake_post_first)
+    monkeypatch.setattr("src.http_session.post", fake_post_first)
 
     gen = ImageGenerator(api_key="fake", api_url="https://proxy/gork/v1/generate", dry_run=False, provider="gork")
     out1 = gen.generate_from_prompt("Aria initial prompt")
@@ -50,7 +50,7 @@ def test_cref_is_persisted_and_reused(tmp_path, monkeypatch):
         assert json.get("cref") == fake_cref
         return DummyResp({"data": [{"url": "https://gork.example/content/second.png"}]})
 
-    monkeypatch.setattr("requests.post", fake_post_second)
+    monkeypatch.setattr("src.http_session.post", fake_post_second)
 
     out2 = gen.generate_from_prompt("Aria followup prompt")
     assert "second.png" in out2
@@ -0,0 +1,65 @@
+import pytest
+
+from bench.encode import recommend, run_calibration
+from src import encoding
+from src.video_gen import VideoGenerator
+
+
+def test_profiles_and_platform_targets(monkeypatch):
+    args = encoding.encode_args("draft", "shorts")
+    assert args[args.index("-preset") + 1] == "ultrafast"
+    assert args[args.index("-maxrate") + 1] == "8M"
+    assert args[args.index("-movflags") + 1] == "+faststart"
+
+    monkeypatch.setenv("VIDEO_ENCODE_PROFILE", "archival")
+    args = encoding.encode_args()
+    assert args[args.index("-crf") + 1] == "18"
+
+    with pytest.raises(ValueError):
+        encoding.encode_args("veryslow")
+    with pytest.raises(ValueError):
+        encoding.platform_target("tiktok")
+
+
+def test_ffmpeg_command_uses_profile_and_platform(monkeypatch):
+    monkeypatch.setenv("VIDEO_PLATFORM", "shorts")
+    gen = VideoGenerator(dry_run=False)
+    command = gen._ffmpeg_command("img.png", 5, "out.mp4", "music.mp3")
+
+    assert command[command.index("-preset") + 1] == "veryfast"
+    assert "fps=30" in command[command.index("-vf") + 1]
+    assert command[command.index("-b:a") + 1] == "192k"
+    assert command[-1] == "out.mp4"
+
+
+def test_changing_profile_changes_the_video_cache_key(monkeypatch, tmp_path):
+    image = tmp_path / "image.png"
+    image.write_bytes(b"png")
+    monkeypatch.setattr(VideoGenerator, "_ensure_background_music", lambda self: None)
+
+    standard = VideoGenerator(dry_run=False)._video_cache_key(str(image), 5)
+    monkeypatch.setenv("VIDEO_ENCODE_PROFILE", "draft")
+    assert VideoGenerator(dry_run=False)._video_cache_key(str(image), 5) != standard
+
+
+def test_calibration_reports_every_profile(monkeypatch, tmp_path):
+    sizes = {"draft": 900_000, "standard": 600_000, "archival": 1_500_000}
+    commands = []
+
+    def fake_run(command, **kwargs):
+        commands.append(command)
+        output = command[-1]
+        name = output.rsplit("/", 1)[-1].split(".")[0]
+        with open(output, "wb") as f:
+            f.write(b"\0" * sizes.get(name, 10))
+
+    monkeypatch.setattr("subprocess.run", fake_run)
+    reports = run_calibration(duration=2, platform="reels", workdir=str(tmp_path))
+
+    assert [r["profile"] for r in reports] == ["draft", "standard", "archival"]
+    assert "testsrc2=size=1080x1920" in commands[0]
+    assert reports[1]["bytes"] == 600_000 and reports[1]["kbps"] == 2400.0
+    assert all(r["encode_fps"] > 0 for r in reports)
+
+    assert recommend(reports, min_speed=0) == "standard"
+    assert recommend(reports, min_speed=1e9) is None
@@ -0,0 +1,75 @@
+import json
+
+from src.gemini_client import GeminiClient
+from src.main import orchestrate
+
+
+class DummyResp:
+    def __init__(self, data):
+        self._data = data
+        self.status_code = 200
+        self.content = json.dumps(data).encode()
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return self._data
+
+
+FUSED = {"theme": "Neon Night", "prompt": "Aria under neon", "caption": "City lights.", "hashtags": ["#neon", "#aria"]}
+
+
+def make_client():
+    return GeminiClient(api_key="k", api_url="https://gemini.example/v1/agent", dry_run=False, use_sdk=False)
+
+
+def test_fused_call_returns_all_four_fields(monkeypatch):
+    calls = []
+
+    def fake_post(url, json=None, headers=None, timeout=None):
+        calls.append(json["instruction"])
+        return DummyResp(FUSED)
+
+    monkeypatch.setattr("src.http_session.post", fake_post)
+
+    assert make_client().generate_concept_and_caption() == ("Neon Night", "Aria under neon", "City lights.", ["#neon", "#aria"])
+    assert len(calls) == 1
+
+
+def test_incomplete_fused_response_falls_back_to_two_calls(monkeypatch):
+    calls = []
+
+    def fake_post(url, json=None, headers=None, timeout=None):
+        calls.append(json["instruction"])
+        if len(calls) == 1:
+            return DummyResp({"theme": "Only a theme"})
+        if "creative director" in json["instruction"]:
+            return DummyResp({"theme": "Sunday", "prompt": "Aria"})
+        return DummyResp({"caption": "Slow mornings.", "hashtags": ["#sunday"]})
+
+    monkeypatch.setattr("src.http_session.post", fake_post)
+
+    assert make_client().generate_concept_and_caption() == ("Sunday", "Aria", "Slow mornings.", ["#sunday"])
+    assert len(calls) == 3
+
+
+def test_orchestrate_uses_one_llm_call_in_fused_mode(monkeypatch):
+    monkeypatch.setenv("FUSED_CONCEPT_CAPTION", "true")
+    calls = []
+
+    def fused(self):
+        calls.append("fused")
+        return "Neon Night", "Aria under neon", "City lights.", ["#neon"]
+
+    def separate(self, *args):
+        raise AssertionError("separate LLM call made in fused mode")
+
+    monkeypatch.setattr(GeminiClient, "generate_concept_and_caption", fused)
+    monkeypatch.setattr(GeminiClient, "generate_concept", separate)
+    monkeypatch.setattr(GeminiClient, "draft_caption_and_hashtags", separate)
+
+    result = orchestrate(dry_run=True)
+    assert calls == ["fused"]
+    assert result["theme"] == "Neon Night"
+    assert result["caption"] == "City lights.\n\n#neon"
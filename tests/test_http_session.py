@@ -0,0 +1,71 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src import http_session
+
+
+@pytest.fixture(autouse=True)
+def fresh_session():
+    http_session.reset_session()
+    yield
+    http_session.reset_session()
+
+
+@pytest.fixture
+def local_server():
+    peers = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def _reply(self, body=b"ok"):
+            peers.append(self.client_address[1])
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                self.rfile.read(length)
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        do_GET = do_POST = do_HEAD = _reply
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/", peers
+    server.shutdown()
+
+
+def test_calls_reuse_one_keep_alive_connection(local_server):
+    url, peers = local_server
+    for _ in range(3):
+        http_session.get(url, timeout=5).raise_for_status()
+    http_session.post(url, json={"a": 1}, timeout=5).raise_for_status()
+
+    assert len(peers) == 4
+    assert len(set(peers)) == 1  # same client socket every time
+
+
+def test_prewarm_opens_connection_used_by_later_calls(local_server, monkeypatch):
+    url, peers = local_server
+    monkeypatch.setenv("HTTP_PREWARM", url + "some/path, ")
+
+    assert http_session.prewarm_from_env() == 1
+    http_session.get(url, timeout=5)
+    assert len(set(peers)) == 1
+
+
+def test_per_host_pool_sizes(monkeypatch):
+    monkeypatch.setenv("HTTP_POOL_MAXSIZE", "3")
+    monkeypatch.setenv("HTTP_POOL_SIZES", "graph.facebook.com=8, bad-entry")
+
+    session = http_session.get_session()
+    assert session.get_adapter("https://graph.facebook.com/v16.0/me")._pool_maxsize == 8
+    assert session.get_adapter("https://api.stability.ai/v2beta")._pool_maxsize == 3
+    assert http_session.get_session() is session
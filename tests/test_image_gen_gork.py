@@ -25,7 +25,7 @@ def test_gork_parsing(monkeypatch):
         assert url  # basic sanity
         return DummyResp(fake_response)
 
-    monkeypatch.setattr("requests.post", fake_post)
+    monkeypatch.setattr("src.http_session.post", fake_post)
 
     gen = ImageGenerator(api_key="fake", api_url="https://proxy/gork/v1/generate", dry_run=False, provider="gork")
     out = gen.generate_from_prompt("Aria smiling in golden hour", cref="aria_cref_001")
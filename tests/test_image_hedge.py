@@ -0,0 +1,99 @@
+import asyncio
+import os
+import time
+
+from src.gemini_client import GeminiClient
+
+
+def make_client(monkeypatch, hedge=True, delay="0.05"):
+    monkeypatch.setenv("IMAGE_PROVIDER", "stability")
+    monkeypatch.setenv("STABILITY_API_KEY", "s")
+    monkeypatch.setenv("IMAGE_HEDGE", "true" if hedge else "false")
+    monkeypatch.setenv("IMAGE_HEDGE_DELAY_S", delay)
+    return GeminiClient(api_key="k", dry_run=False, use_sdk=False)
+
+
+def fake_provider(monkeypatch, method, data, seconds=0.0, fail=False, calls=None):
+    def generate(self, prompt, output_file, *args):
+        if calls is not None:
+            calls.append(method)
+        time.sleep(seconds)
+        if fail:
+            raise RuntimeError(f"{method} down")
+        with open(output_file, "wb") as f:
+            f.write(data)
+        return os.path.abspath(output_file)
+
+    monkeypatch.setattr(GeminiClient, method, generate)
+
+
+def test_slow_primary_is_hedged_and_fastest_image_wins(monkeypatch, tmp_path):
+    fake_provider(monkeypatch, "_generate_image_stability", b"stability", seconds=0.5)
+    fake_provider(monkeypatch, "_generate_image_gemini", b"gemini")
+    out = tmp_path / "img.png"
+
+    start = time.perf_counter()
+    path = make_client(monkeypatch).generate_image("a neon city", output_file=str(out))
+    assert time.perf_counter() - start < 0.4
+    assert path == str(out) and out.read_bytes() == b"gemini"
+
+    time.sleep(0.6)  # the losing request finishes in the background
+    assert [f for f in os.listdir(tmp_path) if f.startswith("img")] == ["img.png"]
+    assert out.read_bytes() == b"gemini"
+
+
+def test_failed_primary_starts_next_provider_without_waiting(monkeypatch, tmp_path):
+    fake_provider(monkeypatch, "_generate_image_stability", b"", fail=True)
+    fake_provider(monkeypatch, "_generate_image_gemini", b"gemini")
+    out = tmp_path / "img.png"
+
+    start = time.perf_counter()
+    make_client(monkeypatch, delay="5").generate_image("a neon city", output_file=str(out))
+    assert time.perf_counter() - start < 1
+    assert out.read_bytes() == b"gemini"
+
+
+def test_fast_primary_never_starts_the_hedge(monkeypatch, tmp_path):
+    calls = []
+    fake_provider(monkeypatch, "_generate_image_stability", b"stability", calls=calls)
+    fake_provider(monkeypatch, "_generate_image_gemini", b"gemini", calls=calls)
+
+    make_client(monkeypatch, delay="1").generate_image("a neon city", output_file=str(tmp_path / "img.png"))
+    assert calls == ["_generate_image_stability"]
+
+
+def test_async_hedge(monkeypatch, tmp_path):
+    fake_provider(monkeypatch, "_generate_image_stability", b"stability", seconds=0.5)
+
+    async def gemini(self, prompt, output_file, sp, cancelled=None):
+        with open(output_file, "wb") as f:
+            f.write(b"gemini")
+        return os.path.abspath(output_file)
+
+    monkeypatch.setattr(GeminiClient, "_generate_image_gemini_async", gemini)
+    out = tmp_path / "img.png"
+
+    path = asyncio.run(make_client(monkeypatch).generate_image_async("a neon city", output_file=str(out)))
+    assert path == str(out) and out.read_bytes() == b"gemini"
+
+
+def test_sequential_mode_tries_providers_in_order(monkeypatch, tmp_path):
+    calls = []
+    fake_provider(monkeypatch, "_generate_image_stability", b"", fail=True, calls=calls)
+    fake_provider(monkeypatch, "_generate_image_gemini", b"gemini", calls=calls)
+    out = tmp_path / "img.png"
+
+    make_client(monkeypatch, hedge=False).generate_image("a neon city", output_file=str(out))
+    assert calls == ["_generate_image_stability", "_generate_image_gemini"]
+    assert out.read_bytes() == b"gemini"
+
+
+def test_image_api_is_only_used_when_opted_in(monkeypatch):
+    monkeypatch.setenv("IMAGE_PROVIDER", "leonardo")
+    monkeypatch.setenv("IMAGE_API_URL", "https://api.imagegen.example/v1/generate")
+    monkeypatch.delenv("USE_IMAGE_API", raising=False)
+    assert GeminiClient(api_key="k", dry_run=False, use_sdk=False)._image_providers() == [("gemini", "Gemini")]
+
+    monkeypatch.setenv("USE_IMAGE_API", "true")
+    names = [name for name, _ in GeminiClient(api_key="k", dry_run=False, use_sdk=False)._image_providers()]
+    assert names == ["leonardo", "gemini"]
@@ -62,7 +62,7 @@ def test_upload_video_file_flow(monkeypatch, tmp_path):
             return DummyResponse({"id": "published-1"})
         raise RuntimeError("Unexpected call: %s" % url)
 
-    monkeypatch.setattr("requests.post", fake_post)
+    monkeypatch.setattr("src.http_session.post", fake_post)
 
     result = poster.upload_video_file(str(file_path), caption="Hello world", chunk_size=512 * 1024)
     assert result.get("id") == "published-1"
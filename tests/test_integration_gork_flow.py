@@ -16,8 +16,29 @@ class DummyResp:
         return self._data
 
 
+class DummyDownload:
+    def __init__(self, content):
+        self.status_code = 200 if content is not None else 404
+        self.headers = {}
+        self._content = content
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self._content is None:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def iter_content(self, chunk_size=None):
+        yield self._content
+
+
 def test_full_gork_flow(monkeypatch):
     # Configure env for gork + video proxy
+    monkeypatch.setenv("USE_IMAGE_API", "true")
     monkeypatch.setenv("IMAGE_PROVIDER", "gork")
     monkeypatch.setenv("IMAGE_API_URL", "https://proxy/gork/v1/generate")
     monkeypatch.setenv("IMAGE_API_KEY", "fake_image_key")
@@ -31,7 +52,7 @@ def test_full_gork_flow(monkeypatch):
     monkeypatch.setattr(GeminiClient, "generate_concept", lambda self: ("Sunday Morning", "Aria prompt"))
     monkeypatch.setattr(GeminiClient, "draft_caption_and_hashtags", lambda self, theme, prompt: ("Caption text", ["#aria"]))
 
-    # Patch requests.post to simulate image and video provider responses
+    # Patch the shared HTTP session to simulate image and video provider responses
     def fake_post(url, json=None, headers=None, timeout=None):
         if "gork" in url:
             return DummyResp({"data": [{"url": fake_image_url}]})
@@ -40,7 +61,13 @@ def test_full_gork_flow(monkeypatch):
         # Fallback: return empty json
         return DummyResp({})
 
-    monkeypatch.setattr("requests.post", fake_post)
+    monkeypatch.setattr("src.http_session.post", fake_post)
+
+    # Downloads stay local too: the gork image is served, anything else is a 404
+    def fake_get(url, headers=None, stream=False, timeout=None):
+        return DummyDownload(b"png" if url == fake_image_url else None)
+
+    monkeypatch.setattr("src.http_session.get", fake_get)
 
     # Patch InstagramPoster.post_video to avoid calling real Graph API
     monkeypatch.setattr(InstagramPoster, "post_video", lambda self, video_url, caption, share_to_feed=True: {"id": "sim123", "status": "posted"})
@@ -0,0 +1,97 @@
+import json
+import types
+
+from src.gemini_client import GeminiClient
+from src.json_stream import JSONExtractor, extract_json, read_until_json
+
+
+def test_extract_skips_preamble_braces_and_trailing_chatter():
+    raw = 'Sure! Fill in {theme} below:\n```json\n{"theme": "Neon }{", "tags": [{"a": 1}]}\n```\nHope this helps {:)}'
+    assert extract_json(raw) == {"theme": "Neon }{", "tags": [{"a": 1}]}
+    assert extract_json('Here: [{"theme": "A"}] done', "[") == [{"theme": "A"}]
+    assert extract_json("no json at all") is None
+
+
+def test_extractor_finishes_as_soon_as_the_object_closes():
+    extractor = JSONExtractor()
+    assert not extractor.feed('Okay: {"caption": "a \\"quoted\\" }')
+    assert extractor.feed('", "hashtags": ["#a"]} and then some more text')
+    assert extractor.value == {"caption": 'a "quoted" }', "hashtags": ["#a"]}
+
+
+def test_read_until_json_stops_consuming_the_stream():
+    consumed = []
+
+    def chunks():
+        for part in ['{"theme": ', '"Neon"}', " trailing", " chatter"]:
+            consumed.append(part)
+            yield part
+
+    assert read_until_json(chunks()) == '{"theme": "Neon"}'
+    assert consumed == ['{"theme": ', '"Neon"}']
+    assert read_until_json(iter(["plain ", "text"])) == "plain text"
+
+
+class StreamResp:
+    status_code = 200
+    ok = True
+
+    def __init__(self, deltas):
+        self.lines = [": OPENROUTER PROCESSING", ""]
+        for d in deltas:
+            self.lines += ["data: " + json.dumps({"choices": [{"delta": {"content": d}}]}, ensure_ascii=False), ""]
+        self.lines.append("data: [DONE]")
+        self.read = 0
+        self.closed = False
+
+    def iter_lines(self, decode_unicode=False):
+        # like requests for a charset-less text/event-stream: raw bytes, or ISO-8859-1 text
+        for line in self.lines:
+            self.read += 1
+            yield line.encode("utf-8").decode("iso-8859-1") if decode_unicode else line.encode("utf-8")
+
+    def close(self):
+        self.closed = True
+
+
+def test_openrouter_stream_returns_first_object(monkeypatch):
+    monkeypatch.setenv("USE_OPENROUTER", "true")
+    monkeypatch.setenv("OPENROUTER_API_KEY", "k")
+    monkeypatch.setenv("LLM_STREAM", "true")
+    resp = StreamResp(["Here you go: {\"theme\": \"Neon café ✨\", ", "\"prompt\": \"Aria\"}", " Let me know!" * 50])
+    posts = []
+
+    def fake_post(url, json=None, headers=None, timeout=None, stream=False):
+        posts.append((json.get("stream"), stream))
+        return resp
+
+    monkeypatch.setattr("src.http_session.post", fake_post)
+
+    client = GeminiClient(api_key="k", dry_run=False, use_sdk=False)
+    assert client.generate_concept() == ("Neon café ✨", "Aria")
+    assert posts == [(True, True)]
+    assert resp.closed and resp.read < len(resp.lines)
+
+
+def test_sdk_stream_returns_first_object():
+    class Chunk:
+        def __init__(self, text):
+            self._text = text
+
+        @property
+        def text(self):
+            if self._text is None:
+                raise ValueError("no text parts")
+            return self._text
+
+    class Model:
+        def generate_content(self, instruction, stream=False):
+            assert stream
+            return iter([Chunk('{"caption": "Hi", '), Chunk('"hashtags": ["#a"]}'), Chunk(None)])
+
+    client = GeminiClient(api_key="k", dry_run=False, use_sdk=False)
+    client.use_sdk, client.stream_json = True, True
+    client._genai = types.SimpleNamespace(GenerativeModel=lambda name: Model())
+    client.sdk_shape = client._resolve_sdk_shape()
+
+    assert client.draft_caption_and_hashtags("Neon", "Aria") == ("Hi", ["#a"])
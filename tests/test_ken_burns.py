@@ -0,0 +1,123 @@
+import pytest
+
+from bench.render import run_render_benchmark
+from src.video_gen import VideoGenerator
+
+
+def test_source_is_cropped_and_scaled_before_zoompan():
+    vf = VideoGenerator(dry_run=False)._ken_burns_filter(5, 1080, 1920, 30)
+    prescale, zoompan = vf.split(",zoompan=")
+    assert prescale == "crop='min(iw,ih*1080/1920)':'min(ih,iw*1920/1080)',scale=1350:2400,setsar=1"
+    assert "s=1080x1920:fps=30" in zoompan
+    assert "1+(1.3-1)*min(on/149,1)" in zoompan  # zoom_in reaches KEN_BURNS_ZOOM on the last frame
+    assert "scale=" not in zoompan  # no full-frame rescale after zoompan
+
+
+def test_pan_path_and_oversample_are_configurable(monkeypatch):
+    monkeypatch.setenv("KEN_BURNS_PATH", "pan_right")
+    monkeypatch.setenv("KEN_BURNS_ZOOM", "1.2")
+    monkeypatch.setenv("KEN_BURNS_OVERSAMPLE", "0")
+    vf = VideoGenerator(dry_run=False)._ken_burns_filter(4, 1080, 1920, 25)
+    assert vf.startswith("crop='min(iw,ih*1080/1920)':'min(ih,iw*1920/1080)',zoompan=z='1.2'")
+    assert "x='(iw-iw/zoom)*min(on/99,1)'" in vf
+
+    monkeypatch.setenv("KEN_BURNS_PATH", "spiral")
+    with pytest.raises(ValueError):
+        VideoGenerator(dry_run=False)
+
+
+def test_render_benchmark_compares_prescaled_and_full_resolution(monkeypatch, tmp_path):
+    filters = []
+
+    def fake_run(command, **kwargs):
+        if "-vf" in command:
+            filters.append(command[command.index("-vf") + 1])
+        open(command[-1], "wb").close()
+
+    monkeypatch.setattr("subprocess.run", fake_run)
+    monkeypatch.setattr("bench.render._load_numpy", lambda: None)
+    reports = run_render_benchmark(["2048x2048", "3840x2160"], duration=1, workdir=str(tmp_path))
+
+    assert [r["resolution"] for r in reports] == ["2048x2048", "3840x2160"]
+    assert reports[1]["megapixels"] == 8.29 and reports[1]["numpy_s"] is None
+    assert ["scale=1350:2400" in vf for vf in filters] == [True, False, True, False]
+
+
+def test_easing_applies_to_both_renderers(monkeypatch):
+    monkeypatch.setenv("KEN_BURNS_EASING", "ease_in_out")
+    gen = VideoGenerator(dry_run=False)
+    assert "z='1+(1.3-1)*((1-cos(PI*min(on/149,1)))/2)'" in gen._ken_burns_filter(5, 1080, 1920, 30)
+    assert gen._camera(0.5) == pytest.approx((1.15, 0.5, 0.5))
+    assert gen._camera(0.1)[0] < 1.03  # slow start
+
+    monkeypatch.setenv("KEN_BURNS_EASING", "bounce")
+    with pytest.raises(ValueError):
+        VideoGenerator(dry_run=False)
+
+
+def test_synth_frame_matches_float_bilinear_reference(monkeypatch):
+    np = pytest.importorskip("numpy")
+    monkeypatch.setenv("KEN_BURNS_PATH", "pan_right")
+    gen = VideoGenerator(dry_run=False)
+    rgb = np.random.default_rng(0).integers(0, 256, size=(40, 24, 3), dtype=np.uint8)
+
+    frame = np.frombuffer(gen._synth_frame(np, gen._pack_rgb(np, rgb), 0.4, 10, 16), dtype=np.uint8).reshape(16, 10, 3)
+
+    zoom, x, y = gen._camera(0.4)
+    crop_w, crop_h = 24 / zoom, 40 / zoom
+    xs = np.clip((24 - crop_w) * x + (np.arange(10) + 0.5) * crop_w / 10 - 0.5, 0, 23)
+    ys = np.clip((40 - crop_h) * y + (np.arange(16) + 0.5) * crop_h / 16 - 0.5, 0, 39)
+    x0, y0 = xs.astype(int), ys.astype(int)
+    x1, y1 = np.minimum(x0 + 1, 23), np.minimum(y0 + 1, 39)
+    wx, wy = (xs - x0)[None, :, None], (ys - y0)[:, None, None]
+    src = rgb.astype(float)
+    top = src[y0][:, x0] * (1 - wx) + src[y0][:, x1] * wx
+    bottom = src[y1][:, x0] * (1 - wx) + src[y1][:, x1] * wx
+    reference = top * (1 - wy) + bottom * wy
+    assert np.abs(frame - reference).max() <= 2
+
+
+def test_numpy_renderer_streams_frames_to_one_encoder(monkeypatch, tmp_path):
+    np = pytest.importorskip("numpy")
+    monkeypatch.setenv("VIDEO_RENDERER", "numpy")
+    monkeypatch.setenv("KEN_BURNS_OVERSAMPLE", "1")
+    monkeypatch.setattr(VideoGenerator, "_ensure_background_music", lambda self: None)
+    decodes, encoders = [], []
+
+    def fake_run(command, **kwargs):
+        decodes.append(command)
+        return type("Done", (), {"stdout": np.full((1920, 1080, 3), 200, np.uint8).tobytes()})()
+
+    class FakeEncoder:
+        def __init__(self, command, stdin, stderr):
+            self.command, self.frames, self.returncode = command, [], 0
+            self.stdin = self
+            encoders.append(self)
+
+        def write(self, data):
+            self.frames.append(data)
+
+        def close(self):
+            pass
+
+        def wait(self):
+            return self.returncode
+
+    monkeypatch.setattr("subprocess.run", fake_run)
+    monkeypatch.setattr("subprocess.Popen", FakeEncoder)
+    image = tmp_path / "image.png"
+    image.write_bytes(b"png")
+    out = str(tmp_path / "video.mp4")
+
+    assert VideoGenerator(dry_run=False)._animate_ffmpeg(str(image), 2, out) == out
+    assert len(decodes) == 1 and "scale=1080:1920" in decodes[0][decodes[0].index("-vf") + 1]
+    (encoder,) = encoders
+    assert encoder.command[encoder.command.index("-f") + 1] == "rawvideo" and "-" in encoder.command
+    assert len(encoder.frames) == 60
+    assert set(encoder.frames[-1]) == {200} and len(encoder.frames[-1]) == 1080 * 1920 * 3
+
+
+def test_numpy_renderer_falls_back_to_zoompan_without_numpy(monkeypatch):
+    monkeypatch.setenv("VIDEO_RENDERER", "numpy")
+    monkeypatch.setattr("src.video_gen._load_numpy", lambda: None)
+    assert VideoGenerator(dry_run=False)._renderer() == "zoompan"
@@ -0,0 +1,81 @@
+import json
+
+from src import tracing
+from src.gemini_client import GeminiClient
+from src.llm_cache import LLMCache
+
+
+class DummyResp:
+    def __init__(self, data):
+        self._data = data
+        self.status_code = 200
+        self.content = json.dumps(data).encode()
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return self._data
+
+
+def counting_post(calls):
+    def fake_post(url, json=None, headers=None, timeout=None):
+        calls.append(json["instruction"])
+        if "creative director" in json["instruction"]:
+            return DummyResp({"theme": f"Theme {len(calls)}", "prompt": "Aria"})
+        return DummyResp({"caption": f"Caption {len(calls)}", "hashtags": ["#aria"]})
+
+    return fake_post
+
+
+def make_client():
+    return GeminiClient(api_key="k", api_url="https://gemini.example/v1/agent", dry_run=False, use_sdk=False)
+
+
+def test_sqlite_tier_survives_new_instances_and_expires(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.sqlite3")
+    LLMCache(path=path, ttl_s=60).set("k", "value")
+    assert LLMCache(path=path).get("k") == "value"
+
+    LLMCache(path=path, ttl_s=-1).set("old", "stale")
+    assert LLMCache(path=path).get("old") is None
+
+
+def test_memory_tier_is_bounded(tmp_path):
+    cache = LLMCache(path=str(tmp_path / "c.sqlite3"), memory_entries=2)
+    for key in ("a", "b", "c"):
+        cache.set(key, key.upper())
+    assert list(cache._memory) == ["b", "c"]
+    assert cache.get("a") == "A"  # still served from SQLite
+
+
+def test_caption_is_cached_and_can_bypass(monkeypatch):
+    calls = []
+    monkeypatch.setattr("src.http_session.post", counting_post(calls))
+    client = make_client()
+
+    with tracing.InMemoryCollector() as collector:
+        first = client.draft_caption_and_hashtags("Theme", "Prompt")
+        second = make_client().draft_caption_and_hashtags("Theme", "Prompt")
+    assert first == second
+    assert len(calls) == 1
+    assert [s["attrs"]["cache"] for s in collector.by_name("gemini.call_api")] == ["miss", "hit"]
+
+    fresh = client.draft_caption_and_hashtags("Theme", "Prompt", use_cache=False)
+    assert len(calls) == 2
+    assert fresh != first
+
+
+def test_concepts_are_fresh_unless_concept_cache_is_enabled(monkeypatch):
+    calls = []
+    monkeypatch.setattr("src.http_session.post", counting_post(calls))
+
+    client = make_client()
+    assert client.generate_concept() != client.generate_concept()
+    assert len(calls) == 2
+
+    # fresh answers still refresh the cache, so an opted-in run reuses the latest one
+    monkeypatch.setenv("CONCEPT_CACHE", "true")
+    client = make_client()
+    assert client.generate_concept() == client.generate_concept() == ("Theme 2", "Aria")
+    assert len(calls) == 2
@@ -0,0 +1,102 @@
+import os
+
+import pytest
+
+from src.gemini_client import GeminiClient
+from src.media_cache import FALLBACK_IMAGE_URL, MediaCache
+from src.video_gen import VideoGenerator
+
+
+class FakeResp:
+    def __init__(self, status_code=200, body=b"", headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.body), 4):
+            yield self.body[i : i + 4]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+
+class FakeServer:
+    def __init__(self, body=b"image-bytes", etag='"v1"'):
+        self.body = body
+        self.etag = etag
+        self.requests = []
+        self.down = False
+
+    def get(self, url, headers=None, stream=False, timeout=None):
+        self.requests.append((url, dict(headers or {})))
+        if self.down:
+            raise ConnectionError("offline")
+        if headers and headers.get("If-None-Match") == self.etag:
+            return FakeResp(304)
+        return FakeResp(200, self.body, {"ETag": self.etag, "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"})
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = FakeServer()
+    monkeypatch.setattr("src.http_session.get", server.get)
+    return server
+
+
+def test_fresh_entries_are_served_without_network(server, tmp_path):
+    cache = MediaCache(directory=str(tmp_path / "media"))
+    first = cache.get("https://cdn.example/a.jpg")
+    second = MediaCache(directory=str(tmp_path / "media")).get("https://cdn.example/a.jpg")  # another process
+    assert first == second and open(first, "rb").read() == b"image-bytes"
+    assert len(server.requests) == 1
+
+
+def test_stale_entries_are_revalidated_with_etag(server, tmp_path):
+    cache = MediaCache(directory=str(tmp_path / "media"), ttl_s=0)
+    path = cache.get("https://cdn.example/a.jpg")
+    assert cache.get("https://cdn.example/a.jpg") == path
+    assert server.requests[1][1] == {"If-None-Match": '"v1"', "If-Modified-Since": "Wed, 01 Jan 2025 00:00:00 GMT"}
+
+    server.body, server.etag = b"new-bytes", '"v2"'
+    assert open(cache.get("https://cdn.example/a.jpg"), "rb").read() == b"new-bytes"
+
+    server.down = True
+    assert open(cache.get("https://cdn.example/a.jpg"), "rb").read() == b"new-bytes"
+    assert cache.get("https://cdn.example/never-fetched.jpg") is None
+
+
+def test_blobs_are_content_addressed(server, tmp_path):
+    cache = MediaCache(directory=str(tmp_path / "media"))
+    assert cache.seed(["https://cdn.example/a.jpg", "https://mirror.example/a.jpg"]) == 2
+    assert len(os.listdir(tmp_path / "media" / "blobs")) == 1
+
+
+def test_fallback_image_comes_from_the_cache(server, tmp_path):
+    MediaCache().seed([FALLBACK_IMAGE_URL])
+    server.down = True
+    client = GeminiClient(api_key="k", dry_run=False, use_sdk=False)
+    out = tmp_path / "fallback.png"
+    assert client._download_fallback_image(str(out)) == str(out)
+    assert out.read_bytes() == b"image-bytes"
+
+
+def test_per_run_source_images_bypass_the_cache(server, tmp_path, monkeypatch):
+    media = tmp_path / "media"
+    monkeypatch.setenv("MEDIA_CACHE_DIR", str(media))
+    gen = VideoGenerator(dry_run=False)
+    out = tmp_path / "run" / "video.mp4"
+    out.parent.mkdir()
+
+    with gen._local_image("https://cdn.example/run-1.png?sig=x", str(out)) as local:
+        assert os.path.dirname(local) == str(out.parent) and local.endswith(".png")
+        assert open(local, "rb").read() == b"image-bytes"
+    assert os.listdir(out.parent) == []  # the download is removed after the render
+    assert not media.exists()
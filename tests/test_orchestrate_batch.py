@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+from src.gemini_client import GeminiClient
+from src.main import orchestrate_batch, run
+from src.video_gen import VideoGenerator
+
+
+def test_batch_overlaps_items_and_returns_results_in_order(monkeypatch):
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0, "calls": 0}
+
+    def slow_concept(self):
+        with lock:
+            state["active"] += 1
+            state["calls"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            n = state["calls"]
+        time.sleep(0.05)
+        with lock:
+            state["active"] -= 1
+        return f"Theme {n}", "Aria prompt"
+
+    monkeypatch.setattr(GeminiClient, "generate_concept", slow_concept)
+
+    results = orchestrate_batch(4, max_concurrency=4, dry_run=True)
+
+    assert len(results) == 4
+    assert all("error" not in r for r in results)
+    assert state["peak"] > 1
+
+
+def test_batch_item_failure_does_not_abort_batch(monkeypatch):
+    calls = {"n": 0}
+    lock = threading.Lock()
+
+    def flaky_concept(self):
+        with lock:
+            calls["n"] += 1
+            n = calls["n"]
+        if n == 1:
+            raise RuntimeError("quota")
+        return "Theme", "Aria prompt"
+
+    monkeypatch.setattr(GeminiClient, "generate_concept", flaky_concept)
+
+    results = orchestrate_batch(3, max_concurrency=1, dry_run=True)
+    assert results[0] == {"error": "quota"}
+    assert all("theme" in r for r in results[1:])
+
+
+def test_ffmpeg_renders_are_limited_separately(monkeypatch):
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def fake_run(cmd, **kwargs):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.02)
+        with lock:
+            state["active"] -= 1
+
+    monkeypatch.setattr("subprocess.run", fake_run)
+
+    gen = VideoGenerator(dry_run=False, max_concurrent_renders=2)
+    threads = [threading.Thread(target=gen._run_ffmpeg, args=(["ffmpeg"],)) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert state["peak"] == 2
+
+
+def test_batch_cannot_resume_a_run():
+    with pytest.raises(ValueError, match="resume"):
+        run(dry_run=True, batch=2, resume="run-1")
@@ -0,0 +1,145 @@
+import os
+import time
+
+import pytest
+
+from src.gemini_client import GeminiClient
+from src.image_gen import ImageGenerator
+from src.provider_router import ProviderRouter, ProviderUnavailable
+from src.video_gen import VideoGenerator
+
+
+def test_rolling_stats_and_window(tmp_path):
+    router = ProviderRouter(path=str(tmp_path / "stats.sqlite3"), window=4)
+    for latency in (0.5, 0.1, 0.2, 0.3):
+        router.record("image:gemini", True, latency)
+    router.record("image:gemini", False, 9.0)  # the 0.5 s call drops out of the window
+
+    stats = router.stats("image:gemini")
+    assert stats["calls"] == 4
+    assert stats["success_rate"] == 0.75
+    assert stats["p50_ms"] == 200.0
+    assert stats["p95_ms"] == 300.0
+    assert router.stats("video:luma")["calls"] == 0
+
+
+def test_circuit_opens_after_consecutive_failures_and_recovers(tmp_path):
+    router = ProviderRouter(path=str(tmp_path / "stats.sqlite3"), failure_threshold=2, cooldown_s=0.2)
+    router.record("video:stability", False, 1.0)
+    assert router.allow("video:stability")
+    router.record("video:stability", False, 1.0)
+    assert not router.allow("video:stability")
+    with pytest.raises(ProviderUnavailable):
+        router.check("video:stability")
+
+    time.sleep(0.25)
+    assert router.allow("video:stability")  # half-open: one trial goes through
+    router.record("video:stability", False, 1.0)
+    assert not router.allow("video:stability")  # a failed trial reopens at once
+
+    time.sleep(0.25)
+    router.record("video:stability", True, 1.0)
+    router.record("video:stability", False, 1.0)
+    assert router.allow("video:stability")
+
+
+def test_order_prefers_fast_healthy_providers(tmp_path):
+    router = ProviderRouter(path=str(tmp_path / "stats.sqlite3"), min_calls=2, failure_threshold=3)
+    for _ in range(3):
+        router.record("image:stability", True, 2.0)
+        router.record("image:gemini", True, 0.5)
+    router.record("image:openrouter", True, 0.1)  # too little data to rank yet
+
+    assert router.order(["image:openrouter", "image:stability", "image:gemini"]) == ["image:gemini", "image:stability", "image:openrouter"]
+
+    for _ in range(3):
+        router.record("image:gemini", False, 0.1)
+    assert router.order(["image:openrouter", "image:stability", "image:gemini"]) == ["image:stability", "image:openrouter"]
+    assert ProviderRouter(path=router.path, enabled=False).order(["image:gemini"]) == ["image:gemini"]
+
+
+def test_track_records_outcomes(tmp_path):
+    router = ProviderRouter(path=str(tmp_path / "stats.sqlite3"))
+    with router.track("llm:openrouter"):
+        pass
+    with pytest.raises(ValueError):
+        with router.track("llm:openrouter"):
+            raise ValueError("boom")
+    with pytest.raises(ProviderUnavailable):
+        with router.track("llm:openrouter"):
+            raise ProviderUnavailable("open")
+    assert router.stats("llm:openrouter")["calls"] == 2
+
+
+class ResourceExhausted(Exception):
+    """Named like the SDK's quota error (google.api_core.exceptions)."""
+
+
+def test_sdk_quota_errors_never_trip_the_breaker(monkeypatch):
+    monkeypatch.setenv("CIRCUIT_FAILURES", "2")
+    client = GeminiClient(api_key="k", dry_run=False, use_sdk=False)
+    client.use_sdk, client.sdk_shape = True, "generative_model"
+    replies = [ResourceExhausted("429 quota"), ResourceExhausted("429 quota"), "ok"]
+
+    class Model:
+        def generate_content(self, instruction):
+            reply = replies.pop(0)
+            if isinstance(reply, Exception):
+                raise reply
+            return type("Resp", (), {"text": reply})()
+
+    monkeypatch.setattr(client, "_sdk_model", lambda name: Model())
+    monkeypatch.setattr(client, "_quota_delay", lambda rate_key, exc, attempt: 0.0)
+
+    assert client._call_api("hello", use_cache=False) == "ok"
+    stats = client.router.stats("llm:gemini-sdk")
+    assert stats["calls"] == 1 and stats["success_rate"] == 1.0 and not stats["open"]
+
+
+def test_open_image_circuit_is_skipped(monkeypatch, tmp_path):
+    monkeypatch.setenv("IMAGE_PROVIDER", "stability")
+    monkeypatch.setenv("STABILITY_API_KEY", "s")
+    calls = []
+
+    def stability(self, prompt, output_file):
+        calls.append("stability")
+        raise RuntimeError("timeout")
+
+    def gemini(self, prompt, output_file, sp, cancelled=None):
+        calls.append("gemini")
+        with open(output_file, "wb") as f:
+            f.write(b"img")
+        return os.path.abspath(output_file)
+
+    monkeypatch.setattr(GeminiClient, "_generate_image_stability", stability)
+    monkeypatch.setattr(GeminiClient, "_generate_image_gemini", gemini)
+    client = GeminiClient(api_key="k", dry_run=False, use_sdk=False)
+
+    for i in range(4):
+        client.generate_image(f"prompt {i}", output_file=str(tmp_path / f"{i}.png"))
+    assert calls.count("stability") == 3  # the circuit opened after the third timeout
+    assert calls.count("gemini") == 4
+    assert client.router.stats("image:stability")["open"]
+
+
+def test_image_generator_fails_fast_while_open(monkeypatch):
+    gen = ImageGenerator(api_url="https://img.example", dry_run=False, provider="gork")
+    for _ in range(3):
+        gen.router.record("image:gork", False, 60.0)
+    monkeypatch.setattr("src.http_session.post", lambda *a, **k: pytest.fail("called a provider with an open circuit"))
+    with pytest.raises(ProviderUnavailable):
+        gen.generate_from_prompt("a neon city")
+
+
+def test_open_video_circuit_goes_straight_to_ffmpeg(monkeypatch, tmp_path):
+    monkeypatch.setenv("VIDEO_PROVIDER", "stability")
+    monkeypatch.setenv("STABILITY_API_KEY", "s")
+    gen = VideoGenerator(dry_run=False)
+    for _ in range(3):
+        gen.router.record("video:stability", False, 120.0)
+
+    monkeypatch.setattr(VideoGenerator, "_animate_with", lambda self, *a: pytest.fail("called a provider with an open circuit"))
+    monkeypatch.setattr(VideoGenerator, "_animate_ffmpeg", lambda self, image_path, duration, output_path: output_path)
+
+    out = str(tmp_path / "video.mp4")
+    assert gen._animate_uncached(str(tmp_path / "img.png"), 5, out) == (out, False)
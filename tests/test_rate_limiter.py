@@ -0,0 +1,143 @@
+import json
+import multiprocessing
+
+import requests
+
+import src.rate_limiter as rate_limiter
+from src.gemini_client import GeminiClient
+from src.rate_limiter import RateLimiter, parse_rate_limits, retry_after_seconds
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class DummyResp:
+    def __init__(self, data=None, status_code=200, headers=None):
+        self._data = data
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = json.dumps(data).encode()
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} error", response=self)
+
+    def json(self):
+        return self._data
+
+
+def test_parse_rate_limits():
+    limits = parse_rate_limits("gemini=60/60, gemini:imagen=10/60/2,bad,openrouter=x/1")
+    assert limits == {"gemini": (1.0, 1.0), "gemini:imagen": (10 / 60, 2.0)}
+
+
+def test_retry_after_from_header_and_sdk_message():
+    resp = DummyResp(status_code=429, headers={"Retry-After": "7"})
+    assert retry_after_seconds(requests.exceptions.HTTPError(response=resp)) == 7.0
+    assert retry_after_seconds(RuntimeError("429 Quota exceeded. retry_delay {\n  seconds: 12\n}")) == 12.0
+    assert retry_after_seconds(RuntimeError("boom")) is None
+
+
+def test_bucket_spaces_calls_and_shares_state_across_instances(monkeypatch, tmp_path):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    path = str(tmp_path / "buckets.sqlite3")
+    limits = {"gemini": (2.0, 1.0)}  # 2 calls/s, no burst
+
+    a = RateLimiter(path=path, limits=limits)
+    b = RateLimiter(path=path, limits=limits)
+    assert a.reserve("gemini:gemini-pro") == 0.0
+    # a second worker queues behind the first instead of firing at once
+    assert b.reserve("gemini:gemini-pro") == 0.5
+    assert a.reserve("gemini:gemini-pro") == 1.0
+    # other models have their own bucket
+    assert a.reserve("gemini:imagen") == 0.0
+
+
+def test_penalty_blocks_every_worker_only_as_long_as_needed(monkeypatch, tmp_path):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    path = str(tmp_path / "buckets.sqlite3")
+
+    RateLimiter(path=path, limits={}).penalize("gemini:gemini-pro", 3)
+    other = RateLimiter(path=path, limits={})
+    assert other.acquire("gemini:gemini-pro") == 3
+    assert clock.sleeps == [3]
+    assert other.acquire("gemini:gemini-pro") == 0.0
+
+
+def test_unlimited_key_takes_no_write_lock(monkeypatch, tmp_path):
+    path = tmp_path / "buckets.sqlite3"
+    limiter = RateLimiter(path=str(path), limits={})
+    assert limiter.reserve("gemini:gemini-pro") == 0.0
+    assert not path.exists()  # nothing to limit, so the bucket file is never created
+
+    def no_writes(*args):
+        raise AssertionError("reserve took a write transaction")
+
+    limiter.penalize("gemini:gemini-pro", 3)
+    monkeypatch.setattr(limiter, "_update", no_writes)
+    assert 2.9 < limiter.reserve("gemini:gemini-pro") <= 3  # the 429 block still applies
+
+
+def _reserve_many(path, n, queue):
+    limiter = RateLimiter(path=path, limits={"gemini": (1.0, 1.0)})
+    queue.put([limiter.reserve("gemini:m") for _ in range(n)])
+
+
+def test_reservations_are_atomic_across_processes(tmp_path):
+    path = str(tmp_path / "buckets.sqlite3")
+    queue = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=_reserve_many, args=(path, 5, queue)) for _ in range(4)]
+    for p in procs:
+        p.start()
+    waits = sorted(w for _ in procs for w in queue.get(timeout=30))
+    for p in procs:
+        p.join()
+    # 20 reservations at 1/s: each one gets its own slot about a second apart
+    assert len(waits) == 20
+    assert all(later - earlier > 0.5 for earlier, later in zip(waits, waits[1:]))
+
+
+def test_call_api_waits_for_retry_after_instead_of_fixed_sleep(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    monkeypatch.setattr("src.gemini_client.time.sleep", lambda s: (_ for _ in ()).throw(AssertionError("fixed sleep")))
+    calls = {"n": 0}
+
+    def fake_post(url, json=None, headers=None, timeout=None):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            return DummyResp({"error": "quota"}, status_code=429, headers={"Retry-After": "4"})
+        return DummyResp({"theme": "Neon", "prompt": "Aria"})
+
+    monkeypatch.setattr("src.http_session.post", fake_post)
+
+    client = GeminiClient(api_key="k", api_url="https://gemini.example/v1/agent", dry_run=False, use_sdk=False)
+    assert client.generate_concept() == ("Neon", "Aria")
+    assert calls["n"] == 2
+    assert clock.sleeps == [4]
+
+
+def test_caller_sleeps_itself_when_the_penalty_is_not_recorded(monkeypatch):
+    client = GeminiClient(api_key="k", api_url="https://gemini.example/v1/agent", dry_run=False, use_sdk=False)
+    quota = requests.exceptions.HTTPError("429 error", response=DummyResp(status_code=429, headers={"Retry-After": "4"}))
+    assert client.rate_limiter.enabled
+    assert client._quota_delay("gemini:m", quota, 0) == 0.0  # the limiter's next acquire waits instead
+
+    def unavailable(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(client.rate_limiter, "_update", unavailable)
+    assert client.rate_limiter.penalize("gemini:m", 4) is False
+    assert client._quota_delay("gemini:m", quota, 0) == 4
@@ -0,0 +1,107 @@
+import pytest
+
+from src import encoding
+from src.main import _rendition, orchestrate
+from src.video_gen import VideoGenerator
+
+
+def test_renditions_come_from_one_split_graph(monkeypatch, tmp_path):
+    monkeypatch.setenv("VIDEO_RENDITIONS", "reels,shorts,preview")
+    monkeypatch.setattr(VideoGenerator, "_ensure_background_music", lambda self: None)
+    commands = []
+
+    def fake_run(command, **kwargs):
+        commands.append(command)
+        for arg in command:
+            if arg.endswith(".mp4"):
+                open(arg, "wb").close()
+
+    monkeypatch.setattr("subprocess.run", fake_run)
+    image = tmp_path / "image.png"
+    image.write_bytes(b"png")
+    gen = VideoGenerator(dry_run=False)
+
+    videos = gen.animate_image_to_renditions(str(image), 5, str(tmp_path / "video.mp4"))
+
+    assert videos == {name: str(tmp_path / f"video_{name}.mp4") for name in ("reels", "shorts", "preview")}
+    (command,) = commands
+    graph = command[command.index("-filter_complex") + 1]
+    assert graph.count("zoompan=") == 1 and "split=3[s0][s1][s2]" in graph
+    assert "[s0]null[v0]" in graph and "[s2]scale=540:960,setsar=1[v2]" in graph
+    maxrates = [command[i + 1] for i, arg in enumerate(command) if arg == "-maxrate"]
+    assert maxrates == [encoding.PLATFORMS[name]["maxrate"] for name in ("reels", "shorts", "preview")]
+
+    # every rendition is cached, so the next identical request skips ffmpeg
+    assert gen.animate_image_to_renditions(str(image), 5, str(tmp_path / "again.mp4"))["preview"] == str(tmp_path / "again_preview.mp4")
+    assert len(commands) == 1
+
+
+def test_camera_settings_change_the_numpy_rendition_keys(monkeypatch, tmp_path):
+    monkeypatch.setenv("VIDEO_RENDITIONS", "reels,preview")
+    monkeypatch.setenv("VIDEO_RENDERER", "numpy")
+    monkeypatch.setattr(VideoGenerator, "_ensure_background_music", lambda self: None)
+    keys = []
+    monkeypatch.setattr("src.artifact_cache.ArtifactCache.fetch", lambda self, key, path: keys.append(key) or True)
+    image = tmp_path / "image.png"
+    image.write_bytes(b"png")
+
+    for path in ("zoom_in", "pan_left"):
+        monkeypatch.setenv("KEN_BURNS_PATH", path)
+        VideoGenerator(dry_run=False)._encode_renditions(str(image), 5, str(tmp_path / "video.mp4"), "numpy")
+    assert len(set(keys)) == 4  # reels and preview, for each camera path
+
+
+def test_provider_clip_is_transcoded_once(monkeypatch, tmp_path):
+    monkeypatch.setenv("VIDEO_RENDITIONS", "shorts,preview")
+    clip = tmp_path / "video.mp4"
+    clip.write_bytes(b"mp4")
+    command = VideoGenerator(dry_run=False)._renditions_command(str(clip), 5, {"shorts": "a.mp4", "preview": "b.mp4"}, kind="video")
+
+    assert command[:4] == ["ffmpeg", "-y", "-i", str(clip)]
+    assert command[command.index("-filter_complex") + 1].startswith("[0:v]crop=")
+    assert command.count("0:a?") == 2 and command[-1] == "b.mp4"
+
+
+def test_unknown_rendition_is_rejected(monkeypatch):
+    monkeypatch.setenv("VIDEO_RENDITIONS", "reels,tiktok")
+    with pytest.raises(ValueError, match="tiktok"):
+        VideoGenerator(dry_run=False)
+
+
+def test_preview_only_renditions_are_rejected(monkeypatch):
+    monkeypatch.setenv("VIDEO_RENDITIONS", "preview")
+    with pytest.raises(ValueError, match="no postable target"):
+        VideoGenerator(dry_run=False)
+
+
+def test_each_poster_gets_its_rendition(make_clients, tmp_path):
+    clients = make_clients(youtube=True, renditions=["reels", "shorts", "preview"])
+
+    result = orchestrate(dry_run=True, clients=clients, image_file=str(tmp_path / "image.png"), video_file=str(tmp_path / "video.mp4"))
+
+    assert list(clients["instagram"].uploaded) == [str(tmp_path / "video_reels.mp4")]
+    assert list(clients["youtube"].uploaded) == [str(tmp_path / "video_shorts.mp4")]
+    assert result["video_url"] == str(tmp_path / "video_reels.mp4")
+    assert set(result["renditions"]) == {"reels", "shorts", "preview"}
+
+
+def test_missing_cut_falls_back_to_a_full_size_rendition(make_clients, tmp_path):
+    videos = {"preview": "v_preview.mp4", "shorts": "v_shorts.mp4"}
+    assert _rendition(videos, "reels") == "v_shorts.mp4"  # Instagram never gets the preview cut
+    assert _rendition(videos) == "v_shorts.mp4"  # nor is it saved as the piece's video
+    assert _rendition({"preview": "v_preview.mp4"}, "reels") is None  # so the upload is skipped
+
+    clients = make_clients(youtube=True, renditions=["preview", "shorts"])
+    result = orchestrate(dry_run=True, clients=clients, run_id="run-cut")
+
+    shorts = str(tmp_path / "workspaces" / "run-cut" / "video_shorts.mp4")
+    assert list(clients["instagram"].uploaded) == list(clients["youtube"].uploaded) == [shorts]
+    assert result["video_url"] == shorts
+
+
+def test_preview_only_result_is_never_posted_or_saved(make_clients):
+    clients = make_clients(youtube=True, renditions=["preview"])
+    result = orchestrate(dry_run=True, clients=clients, run_id="run-preview")
+
+    assert clients["instagram"].uploaded == clients["youtube"].uploaded == {}
+    assert result["video_url"] is None
@@ -0,0 +1,51 @@
+import src.database as database
+from src.main import orchestrate
+
+
+def test_resume_skips_finished_stages(make_clients, temp_db, tmp_path):
+    image_file = str(tmp_path / "image.png")
+    video_file = str(tmp_path / "video.mp4")
+
+    first_calls = []
+    first = orchestrate(
+        dry_run=False,
+        clients=make_clients(first_calls, youtube=True, youtube_fails=True),
+        image_file=image_file,
+        video_file=video_file,
+        run_id="run-1",
+    )
+    assert first["youtube_post_result"] is None
+    assert sorted(first_calls) == sorted(["concept", "image", "video", "caption", "youtube", "instagram"])
+    assert set(database.load_checkpoints("run-1")) == {"concept", "image", "video", "caption", "instagram"}
+
+    second_calls = []
+    second = orchestrate(
+        dry_run=False,
+        clients=make_clients(second_calls, youtube=True),
+        image_file=image_file,
+        video_file=video_file,
+        run_id="run-1",
+        resume=True,
+    )
+    # Only the failed upload runs again; Instagram is not re-posted
+    assert second_calls == ["youtube"]
+    assert second["youtube_post_result"] == {"id": "yt-1"}
+    assert second["instagram_post_result"] == {"id": "ig-1"}
+    assert second["theme"] == "Sunday Morning"
+
+
+def test_resume_reruns_stage_when_checkpointed_file_is_missing(make_clients, temp_db, tmp_path):
+    database.save_checkpoint("run-2", "concept", ["Theme", "Prompt"])
+    database.save_checkpoint("run-2", "image", str(tmp_path / "gone.png"))
+
+    calls = []
+    orchestrate(
+        dry_run=False,
+        clients=make_clients(calls, youtube=True),
+        image_file=str(tmp_path / "image.png"),
+        video_file=str(tmp_path / "video.mp4"),
+        run_id="run-2",
+        resume=True,
+    )
+    assert "concept" not in calls
+    assert "image" in calls
@@ -0,0 +1,71 @@
+import os
+
+import src.runtime as runtime_mod
+from src.gemini_client import GeminiClient
+from src.runtime import WarmRuntime, job_overrides
+
+
+def test_clients_are_reused_across_jobs(monkeypatch):
+    built = []
+    real_build = runtime_mod.build_clients
+
+    def counting_build(dry_run=True):
+        built.append(dry_run)
+        return real_build(dry_run=dry_run)
+
+    monkeypatch.setattr(runtime_mod, "build_clients", counting_build)
+
+    runtime = WarmRuntime(default_dry_run=True)
+    first = runtime.run_job({"id": "1", "settings": {}})
+    second = runtime.run_job({"id": "2", "settings": {}})
+
+    assert first["status"] == "completed" and second["status"] == "completed"
+    assert first["run_id"] != second["run_id"]
+    assert built == [True]
+
+
+def test_job_settings_apply_only_for_that_job(monkeypatch):
+    monkeypatch.delenv("CONTENT_STYLE", raising=False)
+    seen = {}
+
+    def concept(self):
+        seen["style"] = os.getenv("CONTENT_STYLE")
+        return "Theme", "Prompt"
+
+    monkeypatch.setattr(GeminiClient, "generate_concept", concept)
+
+    runtime = WarmRuntime(default_dry_run=True)
+    result = runtime.run_job({"id": "7", "settings": {"content_style": "noir", "dry_run": True}})
+
+    assert result["status"] == "completed"
+    assert seen["style"] == "noir"
+    assert "CONTENT_STYLE" not in os.environ
+
+
+def test_credentials_cannot_be_overridden_by_job_settings():
+    overrides = job_overrides({"content_style": "noir", "ig_access_token": "stolen", "DATABASE_URL": "sqlite://"})
+    assert overrides == {"CONTENT_STYLE": "noir"}
+
+
+def test_failing_job_is_reported_not_raised(monkeypatch):
+    def boom(self):
+        raise RuntimeError("quota")
+
+    monkeypatch.setattr(GeminiClient, "generate_concept", boom)
+
+    result = WarmRuntime(default_dry_run=True).run_job({"id": "9"})
+    assert result["status"] == "failed"
+    assert result["error"] == "quota"
+    assert result["job_id"] == "9"
+
+
+def test_auto_migrate_runs_once_before_the_first_job(monkeypatch, tmp_path):
+    monkeypatch.setenv("AUTO_MIGRATE_ON_START", "true")
+    monkeypatch.setenv("AUTO_MIGRATE_MARKER_PATH", str(tmp_path / "marker"))
+    calls = []
+    monkeypatch.setattr("src.main.migrate", lambda *args, **kwargs: calls.append(args) or 1)
+
+    runtime = WarmRuntime(default_dry_run=True)
+    assert runtime.run_job({"id": "1"})["status"] == "completed"
+    assert runtime.run_job({"id": "2"})["status"] == "completed"
+    assert len(calls) == 1 and (tmp_path / "marker").exists()
@@ -0,0 +1,49 @@
+import types
+
+from src.gemini_client import GeminiClient
+
+
+class FakeModel:
+    def __init__(self, name):
+        self.name = name
+
+    def generate_content(self, instruction):
+        return types.SimpleNamespace(text='{"theme": "Neon", "prompt": "Aria", "caption": "Hi", "hashtags": ["#a"]}')
+
+
+class FakeGenai:
+    def __init__(self):
+        self.created = []
+
+    def GenerativeModel(self, name):
+        self.created.append(name)
+        return FakeModel(name)
+
+
+def make_sdk_client(genai):
+    client = GeminiClient(api_key="k", dry_run=False, use_sdk=False)
+    client.use_sdk = True
+    client._genai = genai
+    client.sdk_shape = client._resolve_sdk_shape()
+    return client
+
+
+def test_sdk_shape_resolved_once_and_exposed():
+    client = make_sdk_client(FakeGenai())
+    assert client.sdk_shape == "generative_model"
+
+    chat_only = types.SimpleNamespace(chat=types.SimpleNamespace(create=lambda **kw: None))
+    assert make_sdk_client(chat_only).sdk_shape == "chat.create"
+    assert make_sdk_client(types.SimpleNamespace()).sdk_shape is None
+    assert GeminiClient(dry_run=True).sdk_shape is None
+
+
+def test_model_handle_reused_across_calls():
+    genai = FakeGenai()
+    client = make_sdk_client(genai)
+
+    client.generate_concept()
+    client.draft_caption_and_hashtags("Neon", "Aria")
+    client._call_api("another instruction", use_cache=False)
+
+    assert genai.created == [client.model]
@@ -0,0 +1,65 @@
+import threading
+import time
+
+import pytest
+
+from src.stage_graph import StageGraph
+
+
+def test_independent_stages_run_concurrently():
+    started = threading.Barrier(2, timeout=2)
+
+    def left(root):
+        started.wait()  # would time out if stages ran one after another
+        return root + "-left"
+
+    def right(root):
+        started.wait()
+        return root + "-right"
+
+    graph = StageGraph()
+    graph.add("root", lambda: "r")
+    graph.add("left", left, deps=["root"])
+    graph.add("right", right, deps=["root"])
+    graph.add("join", lambda a, b: (a, b), deps=["left", "right"])
+
+    results = graph.run()
+    assert results["join"] == ("r-left", "r-right")
+
+
+def test_optional_stage_failure_is_recorded():
+    def boom(_):
+        raise RuntimeError("upload down")
+
+    graph = StageGraph()
+    graph.add("video", lambda: "clip.mp4")
+    graph.add("upload", boom, deps=["video"], optional=True)
+    graph.add("after", lambda v, u: (v, u), deps=["video", "upload"])
+
+    results = graph.run()
+    assert results["after"] == ("clip.mp4", None)
+    assert isinstance(graph.errors["upload"], RuntimeError)
+
+
+def test_required_stage_failure_stops_dependents():
+    ran = []
+
+    def boom():
+        time.sleep(0.01)
+        raise ValueError("concept failed")
+
+    graph = StageGraph()
+    graph.add("concept", boom)
+    graph.add("image", lambda c: ran.append("image"), deps=["concept"])
+
+    with pytest.raises(ValueError):
+        graph.run()
+    assert ran == []
+
+
+def test_cycle_is_rejected():
+    graph = StageGraph()
+    graph.add("a", lambda b: b, deps=["b"])
+    graph.add("b", lambda a: a, deps=["a"])
+    with pytest.raises(ValueError):
+        graph.run()
@@ -0,0 +1,52 @@
+import subprocess
+import sys
+
+import src.main as main_mod
+
+
+def test_importing_main_defers_heavy_dependencies():
+    code = (
+        "import sys, src.main; "
+        "heavy = [m for m in ('googleapiclient', 'google_auth_oauthlib', 'sqlalchemy', 'src.database', 'src.youtube_poster') if m in sys.modules]; "
+        "print(','.join(heavy))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert out.strip() == ""
+
+
+def test_youtube_poster_is_built_on_first_use(monkeypatch):
+    built = []
+
+    class FakePoster:
+        def upload_video(self, *args, **kwargs):
+            return {"status": "fake"}
+
+    def make(dry_run):
+        built.append(dry_run)
+        return FakePoster()
+
+    monkeypatch.setattr(main_mod, "_make_youtube_poster", make)
+
+    yt = main_mod.build_clients(dry_run=True)["youtube"]
+    assert built == []
+    assert yt.upload_video("v.mp4", "t", "d") == {"status": "fake"}
+    yt.upload_video("v.mp4", "t", "d")
+    assert built == [True]
+
+
+def test_youtube_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("YOUTUBE_ENABLED", "false")
+    result = main_mod.orchestrate(dry_run=True)
+    assert result["youtube_post_result"] is None
+
+
+def test_parse_importtime():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     urllib3.util\n"
+        "import time:       300 |        420 |   requests\n"
+        "import time:       900 |       1320 | src.main\n"
+    )
+    rows = main_mod.parse_importtime(stderr)
+    assert [(r["module"], r["depth"]) for r in rows] == [("urllib3.util", 2), ("requests", 1), ("src.main", 0)]
+    assert rows[-1]["cumulative_us"] == 1320
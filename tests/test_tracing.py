@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from src import tracing
+from src.gemini_client import GeminiClient
+from src.main import orchestrate
+
+
+class DummyResp:
+    def __init__(self, data, status_code=200):
+        self._data = data
+        self.status_code = status_code
+        self.content = json.dumps(data).encode()
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self._data
+
+
+def test_span_records_outcome_retries_and_bytes():
+    with tracing.InMemoryCollector() as collector:
+        with pytest.raises(ValueError):
+            with tracing.span("outer", provider="x") as sp:
+                sp.add_retry()
+                sp.add_bytes(10)
+                raise ValueError("boom")
+
+    (record,) = collector.spans
+    assert record["outcome"] == "error"
+    assert record["error"] == "ValueError: boom"
+    assert record["retries"] == 1
+    assert record["bytes"] == 10
+    assert record["attrs"] == {"provider": "x"}
+    assert record["end"] >= record["start"]
+
+
+def test_orchestrate_spans_are_tagged_with_job_id():
+    with tracing.InMemoryCollector() as collector:
+        with tracing.job_context("job-42"):
+            orchestrate(dry_run=True)
+
+    names = {s["name"] for s in collector.spans}
+    assert {"orchestrate", "stage.concept", "stage.image", "stage.video", "stage.caption", "stage.youtube", "stage.instagram"} <= names
+    assert all(s["job_id"] == "job-42" for s in collector.spans)
+
+    root = collector.by_name("orchestrate")[0]
+    # stage spans run on worker threads but still nest under the root span
+    assert all(s["parent_id"] == root["span_id"] for s in collector.spans if s["name"].startswith("stage."))
+
+
+def test_call_api_span_counts_retries(monkeypatch):
+    calls = {"n": 0}
+
+    def fake_post(url, json=None, headers=None, timeout=None):
+        calls["n"] += 1
+        if calls["n"] < 3:
+            return DummyResp({}, status_code=500)
+        return DummyResp({"theme": "Neon", "prompt": "Aria"})
+
+    monkeypatch.setattr("src.http_session.post", fake_post)
+    monkeypatch.setattr("src.gemini_client.time.sleep", lambda s: None)
+
+    client = GeminiClient(api_key="k", api_url="https://gemini.example/v1/agent", dry_run=False, use_sdk=False)
+    with tracing.InMemoryCollector() as collector:
+        client.generate_concept()
+
+    (call,) = collector.by_name("gemini.call_api")
+    assert call["retries"] == 2
+    attempts = collector.by_name("gemini.http.agent")
+    assert [a["outcome"] for a in attempts] == ["error", "error", "ok"]
+    assert attempts[-1]["bytes"] > 0
+
+
+def test_jsonl_export_and_summary(monkeypatch, tmp_path):
+    path = tmp_path / "spans.jsonl"
+    monkeypatch.setenv("TRACE_EXPORT_PATH", str(path))
+
+    for _ in range(3):
+        with tracing.span("stage.video"):
+            pass
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(records) == 3
+    summary = tracing.summarize(records)
+    assert summary["stage.video"]["count"] == 3
+    assert summary["stage.video"]["p95_ms"] >= summary["stage.video"]["p50_ms"]
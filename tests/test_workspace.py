@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+
+import pytest
+
+from src.main import orchestrate
+from src.workspace import Workspace
+
+
+def test_parallel_runs_use_separate_workspaces_and_clean_up(make_clients, tmp_path):
+    clients = make_clients(barrier=threading.Barrier(2))
+    video = clients["video"]
+    threads = [threading.Thread(target=orchestrate, kwargs={"dry_run": True, "clients": clients, "run_id": f"run-{i}"}) for i in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    root = tmp_path / "workspaces"
+    assert sorted(video.paths) == [
+        (str(root / "run-0" / "image.png"), str(root / "run-0" / "video.mp4")),
+        (str(root / "run-1" / "image.png"), str(root / "run-1" / "video.mp4")),
+    ]
+    assert len(clients["instagram"].uploaded) == 2
+    assert os.listdir(root) == []
+
+
+def test_successful_run_returns_and_saves_lasting_files(make_clients, tmp_path, monkeypatch):
+    import src.database as database
+
+    saved = []
+    monkeypatch.setattr(database, "save_generated_content", lambda *args: saved.append(args))
+    monkeypatch.setattr(database, "save_checkpoint", lambda *args: None)
+    clients = make_clients()
+
+    result = orchestrate(dry_run=False, clients=clients, run_id="run-ok")
+
+    output = tmp_path / "output" / "run-ok"
+    assert result["video_url"] == str(output / "video.mp4") and result["image_url"] == str(output / "image.png")
+    assert open(result["video_url"], "rb").read() == b"mp4"
+    assert saved[0][2:4] == (result["image_url"], result["video_url"])
+    assert not (tmp_path / "workspaces" / "run-ok").exists()
+
+    # dry runs leave nothing behind in OUTPUT_DIR
+    orchestrate(dry_run=True, clients=clients, run_id="run-dry")
+    assert not (tmp_path / "output" / "run-dry").exists()
+    assert not (tmp_path / "workspaces" / "run-dry").exists()
+
+
+def test_publish_moves_each_file_once(tmp_path):
+    with Workspace("a", root=str(tmp_path / "ws")) as ws:
+        open(ws.path("image.png"), "wb").close()
+        image = ws.publish(ws.path("image.png"))
+        assert ws.publish({"reels": ws.path("image.png"), "remote": "https://cdn.example/v.mp4"}) == {"reels": image, "remote": "https://cdn.example/v.mp4"}
+    assert image == str(tmp_path / "output" / "a" / "image.png") and os.path.exists(image)
+
+
+def test_failed_run_keeps_its_workspace(make_clients, tmp_path):
+    with pytest.raises(RuntimeError):
+        orchestrate(dry_run=True, clients=make_clients(fail=True), run_id="run-x")
+    assert os.listdir(tmp_path / "workspaces" / "run-x") == ["image.png"]
+
+
+def test_keep_and_prune(tmp_path):
+    with Workspace("a", root=str(tmp_path), keep=True) as ws:
+        open(ws.path("video.mp4"), "wb").close()
+    assert os.path.exists(tmp_path / "a" / "video.mp4")
+
+    old = time.time() - 3600
+    os.utime(tmp_path / "a", (old, old))
+    with Workspace("b", root=str(tmp_path), max_age_s=60):
+        assert os.listdir(tmp_path) == ["b"]
+    assert os.listdir(tmp_path) == []